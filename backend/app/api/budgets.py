@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import date
 from ..core.database import get_db
 from ..core.security import get_current_user
 from ..models.user import User
 from ..models.transaction import Budget
 from ..schemas.transaction import BudgetCreate, BudgetResponse
+from ..services.budgets import BudgetStatusService
+from ..services.response_cache import response_cache
+from ..services.versions import DataVersionService
 
 router = APIRouter(prefix="/api/budgets", tags=["budgets"])
 
+budget_list = TypeAdapter(List[BudgetResponse])
+
 
 @router.post("", response_model=BudgetResponse)
 def create_budget(
@@ -38,59 +45,45 @@ def create_budget(
         period=budget_data.period
     )
     db.add(budget)
+    DataVersionService.bump(db, current_user.id)
     db.commit()
     db.refresh(budget)
 
     return budget
 
 
+def build_budget_list(db: Session, user_id: int, today: date) -> List[BudgetResponse]:
+    """The user's budgets with spending in their current period."""
+    return [
+        BudgetResponse(
+            id=status['budget'].id,
+            category=status['budget'].category,
+            amount=status['budget'].amount,
+            period=status['budget'].period,
+            spent=status['spent'],
+            remaining=status['remaining'],
+            percentage=status['percentage'],
+            created_at=status['budget'].created_at
+        )
+        for status in BudgetStatusService.statuses(db, user_id, today)
+    ]
+
+
 @router.get("", response_model=List[BudgetResponse])
 def get_budgets(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's budgets with spending information."""
-    from sqlalchemy import func
-    from datetime import datetime, timedelta
-    from ..models.transaction import Transaction
-
-    budgets = db.query(Budget).filter(Budget.user_id == current_user.id).all()
-
-    # Calculate spending for each budget
-    budget_responses = []
-    for budget in budgets:
-        # Calculate spending in current period
-        if budget.period == 'monthly':
-            start_date = datetime.now().replace(day=1).date()
-        elif budget.period == 'weekly':
-            start_date = (datetime.now() - timedelta(days=datetime.now().weekday())).date()
-        else:  # yearly
-            start_date = datetime.now().replace(month=1, day=1).date()
-
-        spent = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == current_user.id,
-            Transaction.category == budget.category,
-            Transaction.date >= start_date,
-            Transaction.amount < 0
-        ).scalar() or 0
-
-        spent = abs(spent)
-        remaining = max(0, budget.amount - spent)
-        percentage = (spent / budget.amount * 100) if budget.amount > 0 else 0
-
-        budget_response = BudgetResponse(
-            id=budget.id,
-            category=budget.category,
-            amount=budget.amount,
-            period=budget.period,
-            spent=spent,
-            remaining=remaining,
-            percentage=round(percentage, 1),
-            created_at=budget.created_at
-        )
-        budget_responses.append(budget_response)
-
-    return budget_responses
+    """Get user's budgets with spending information (cached like the dashboard summary)."""
+    today = date.today()
+    version = (DataVersionService.current(db, current_user.id), today)
+    return response_cache.respond(
+        request,
+        ('budgets', current_user.id),
+        version,
+        lambda: budget_list.dump_json(build_budget_list(db, current_user.id, today))
+    )
 
 
 @router.delete("/{budget_id}")
@@ -112,6 +105,7 @@ def delete_budget(
         )
 
     db.delete(budget)
+    DataVersionService.bump(db, current_user.id)
     db.commit()
 
     return {"message": "Budget deleted"}
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, List, Optional
+from datetime import datetime
+from ..core.config import settings
 from ..core.database import get_db
 from ..core.security import get_current_user
 from ..models.user import User
 from ..models.transaction import Transaction
-from ..services.categorizer import Categorizer
+from ..services.categorizer import get_categorizer
+from ..services.jobs import JobRunner
+from ..services.training import ModelTrainer, TRAINING_MODES
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/ml", tags=["ml"])
-categorizer = Categorizer()
+categorizer = get_categorizer()
+trainer = ModelTrainer(categorizer)
+training_jobs = JobRunner(max_workers=settings.ML_TRAINING_WORKERS, name="ml-train")
 
 
 class PredictRequest(BaseModel):
@@ -20,43 +27,99 @@ class PredictResponse(BaseModel):
     category: str
 
 
-@router.post("/train")
+class TrainJobResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+def to_job_response(job: dict) -> TrainJobResponse:
+    return TrainJobResponse(
+        job_id=job['id'],
+        status=job['status'],
+        result=job['result'],
+        error=job['error'],
+        created_at=job['created_at'],
+        started_at=job['started_at'],
+        finished_at=job['finished_at']
+    )
+
+
+@router.post("/train", response_model=TrainJobResponse, status_code=status.HTTP_202_ACCEPTED)
 def train_model(
+    mode: Optional[str] = Query(None, description="full or incremental"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Train ML model on user's categorized transactions."""
-    # Get all categorized transactions
-    transactions = db.query(Transaction).filter(
+    """
+    Start training the user's own ML model in the background.
+
+    Returns a job to poll at /api/ml/train/{job_id}. If a training job is
+    already queued or running for the user, that job is returned instead.
+    """
+    mode = mode or settings.ML_TRAINING_MODE
+    if mode not in TRAINING_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"mode must be one of: {', '.join(TRAINING_MODES)}"
+        )
+
+    active = training_jobs.find_active("train", current_user.id)
+    if active:
+        return to_job_response(active)
+
+    # Users with too little data keep using the shared global model
+    categorized = db.query(func.count(Transaction.id)).filter(
         Transaction.user_id == current_user.id,
         Transaction.category.isnot(None)
-    ).all()
+    ).scalar()
 
-    if len(transactions) < 10:
+    if categorized < categorizer.MIN_TRAINING_SAMPLES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Need at least 10 categorized transactions to train model"
+            detail=f"Need at least {categorizer.MIN_TRAINING_SAMPLES} categorized transactions to train model"
         )
 
-    descriptions = [t.description for t in transactions]
-    categories = [t.category for t in transactions]
+    job = training_jobs.submit("train", trainer.train_user, current_user.id, mode, owner_id=current_user.id)
+    return to_job_response(job)
 
-    try:
-        categorizer.train_model(descriptions, categories)
-    except Exception as e:
+
+@router.get("/train/{job_id}", response_model=TrainJobResponse)
+def get_training_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Status of a training job."""
+    job = training_jobs.get(job_id)
+    if not job or job['owner_id'] != current_user.id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to train model: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training job not found"
         )
 
-    return {
-        "message": "Model trained successfully",
-        "transactions_used": len(transactions)
-    }
+    return to_job_response(job)
 
 
 @router.post("/predict", response_model=PredictResponse)
-def predict_category(data: PredictRequest):
+def predict_category(
+    data: PredictRequest,
+    current_user: User = Depends(get_current_user)
+):
     """Predict category for a transaction description."""
-    category = categorizer.categorize(data.description)
+    category = categorizer.categorize(data.description, user_id=current_user.id)
     return PredictResponse(category=category)
+
+
+@router.get("/cache")
+def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """Prediction cache counters for the categorizer."""
+    user_models = categorizer.model_store.cache.stats() if categorizer.model_store else None
+    return {
+        "model_version": categorizer.model_version,
+        **categorizer.cache.stats(),
+        "user_models": user_models
+    }
@@ -1,40 +1,199 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Union
+import asyncio
 import os
-import uuid
 from datetime import datetime
-from ..core.database import get_db
+from ..core.database import SessionLocal, get_db
 from ..core.security import get_current_user
 from ..core.config import settings
 from ..models.user import User
 from ..models.transaction import Receipt, ReceiptLineItem, Transaction
 from ..schemas.transaction import (
     ReceiptOCRResponse,
+    ReceiptOCRJobResponse,
     ReceiptVerifyRequest,
     ReceiptVerifyResponse,
     ReceiptImportRequest,
+    ReceiptReconcileRequest,
+    ReceiptReconcileMatch,
+    ReceiptReconcileResponse,
     ReceiptResponse,
     ManualReceiptCreate,
     TransactionResponse,
     ReceiptLineItemBase
 )
-from ..services.ocr import OCRService
+from ..services.ocr import (
+    TooManyPages,
+    UnreadablePDF,
+    count_pdf_pages,
+    merge_pdf_pages,
+    process_pdf_page_file,
+    process_receipt_file
+)
+from ..services.ocr_pool import OCRPool, OCRPoolBusy
+from ..services.ocr_cache import OCRResultCache
+from ..services.metrics import StageTimings
 from ..services.matcher import TransactionMatcher
-from ..services.categorizer import Categorizer
+from ..services.categorizer import get_categorizer
+from ..services.jobs import JobRunner
+from ..services.rollups import RollupService
+from ..services.uploads import UploadTooLarge, save_upload
+from ..services.versions import DataVersionService
 
 router = APIRouter(prefix="/api/receipts", tags=["receipts"])
-ocr_service = OCRService()
-categorizer = Categorizer()
+ocr_pool = OCRPool(
+    max_workers=settings.OCR_WORKERS,
+    max_pending=settings.OCR_MAX_PENDING,
+    timeout=settings.OCR_TIMEOUT_SECONDS
+)
+ocr_jobs = JobRunner(max_workers=settings.OCR_WORKERS, name="ocr")
+ocr_cache = OCRResultCache(
+    cache_dir=settings.OCR_CACHE_DIR,
+    max_entries=settings.OCR_CACHE_SIZE
+)
+ocr_timings = StageTimings()
+categorizer = get_categorizer()
+
+
+def build_ocr_response(
+    db: Session,
+    user_id: int,
+    ocr_result: Dict,
+    debug: Optional[Dict[str, Any]] = None
+) -> ReceiptOCRResponse:
+    """Turn raw OCR output into the API payload, with suggested matches."""
+    # Find matching transactions
+    suggested_matches = []
+    if ocr_result['total'] and ocr_result['date']:
+        matches = TransactionMatcher.find_matching_transactions(
+            db=db,
+            user_id=user_id,
+            amount=ocr_result['total'],
+            transaction_date=ocr_result['date'].date(),
+        )
+        suggested_matches = [TransactionResponse.from_orm(m) for m in matches]
+
+    # Build response
+    line_items = [
+        ReceiptLineItemBase(
+            description=item['description'],
+            quantity=item['quantity'],
+            price=item['price'],
+            confidence=item['confidence']
+        )
+        for item in ocr_result['line_items']
+    ]
+
+    return ReceiptOCRResponse(
+        vendor=ocr_result['vendor'],
+        date=ocr_result['date'].date() if ocr_result['date'] else None,
+        total=ocr_result['total'],
+        line_items=line_items,
+        confidence=ocr_result['confidence'],
+        raw_text=ocr_result['raw_text'],
+        suggested_matches=suggested_matches,
+        debug=debug
+    )
+
+
+def finish_ocr(cache_key: str, ocr_result: Dict) -> Dict[str, float]:
+    """Record a fresh OCR run's stage timings and cache its result (without them)."""
+    timings = ocr_result.pop('timings', {})
+    ocr_timings.record(timings)
+    ocr_cache.put(cache_key, ocr_result)
+    return timings
+
+
+def pdf_page_jobs(file_path: str) -> List[tuple]:
+    """
+    Worker arguments for OCR'ing each page of a PDF upload.
+
+    Opens the document, so call it off the event loop.
+    """
+    pages = count_pdf_pages(file_path)
+    if pages > settings.OCR_PDF_MAX_PAGES:
+        raise TooManyPages(f"PDF has {pages} pages (max {settings.OCR_PDF_MAX_PAGES})")
+    return [
+        (file_path, index, settings.OCR_PDF_DPI, settings.OCR_TIMEOUT_SECONDS)
+        for index in range(pages)
+    ]
+
+
+async def run_ocr(file_path: str) -> Dict:
+    """OCR an upload in the pool; PDF pages are OCR'd in parallel and merged."""
+    if file_path.endswith('.pdf'):
+        jobs = await asyncio.to_thread(pdf_page_jobs, file_path)
+        return merge_pdf_pages(await ocr_pool.run_many(process_pdf_page_file, jobs))
+    return await ocr_pool.run(process_receipt_file, file_path, settings.OCR_TIMEOUT_SECONDS)
+
+
+def run_ocr_blocking(file_path: str) -> Dict:
+    """run_ocr for worker threads: waits for pool slots instead of failing."""
+    if file_path.endswith('.pdf'):
+        return merge_pdf_pages(ocr_pool.map_blocking(process_pdf_page_file, pdf_page_jobs(file_path)))
+    return ocr_pool.run_blocking(process_receipt_file, file_path, settings.OCR_TIMEOUT_SECONDS)
+
 
+def discard_upload(file_path: str, created: bool):
+    """Remove a file after failed OCR, unless an earlier upload owns it."""
+    if created and os.path.exists(file_path):
+        os.remove(file_path)
 
-@router.post("/upload", response_model=ReceiptOCRResponse)
+
+def run_ocr_job(
+    user_id: int,
+    file_path: str,
+    created: bool,
+    cache_key: str,
+    debug: bool = False
+) -> ReceiptOCRResponse:
+    """Background OCR job: waits for a pool slot rather than failing when busy."""
+    timings = None
+    ocr_result = ocr_cache.get(cache_key)
+    if ocr_result is None:
+        try:
+            ocr_result = run_ocr_blocking(file_path)
+        except Exception:
+            discard_upload(file_path, created)
+            raise
+        timings = finish_ocr(cache_key, ocr_result)
+
+    db = SessionLocal()
+    try:
+        debug_info = {"cached": timings is None, "timings_ms": timings} if debug else None
+        return build_ocr_response(db, user_id, ocr_result, debug_info)
+    finally:
+        db.close()
+
+
+def to_ocr_job_response(job: dict) -> ReceiptOCRJobResponse:
+    return ReceiptOCRJobResponse(
+        job_id=job['id'],
+        status=job['status'],
+        error=job['error'],
+        result=job['result'],
+        created_at=job['created_at'],
+        started_at=job['started_at'],
+        finished_at=job['finished_at']
+    )
+
+
+@router.post("/upload", response_model=Union[ReceiptOCRResponse, ReceiptOCRJobResponse])
 async def upload_receipt(
+    response: Response,
     file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async", description="Queue OCR and return a job to poll"),
+    debug: bool = Query(False, description="Include cache and per-stage timing info"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Upload receipt image, perform OCR, and return structured data."""
+    """
+    Upload receipt image, perform OCR, and return structured data.
+
+    With ?async=true the OCR is queued and a job is returned right away
+    (202); poll /api/receipts/jobs/{job_id} for the result.
+    """
     # Validate file type
     allowed_extensions = ['.jpg', '.jpeg', '.png', '.pdf']
     file_ext = os.path.splitext(file.filename)[1].lower()
@@ -44,65 +203,102 @@ async def upload_receipt(
             detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
         )
 
-    # Check file size
-    content = await file.read()
-    if len(content) > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+    if run_async and ocr_jobs.count_active("ocr") >= settings.OCR_QUEUE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="OCR queue is full, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+
+    # Stream to disk, stopping at the size limit; re-uploads of the same
+    # bytes reuse the file and the OCR result
+    try:
+        digest, file_path, created = await save_upload(
+            file, settings.UPLOAD_DIR, file_ext,
+            max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        )
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE_MB}MB"
         )
+    cache_key = ocr_cache.key_for(digest)
 
-    # Save file
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    file_id = str(uuid.uuid4())
-    file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}{file_ext}")
+    if run_async:
+        job = ocr_jobs.submit(
+            "ocr", run_ocr_job, current_user.id, file_path, created, cache_key, debug,
+            owner_id=current_user.id
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return to_ocr_job_response(job)
 
-    with open(file_path, 'wb') as f:
-        f.write(content)
+    ocr_result = ocr_cache.get(cache_key)
+    if ocr_result is not None:
+        debug_info = {"cached": True, "timings_ms": None} if debug else None
+        return build_ocr_response(db, current_user.id, ocr_result, debug_info)
 
-    # Process OCR
+    # Process OCR in a worker process so the event loop stays free
     try:
-        ocr_result = ocr_service.process_receipt(file_path)
+        ocr_result = await run_ocr(file_path)
     except Exception as e:
         # Clean up file on error
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        discard_upload(file_path, created)
+        if isinstance(e, OCRPoolBusy):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="OCR is busy, please retry shortly",
+                headers={"Retry-After": "5"}
+            )
+        if isinstance(e, TooManyPages):
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        if isinstance(e, UnreadablePDF):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        if isinstance(e, TimeoutError):
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"OCR processing timed out after {settings.OCR_TIMEOUT_SECONDS:g}s"
+            )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"OCR processing failed: {str(e)}"
         )
 
-    # Find matching transactions
-    suggested_matches = []
-    if ocr_result['total'] and ocr_result['date']:
-        matches = TransactionMatcher.find_matching_transactions(
-            db=db,
-            user_id=current_user.id,
-            amount=ocr_result['total'],
-            transaction_date=ocr_result['date'].date(),
-        )
-        suggested_matches = [TransactionResponse.from_orm(m) for m in matches[:5]]
+    timings = finish_ocr(cache_key, ocr_result)
+    debug_info = {"cached": False, "timings_ms": timings} if debug else None
+    return build_ocr_response(db, current_user.id, ocr_result, debug_info)
 
-    # Build response
-    line_items = [
-        ReceiptLineItemBase(
-            description=item['description'],
-            quantity=item['quantity'],
-            price=item['price'],
-            confidence=item['confidence']
+
+@router.get("/metrics")
+def get_ocr_metrics(current_user: User = Depends(get_current_user)):
+    """OCR pipeline counters: per-stage latency, pool/queue load and result cache."""
+    return {
+        "stages": ocr_timings.summary(),
+        "pool": {"pending": ocr_pool.pending, "max_pending": ocr_pool.max_pending},
+        "queue": {"active": ocr_jobs.count_active("ocr"), "max_size": settings.OCR_QUEUE_SIZE},
+        "cache": ocr_cache.memory.stats()
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=ReceiptOCRJobResponse)
+def get_ocr_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Status of a background OCR job; includes the OCR result once it succeeded."""
+    job = ocr_jobs.get(job_id)
+    if not job or job['kind'] != "ocr" or job['owner_id'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="OCR job not found"
         )
-        for item in ocr_result['line_items']
-    ]
 
-    return ReceiptOCRResponse(
-        vendor=ocr_result['vendor'],
-        date=ocr_result['date'].date() if ocr_result['date'] else None,
-        total=ocr_result['total'],
-        line_items=line_items,
-        confidence=ocr_result['confidence'],
-        raw_text=ocr_result['raw_text'],
-        suggested_matches=suggested_matches
-    )
+    return to_ocr_job_response(job)
 
 
 @router.post("/verify", response_model=ReceiptVerifyResponse)
@@ -115,7 +311,7 @@ def verify_receipt(
     # Suggest category based on vendor
     suggested_category = None
     if data.vendor:
-        suggested_category = categorizer.suggest_category(data.vendor)
+        suggested_category = categorizer.suggest_category(data.vendor, user_id=current_user.id)
 
     # Find matching transactions
     suggested_matches = []
@@ -126,7 +322,7 @@ def verify_receipt(
             amount=data.total,
             transaction_date=data.date,
         )
-        suggested_matches = [TransactionResponse.from_orm(m) for m in matches[:5]]
+        suggested_matches = [TransactionResponse.from_orm(m) for m in matches]
 
     return ReceiptVerifyResponse(
         vendor=data.vendor,
@@ -171,7 +367,7 @@ def import_receipt(
         )
     else:
         # Create new transaction from receipt
-        category = categorizer.suggest_category(data.vendor) if data.vendor else 'Other'
+        category = categorizer.suggest_category(data.vendor, user_id=current_user.id) if data.vendor else 'Other'
         transaction = Transaction(
             user_id=current_user.id,
             date=data.date,
@@ -181,6 +377,7 @@ def import_receipt(
         )
         db.add(transaction)
         db.flush()
+        RollupService.add(db, current_user.id, [RollupService.as_row(transaction)])
 
         # Create receipt
         receipt = Receipt(
@@ -208,6 +405,7 @@ def import_receipt(
         )
         db.add(line_item)
 
+    DataVersionService.bump(db, current_user.id)
     db.commit()
     db.refresh(receipt)
 
@@ -222,7 +420,7 @@ def manual_receipt_entry(
 ):
     """Manual receipt entry - returns same preview as OCR verification."""
     # Suggest category
-    suggested_category = categorizer.suggest_category(data.vendor)
+    suggested_category = categorizer.suggest_category(data.vendor, user_id=current_user.id)
 
     # Find matching transactions
     matches = TransactionMatcher.find_matching_transactions(
@@ -231,7 +429,7 @@ def manual_receipt_entry(
         amount=data.total,
         transaction_date=data.date,
     )
-    suggested_matches = [TransactionResponse.from_orm(m) for m in matches[:5]]
+    suggested_matches = [TransactionResponse.from_orm(m) for m in matches]
 
     return ReceiptVerifyResponse(
         vendor=data.vendor,
@@ -243,6 +441,73 @@ def manual_receipt_entry(
     )
 
 
+@router.post("/reconcile", response_model=ReceiptReconcileResponse)
+def reconcile_receipts(
+    data: ReceiptReconcileRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Match many receipts to transactions in one pass, each transaction used once.
+
+    Takes the given (date, total) receipts, or all of the user's stored
+    receipts not yet linked to a transaction. With link=true, stored
+    receipts are linked to their matches.
+    """
+    if data.receipts is not None:
+        if data.link:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="link is only supported when reconciling stored receipts"
+            )
+        stored = [None] * len(data.receipts)
+        receipts = [(item.total, item.date) for item in data.receipts]
+    else:
+        stored = db.query(Receipt).filter(
+            Receipt.user_id == current_user.id,
+            Receipt.transaction_id.is_(None),
+            Receipt.total.isnot(None),
+            Receipt.date.isnot(None)
+        ).order_by(Receipt.id).all()
+        receipts = [(receipt.total, receipt.date) for receipt in stored]
+
+    results = TransactionMatcher.reconcile(
+        db=db,
+        user_id=current_user.id,
+        receipts=receipts,
+        amount_tolerance=data.amount_tolerance,
+        date_tolerance_days=data.date_tolerance_days
+    )
+
+    matches = []
+    linked = 0
+    for index, ((total, receipt_date), receipt, result) in enumerate(zip(receipts, stored, results)):
+        transaction, score = result if result else (None, None)
+        if data.link and transaction is not None:
+            receipt.transaction_id = transaction.id
+            linked += 1
+        matches.append(ReceiptReconcileMatch(
+            index=index,
+            receipt_id=receipt.id if receipt is not None else None,
+            date=receipt_date,
+            total=total,
+            transaction=TransactionResponse.from_orm(transaction) if transaction is not None else None,
+            score=round(score, 4) if score is not None else None
+        ))
+
+    if linked:
+        DataVersionService.bump(db, current_user.id)
+        db.commit()
+
+    matched = sum(1 for result in results if result)
+    return ReceiptReconcileResponse(
+        matched=matched,
+        unmatched=len(results) - matched,
+        linked=linked,
+        matches=matches
+    )
+
+
 @router.get("", response_model=List[ReceiptResponse])
 def get_receipts(
     current_user: User = Depends(get_current_user),
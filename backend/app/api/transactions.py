@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response, status
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+import base64
+import binascii
+from datetime import date
 from ..core.database import get_db
 from ..core.security import get_current_user
 from ..core.config import settings
@@ -12,13 +17,18 @@ from ..schemas.transaction import (
     TransactionUpdate,
     CSVPreviewResponse,
     CSVPreviewRow,
-    CSVImportRequest
+    CSVImportRequest,
+    CSVImportResponse
 )
 from ..services.parser import CSVParser
-from ..services.categorizer import Categorizer
+from ..services.categorizer import get_categorizer
+from ..services.importer import TransactionImporter
+from ..services.rollups import RollupService
+from ..services.versions import DataVersionService
+from ..services.uploads import UploadTooLarge, check_upload_size
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
-categorizer = Categorizer()
+categorizer = get_categorizer()
 
 
 @router.post("/upload", response_model=CSVPreviewResponse)
@@ -29,17 +39,19 @@ async def upload_csv(
 ):
     """Upload CSV and preview transactions."""
     # Check file size
-    content = await file.read()
-    if len(content) > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+    try:
+        check_upload_size(file, settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE_MB}MB"
         )
 
-    # Parse CSV
+    # Parse CSV straight from the spooled upload, off the event loop
     try:
-        content_str = content.decode('utf-8')
-        preview_data = CSVParser.preview_csv(content_str, max_rows=10)
+        preview_data = await run_in_threadpool(
+            CSVParser.preview_csv, file.file, max_rows=10, mode=settings.CSV_PARSE_MODE
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,9 +59,12 @@ async def upload_csv(
         )
 
     # Add suggested categories
+    suggested_categories = categorizer.suggest_categories(
+        [row['description'] for row in preview_data['preview']],
+        user_id=current_user.id
+    )
     preview_rows = []
-    for row in preview_data['preview']:
-        suggested_category = categorizer.suggest_category(row['description'])
+    for row, suggested_category in zip(preview_data['preview'], suggested_categories):
         preview_rows.append(CSVPreviewRow(
             row_number=row['row_number'],
             date=row['date'],
@@ -65,50 +80,118 @@ async def upload_csv(
     )
 
 
-@router.post("/import", response_model=dict)
-async def import_transactions(
+@router.post("/import", response_model=CSVImportResponse)
+def import_transactions(
     data: CSVImportRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Import transactions from CSV preview."""
-    imported_count = 0
-
-    for txn_data in data.transactions:
-        # Suggest category if not provided
-        if not txn_data.category:
-            txn_data.category = categorizer.suggest_category(txn_data.description)
-
-        # Create transaction
-        transaction = Transaction(
-            user_id=current_user.id,
-            date=txn_data.date,
-            description=txn_data.description,
-            amount=txn_data.amount,
-            category=txn_data.category
+    """Import transactions from CSV preview in independently committed chunks."""
+    chunk_size = max(1, data.chunk_size or settings.IMPORT_CHUNK_SIZE)
+
+    # Suggest categories for rows without one, in a single batch
+    suggested_categories = iter(categorizer.suggest_categories(
+        [txn_data.description for txn_data in data.transactions if not txn_data.category],
+        user_id=current_user.id
+    ))
+
+    rows = (
+        {
+            'date': txn_data.date,
+            'description': txn_data.description,
+            'amount': txn_data.amount,
+            'category': txn_data.category or next(suggested_categories),
+        }
+        for txn_data in data.transactions
+    )
+
+    chunks = []
+    try:
+        for progress in TransactionImporter.import_rows(db, current_user.id, rows, chunk_size):
+            chunks.append(progress)
+    except Exception as e:
+        db.rollback()
+        imported_count = chunks[-1]['total_imported'] if chunks else 0
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Import failed after {imported_count} transactions: {str(e)}"
         )
-        db.add(transaction)
-        imported_count += 1
 
-    db.commit()
+    imported_count = chunks[-1]['total_imported'] if chunks else 0
+
+    return CSVImportResponse(
+        message=f"Successfully imported {imported_count} transactions",
+        count=imported_count,
+        chunks=chunks
+    )
 
-    return {
-        "message": f"Successfully imported {imported_count} transactions",
-        "count": imported_count
-    }
+
+def encode_cursor(txn_date: date, transaction_id: int) -> str:
+    """Opaque cursor for the position after a transaction in listing order."""
+    return base64.urlsafe_b64encode(f"{txn_date.isoformat()}:{transaction_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        day, transaction_id = raw.split(':')
+        return date.fromisoformat(day), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
 @router.get("", response_model=List[TransactionResponse])
 def get_transactions(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    category: Optional[str] = None,
+    amount_min: Optional[float] = None,
+    amount_max: Optional[float] = None,
+    skip: int = Query(0, ge=0, description="Offset paging; prefer cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's transactions."""
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id
-    ).order_by(Transaction.date.desc()).offset(skip).limit(limit).all()
+    """
+    Get user's transactions, newest first.
+
+    Pages are keyset-paginated on (date, id): pass the X-Next-Cursor
+    header of one page as `cursor` to get the next, which costs the same
+    however deep the page is. The header is absent on the last page.
+    """
+    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+
+    # Date bounds and the cursor are ranges on ix_transactions_user_date_id
+    # (ix_transactions_user_category_date_id with a category)
+    if category is not None:
+        query = query.filter(Transaction.category == category)
+    if date_from is not None:
+        query = query.filter(Transaction.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Transaction.date <= date_to)
+    if amount_min is not None:
+        query = query.filter(Transaction.amount >= amount_min)
+    if amount_max is not None:
+        query = query.filter(Transaction.amount <= amount_max)
+    if cursor is not None:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < tuple_(after_date, after_id))
+
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    if cursor is None and skip:
+        query = query.offset(skip)
+
+    # One extra row tells whether there is a next page
+    transactions = query.limit(limit + 1).all()
+
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        response.headers['X-Next-Cursor'] = encode_cursor(transactions[-1].date, transactions[-1].id)
 
     return transactions
 
@@ -132,6 +215,8 @@ def update_transaction(
             detail="Transaction not found"
         )
 
+    before = RollupService.as_row(transaction)
+
     # Update fields
     if update_data.category is not None:
         transaction.category = update_data.category
@@ -140,6 +225,11 @@ def update_transaction(
     if update_data.amount is not None:
         transaction.amount = update_data.amount
 
+    after = RollupService.as_row(transaction)
+    if after != before:
+        RollupService.replace(db, current_user.id, before, after)
+    DataVersionService.bump(db, current_user.id)
+
     db.commit()
     db.refresh(transaction)
 
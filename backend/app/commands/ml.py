@@ -0,0 +1,46 @@
+"""
+Train the shared global categorization model.
+
+Users without a model of their own fall back to the global one, which is
+trained from every user's categorized transactions. Run it after deploying
+and periodically (e.g. nightly from cron) to keep it fresh.
+
+Usage (from backend/):
+    python -m app.commands.ml train-global [--max-samples N]
+"""
+import argparse
+import sys
+from typing import List, Optional
+from ..core.config import settings
+from ..core.database import Base, SessionLocal, engine
+from ..services.categorizer import Categorizer, get_categorizer
+from ..services.training import ModelTrainer
+
+
+def main(
+    argv: Optional[List[str]] = None,
+    session_factory=SessionLocal,
+    categorizer: Optional[Categorizer] = None
+) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.commands.ml", description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('action', choices=['train-global'])
+    parser.add_argument(
+        '--max-samples', type=int, default=settings.ML_GLOBAL_MAX_SAMPLES,
+        help="most recent categorized transactions to train on (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    trainer = ModelTrainer(categorizer or get_categorizer(), session_factory=session_factory)
+    try:
+        result = trainer.train_global(max_samples=args.max_samples)
+    except ValueError as e:
+        print(f"Global model not trained: {e}")
+        return 1
+
+    print(f"Trained global model on {result['transactions_used']} transactions")
+    return 0
+
+
+if __name__ == '__main__':
+    Base.metadata.create_all(bind=engine)
+    sys.exit(main())
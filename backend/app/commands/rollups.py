@@ -0,0 +1,53 @@
+"""
+Rebuild or verify the daily_rollups analytics table.
+
+rebuild recomputes rollups from raw transactions (backfill after deploying,
+or repair after drift); check compares them and exits non-zero on mismatch.
+
+Usage (from backend/):
+    python -m app.commands.rollups rebuild [--user-id N]
+    python -m app.commands.rollups check [--user-id N]
+"""
+import argparse
+import sys
+from typing import List, Optional
+from ..core.database import Base, SessionLocal, engine
+from ..services.rollups import RollupService
+
+# Mismatches printed by check before summarizing
+MAX_REPORTED = 20
+
+
+def main(argv: Optional[List[str]] = None, session_factory=SessionLocal) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.commands.rollups", description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('action', choices=['rebuild', 'check'])
+    parser.add_argument('--user-id', type=int, default=None, help="only this user (default: everyone)")
+    args = parser.parse_args(argv)
+
+    db = session_factory()
+    try:
+        if args.action == 'rebuild':
+            rows = RollupService.rebuild(db, args.user_id)
+            db.commit()
+            print(f"Rebuilt daily rollups: {rows} rows")
+            return 0
+
+        mismatches = RollupService.check(db, args.user_id)
+        for mismatch in mismatches[:MAX_REPORTED]:
+            print(
+                f"user {mismatch['user_id']} {mismatch['day']} {mismatch['category'] or '(uncategorized)'}: "
+                f"expected {mismatch['expected']}, stored {mismatch['stored']}"
+            )
+        if mismatches:
+            print(f"{len(mismatches)} rollup rows out of date; run 'rebuild' to fix")
+            return 1
+        print("Daily rollups are consistent")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    # The table may not exist yet if the API has not started since it was added
+    Base.metadata.create_all(bind=engine)
+    sys.exit(main())
@@ -15,6 +15,48 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "/app/uploads"
     MAX_UPLOAD_SIZE_MB: int = 20
 
+    # OCR worker processes, max jobs in flight per API worker, per-job timeout
+    OCR_WORKERS: int = 2
+    OCR_MAX_PENDING: int = 8
+    OCR_TIMEOUT_SECONDS: float = 60.0
+    # Preprocessing: long edge (px) images are scaled to, noise sigma below which denoising is skipped
+    OCR_TARGET_LONG_EDGE: int = 2000
+    OCR_NOISE_THRESHOLD: float = 3.0
+    # OCR engine: "auto" (tesserocr if available), "tesserocr" or "pytesseract"
+    OCR_ENGINE: str = "auto"
+    OCR_TESSDATA_DIR: str = ""
+    # PDF receipts: render resolution, and the most pages OCR'd per document
+    OCR_PDF_DPI: int = 300
+    OCR_PDF_MAX_PAGES: int = 20
+    # Max queued/running background OCR jobs (POST /api/receipts/upload?async=true)
+    OCR_QUEUE_SIZE: int = 100
+    # OCR results cached by SHA-256 of the upload
+    OCR_CACHE_DIR: str = "/app/uploads/ocr_cache"
+    OCR_CACHE_SIZE: int = 1024
+
+    # CSV parsing: "rows" (streaming, pure Python) or "columnar" (pandas)
+    CSV_PARSE_MODE: str = "columnar"
+
+    # Bulk import: rows per insert/commit chunk
+    IMPORT_CHUNK_SIZE: int = 5000
+
+    # Dashboard and budget responses cached per user, by entries and total size
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_MB: int = 64
+
+    # ML categorization
+    ML_MODEL_PATH: str = "/app/uploads/ml_model.pkl"
+    ML_CACHE_SIZE: int = 10000
+    ML_MODEL_RELOAD_SECONDS: float = 2.0
+    ML_USER_MODEL_DIR: str = "/app/uploads/models"
+    ML_USER_MODEL_CACHE_SIZE: int = 100
+    ML_USER_MODEL_CACHE_MB: int = 256
+    # Training runs as background jobs: "full" (TF-IDF refit) or "incremental"
+    ML_TRAINING_MODE: str = "incremental"
+    ML_TRAINING_WORKERS: int = 2
+    # Most recent categorized transactions (all users) the global fallback model is trained on
+    ML_GLOBAL_MAX_SAMPLES: int = 200000
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -9,6 +9,13 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def create_missing_indexes(bind=engine):
+    """create_all() skips indexes on tables that already exist; add any that are missing."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
 def get_db():
     db = SessionLocal()
     try:
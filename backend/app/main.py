@@ -1,15 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .core.database import engine, Base
+from .core.config import settings
+from .core.database import engine, Base, create_missing_indexes
+from .core.middleware import MaxBodySizeMiddleware
 from .api import auth, transactions, receipts, dashboard, budgets, ml
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+create_missing_indexes(engine)
+
+# Allowance for multipart framing on top of MAX_UPLOAD_SIZE_MB
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop background workers so the process exits cleanly
+    receipts.ocr_jobs.shutdown()
+    receipts.ocr_pool.shutdown()
+    ml.training_jobs.shutdown()
+
 
 app = FastAPI(
     title="SmartSpend API",
     version="1.0.0",
-    description="Smart Expense Tracker with Receipt OCR"
+    description="Smart Expense Tracker with Receipt OCR",
+    lifespan=lifespan
+)
+
+# Refuse oversized uploads before the multipart body is spooled
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 + UPLOAD_OVERHEAD_BYTES,
+    paths=["/api/receipts/upload", "/api/transactions/upload"],
 )
 
 # CORS middleware
@@ -19,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
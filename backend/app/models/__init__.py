@@ -1,4 +1,4 @@
 from .user import User
-from .transaction import Transaction, Receipt, ReceiptLineItem, Budget
+from .transaction import Transaction, Receipt, ReceiptLineItem, Budget, DailyRollup, UserDataVersion
 
-__all__ = ["User", "Transaction", "Receipt", "ReceiptLineItem", "Budget"]
+__all__ = ["User", "Transaction", "Receipt", "ReceiptLineItem", "Budget", "DailyRollup", "UserDataVersion"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..core.database import Base
@@ -19,6 +19,14 @@ class Transaction(Base):
     user = relationship("User", back_populates="transactions")
     receipt = relationship("Receipt", back_populates="transaction", uselist=False)
 
+    __table_args__ = (
+        # Receipt matching: per-user date window, then amount
+        Index("ix_transactions_user_date_amount", "user_id", "date", "amount"),
+        # Listing: keyset pages in (date, id) order, optionally within one category
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        Index("ix_transactions_user_category_date_id", "user_id", "category", "date", "id"),
+    )
+
 
 class Receipt(Base):
     __tablename__ = "receipts"
@@ -64,3 +72,29 @@ class Budget(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="budgets")
+
+
+class DailyRollup(Base):
+    """
+    Per user, day and category totals of transactions, kept in step with
+    every write (see services/rollups.py) so analytics never scan raw rows.
+    """
+    __tablename__ = "daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)  # '' for uncategorized
+    income_sum = Column(Float, nullable=False, default=0.0)   # sum of positive amounts
+    expense_sum = Column(Float, nullable=False, default=0.0)  # sum of negative amounts, as a positive number
+    count = Column(Integer, nullable=False, default=0)
+
+
+class UserDataVersion(Base):
+    """
+    Counter bumped by every write to a user's transactions, receipts or
+    budgets; cached responses built from an older version are stale.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
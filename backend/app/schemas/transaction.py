@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import List, Optional
+from datetime import date as DateType
+from typing import Any, Dict, List, Optional
 
 
 class TransactionBase(BaseModel):
@@ -45,6 +46,19 @@ class CSVPreviewResponse(BaseModel):
 
 class CSVImportRequest(BaseModel):
     transactions: List[TransactionCreate]
+    chunk_size: Optional[int] = None
+
+
+class CSVImportChunk(BaseModel):
+    chunk: int
+    count: int
+    total_imported: int
+
+
+class CSVImportResponse(BaseModel):
+    message: str
+    count: int
+    chunks: List[CSVImportChunk]
 
 
 class ReceiptLineItemBase(BaseModel):
@@ -63,17 +77,28 @@ class ReceiptLineItemResponse(ReceiptLineItemBase):
 
 class ReceiptOCRResponse(BaseModel):
     vendor: Optional[str] = None
-    date: Optional[date] = None
+    date: Optional[DateType] = None  # plain `date` is shadowed by the field name here
     total: Optional[float] = None
     line_items: List[ReceiptLineItemBase] = []
     confidence: float
     raw_text: str
     suggested_matches: List[TransactionResponse] = []
+    debug: Optional[Dict[str, Any]] = None
+
+
+class ReceiptOCRJobResponse(BaseModel):
+    job_id: str
+    status: str
+    error: Optional[str] = None
+    result: Optional[ReceiptOCRResponse] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class ReceiptVerifyRequest(BaseModel):
     vendor: Optional[str] = None
-    date: Optional[date] = None
+    date: Optional[DateType] = None  # plain `date` is shadowed by the field name here
     total: Optional[float] = None
     line_items: List[ReceiptLineItemBase] = []
 
@@ -119,6 +144,36 @@ class ManualReceiptCreate(BaseModel):
     line_items: List[ReceiptLineItemBase] = []
 
 
+class ReceiptReconcileItem(BaseModel):
+    date: date
+    total: float
+
+
+class ReceiptReconcileRequest(BaseModel):
+    # Receipts to match; when omitted, the user's unlinked stored receipts
+    receipts: Optional[List[ReceiptReconcileItem]] = None
+    # Link stored receipts to their matched transactions
+    link: bool = False
+    amount_tolerance: float = Field(0.05, ge=0, le=1)
+    date_tolerance_days: int = Field(3, ge=0, le=31)
+
+
+class ReceiptReconcileMatch(BaseModel):
+    index: int
+    receipt_id: Optional[int] = None
+    date: date
+    total: float
+    transaction: Optional[TransactionResponse] = None
+    score: Optional[float] = None
+
+
+class ReceiptReconcileResponse(BaseModel):
+    matched: int
+    unmatched: int
+    linked: int = 0
+    matches: List[ReceiptReconcileMatch]
+
+
 class BudgetCreate(BaseModel):
     category: str
     amount: float
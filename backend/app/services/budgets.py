@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from ..models.transaction import Budget, DailyRollup
+
+SpendingKey = Tuple[str, date]
+
+
+class BudgetStatusService:
+    """Budgets with their spending in the current period, shared by the budgets and dashboard endpoints."""
+
+    @staticmethod
+    def period_start(period: str, today: Optional[date] = None) -> date:
+        """First day of the budget period containing today."""
+        today = today or date.today()
+        if period == 'monthly':
+            return today.replace(day=1)
+        if period == 'weekly':
+            return today - timedelta(days=today.weekday())
+        return today.replace(month=1, day=1)  # yearly
+
+    @staticmethod
+    def spending(db: Session, user_id: int, keys: Iterable[SpendingKey]) -> Dict[SpendingKey, float]:
+        """
+        Spending per (category, period start), all in one grouped query.
+
+        Budgets only ever start on a handful of distinct days, so each
+        distinct start becomes one conditional SUM column, grouped by
+        category.
+        """
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        starts = sorted({start for _, start in keys})
+        columns = [
+            func.coalesce(func.sum(case((DailyRollup.day >= start, DailyRollup.expense_sum), else_=0.0)), 0.0)
+            for start in starts
+        ]
+        rows = db.query(DailyRollup.category, *columns).filter(
+            DailyRollup.user_id == user_id,
+            DailyRollup.category.in_({category for category, _ in keys}),
+            DailyRollup.day >= starts[0]
+        ).group_by(DailyRollup.category).all()
+
+        by_category = {row[0]: dict(zip(starts, row[1:])) for row in rows}
+        return {
+            (category, start): by_category.get(category, {}).get(start, 0.0)
+            for category, start in keys
+        }
+
+    @staticmethod
+    def statuses(db: Session, user_id: int, today: Optional[date] = None) -> List[dict]:
+        """
+        The user's budgets with spent, remaining and percentage used.
+
+        Returns one dict per budget: the Budget under 'budget' plus the
+        figures, in budget id order.
+        """
+        today = today or date.today()
+        budgets = db.query(Budget).filter(Budget.user_id == user_id).order_by(Budget.id).all()
+
+        keys = [
+            (budget.category, BudgetStatusService.period_start(budget.period, today))
+            for budget in budgets
+        ]
+        spent_by_key = BudgetStatusService.spending(db, user_id, keys)
+
+        statuses = []
+        for budget, key in zip(budgets, keys):
+            spent = spent_by_key[key]
+            percentage = (spent / budget.amount * 100) if budget.amount > 0 else 0
+            statuses.append({
+                'budget': budget,
+                'spent': spent,
+                'remaining': max(0, budget.amount - spent),
+                'percentage': round(percentage, 1),
+            })
+
+        return statuses
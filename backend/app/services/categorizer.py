@@ -1,9 +1,13 @@
-import pickle
-import os
-from typing import Optional, List
+import threading
+import time
+from typing import Hashable, Optional, List, Tuple
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
+from ..core.config import settings
+from .keywords import KeywordMatcher
+from .cache import LRUCache
+from .model_store import ModelStore, file_signature, read_model, write_model
 
 
 class Categorizer:
@@ -22,82 +26,231 @@ class Categorizer:
         'Other': []
     }
 
-    def __init__(self, model_path: str = '/app/uploads/ml_model.pkl'):
+    # Max memoized (description, model version) predictions
+    CACHE_SIZE = 10000
+
+    # Seconds between checks of the model file for changes made by other workers
+    RELOAD_INTERVAL = 2.0
+
+    # Users with fewer categorized transactions use the shared global model
+    MIN_TRAINING_SAMPLES = 10
+
+    def __init__(
+        self,
+        model_path: str = '/app/uploads/ml_model.pkl',
+        cache_size: int = CACHE_SIZE,
+        reload_interval: float = RELOAD_INTERVAL,
+        model_store: Optional[ModelStore] = None
+    ):
         self.model_path = model_path
-        self.model: Optional[Pipeline] = None
+        self.reload_interval = reload_interval
+        self.model_store = model_store
+        self.keyword_matcher = KeywordMatcher(self.CATEGORY_KEYWORDS)
+        self.cache = LRUCache(maxsize=cache_size)
+
+        # (model, version) is swapped as one tuple so readers never see a mix
+        self._state: Tuple[Optional[Pipeline], int] = (None, 0)
+        self._signature = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
         self._load_model()
 
+    @property
+    def model(self) -> Optional[Pipeline]:
+        return self._state[0]
+
+    @model.setter
+    def model(self, model: Optional[Pipeline]):
+        self._swap_model(model)
+
+    @property
+    def model_version(self) -> int:
+        return self._state[1]
+
+    def _swap_model(self, model: Optional[Pipeline]):
+        """Publish a new model; in-flight predictions keep using the old one."""
+        self._state = (model, self._state[1] + 1)
+        self.cache.clear()
+
     def _load_model(self):
         """Load trained ML model if exists."""
-        if os.path.exists(self.model_path):
-            try:
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-            except Exception:
-                self.model = None
-        else:
-            self.model = None
+        signature = file_signature(self.model_path)
+        model = read_model(self.model_path) if signature is not None else None
 
-    def categorize_by_rules(self, description: str) -> Optional[str]:
-        """Categorize using keyword rules."""
-        description_lower = description.lower()
+        self._signature = signature
+        self._swap_model(model)
 
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in description_lower:
-                    return category
+    def refresh_model(self, force: bool = False):
+        """
+        Reload the model if its file changed since it was loaded.
+
+        Checks are throttled to one per reload_interval. Only one thread
+        reloads at a time; the others carry on with the current model.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
 
-        return None
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + self.reload_interval
+            if file_signature(self.model_path) != self._signature:
+                self._load_model()
+        finally:
+            self._reload_lock.release()
+
+    @staticmethod
+    def normalize(description: str) -> str:
+        """Normalized form used for matching and as the cache key."""
+        return description.strip().lower()
+
+    def categorize_by_rules(self, description: str) -> Optional[str]:
+        """Categorize using keyword rules (first matching category wins)."""
+        return self.keyword_matcher.match(description)
 
     def categorize_by_ml(self, description: str) -> Optional[str]:
         """Categorize using ML model."""
-        if self.model is None:
+        model = self.model
+        if model is None:
             return None
 
         try:
-            prediction = self.model.predict([description])
+            prediction = model.predict([description])
             return prediction[0]
         except Exception:
             return None
 
-    def categorize(self, description: str) -> str:
+    def _resolve_model(self, user_id: Optional[int]) -> Tuple[Optional[Pipeline], Hashable]:
+        """
+        Pick the user's own model if they have one, else the global model.
+
+        Returns (model, scope) where scope identifies the exact model version
+        for the prediction cache.
+        """
+        if user_id is not None and self.model_store is not None:
+            model, signature = self.model_store.get(user_id)
+            if model is not None:
+                return model, ('user', user_id, signature)
+
+        self.refresh_model()
+        model, version = self._state
+        return model, ('global', version)
+
+    def categorize(self, description: str, user_id: Optional[int] = None) -> str:
         """
         Categorize transaction using rules first, then ML fallback.
 
         Returns category name.
         """
+        return self.categorize_many([description], user_id=user_id)[0]
+
+    def categorize_many(self, descriptions: List[str], user_id: Optional[int] = None) -> List[str]:
+        """
+        Categorize a batch of descriptions.
+
+        Results are memoized per normalized description and model version.
+        On a miss, rules are applied first; only descriptions without a rule
+        match go to the ML model (the user's own, or the global fallback),
+        in a single predict call.
+
+        Returns category names in input order.
+        """
+        model, scope = self._resolve_model(user_id)
+
+        keys = [self.normalize(description) for description in descriptions]
+        categories = [self.cache.get((key, scope)) for key in keys]
+
+        # Each distinct uncached description is computed once
+        missing = list(dict.fromkeys(key for key, category in zip(keys, categories) if category is None))
+        if missing:
+            computed = dict(zip(missing, self._categorize_uncached(missing, model)))
+            for key, category in computed.items():
+                self.cache.put((key, scope), category)
+            categories = [category or computed[key] for key, category in zip(keys, categories)]
+
+        return categories
+
+    def _categorize_uncached(self, descriptions: List[str], model: Optional[Pipeline]) -> List[str]:
+        """Rules first, then one batched ML predict for the rest."""
         # Try rule-based first
-        category = self.categorize_by_rules(description)
-        if category:
-            return category
+        categories = [self.categorize_by_rules(description) for description in descriptions]
 
-        # Fall back to ML
-        category = self.categorize_by_ml(description)
-        if category:
-            return category
+        # Fall back to ML for the rest
+        pending = [idx for idx, category in enumerate(categories) if not category]
+        if pending and model is not None:
+            try:
+                predictions = model.predict([descriptions[idx] for idx in pending])
+            except Exception:
+                predictions = []
+
+            for idx, prediction in zip(pending, predictions):
+                categories[idx] = prediction
 
         # Default
-        return 'Other'
+        return [category or 'Other' for category in categories]
+
+    def train_model(self, descriptions: List[str], categories: List[str], user_id: Optional[int] = None):
+        """
+        Train ML model on transaction data.
 
-    def train_model(self, descriptions: List[str], categories: List[str]):
-        """Train ML model on user's transaction data."""
-        if len(descriptions) < 10:
-            raise ValueError("Need at least 10 transactions to train model")
+        With a user_id the model is stored as that user's own model; without
+        one it replaces the shared global model.
+        """
+        if len(descriptions) < self.MIN_TRAINING_SAMPLES:
+            raise ValueError(f"Need at least {self.MIN_TRAINING_SAMPLES} transactions to train model")
 
         # Create pipeline
-        self.model = Pipeline([
+        model = Pipeline([
             ('tfidf', TfidfVectorizer(max_features=100, ngram_range=(1, 2))),
             ('clf', LogisticRegression(max_iter=1000, random_state=42))
         ])
 
-        # Train
-        self.model.fit(descriptions, categories)
+        # Train off to the side; predictions keep using the current model
+        model.fit(descriptions, categories)
+        self.save_model(model, user_id=user_id)
 
-        # Save model
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(self.model, f)
+    def save_model(self, model, user_id: Optional[int] = None):
+        """Persist a trained model as the user's own (or the global) model and swap it in."""
+        if user_id is not None and self.model_store is not None:
+            self.model_store.save(user_id, model)
+        else:
+            self._signature = write_model(self.model_path, model)
+            self._swap_model(model)
 
-    def suggest_category(self, description: str) -> str:
+    def suggest_category(self, description: str, user_id: Optional[int] = None) -> str:
         """Alias for categorize method."""
-        return self.categorize(description)
+        return self.categorize(description, user_id=user_id)
+
+    def suggest_categories(self, descriptions: List[str], user_id: Optional[int] = None) -> List[str]:
+        """Alias for categorize_many method."""
+        return self.categorize_many(descriptions, user_id=user_id)
+
+
+_shared_categorizer: Optional[Categorizer] = None
+_shared_lock = threading.Lock()
+
+
+def get_categorizer() -> Categorizer:
+    """
+    Process-wide categorizer shared by every router.
+
+    The model is loaded once per worker; retraining in any router (or in
+    another worker) is picked up by all of them.
+    """
+    global _shared_categorizer
+    if _shared_categorizer is None:
+        with _shared_lock:
+            if _shared_categorizer is None:
+                model_store = ModelStore(
+                    model_dir=settings.ML_USER_MODEL_DIR,
+                    max_models=settings.ML_USER_MODEL_CACHE_SIZE,
+                    max_bytes=settings.ML_USER_MODEL_CACHE_MB * 1024 * 1024
+                )
+                _shared_categorizer = Categorizer(
+                    model_path=settings.ML_MODEL_PATH,
+                    cache_size=settings.ML_CACHE_SIZE,
+                    reload_interval=settings.ML_MODEL_RELOAD_SECONDS,
+                    model_store=model_store
+                )
+    return _shared_categorizer
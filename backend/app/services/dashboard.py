@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from ..models.transaction import DailyRollup
+from .rollups import RollupService
+
+
+class DashboardAggregator:
+    """
+    Dashboard figures read from daily_rollups, so their cost depends on the
+    number of days and categories, not transactions.
+    """
+
+    # Balance periods, in response order
+    PERIODS = ('daily', 'weekly', 'monthly')
+
+    @staticmethod
+    def period_starts(today: Optional[date] = None) -> Dict[str, date]:
+        """First day of today's day, week (Monday) and month."""
+        today = today or date.today()
+        return {
+            'daily': today,
+            'weekly': today - timedelta(days=today.weekday()),
+            'monthly': today.replace(day=1),
+        }
+
+    @staticmethod
+    def totals(db: Session, user_id: int, today: Optional[date] = None) -> Dict:
+        """
+        Transaction count, all-time income/spending and per-period balances,
+        as one aggregate row.
+        """
+        starts = DashboardAggregator.period_starts(today)
+
+        def total(column, since=None):
+            if since is not None:
+                column = case((DailyRollup.day >= since, column), else_=0.0)
+            return func.coalesce(func.sum(column), 0)
+
+        columns = [
+            total(DailyRollup.count),
+            total(DailyRollup.income_sum),
+            total(DailyRollup.expense_sum),
+        ]
+        for period in DashboardAggregator.PERIODS:
+            columns.append(total(DailyRollup.income_sum, starts[period]))
+            columns.append(total(DailyRollup.expense_sum, starts[period]))
+
+        row = db.query(*columns).filter(DailyRollup.user_id == user_id).one()
+
+        balance_periods = []
+        for index, period in enumerate(DashboardAggregator.PERIODS):
+            income, expenses = row[3 + 2 * index], row[4 + 2 * index]
+            balance_periods.append({
+                'period': period,
+                'income': income,
+                'expenses': expenses,
+                'balance': income - expenses
+            })
+
+        return {
+            'total_transactions': row[0],
+            'total_income': row[1],
+            'total_spent': row[2],
+            'balance_periods': balance_periods,
+        }
+
+    @staticmethod
+    def category_breakdown(db: Session, user_id: int) -> Dict[str, float]:
+        """Total spending per category (uncategorized counts as 'Other')."""
+        category = func.coalesce(func.nullif(DailyRollup.category, ''), 'Other')
+        spent = func.sum(DailyRollup.expense_sum)
+        rows: List = db.query(category, spent).filter(
+            DailyRollup.user_id == user_id
+        ).group_by(category).having(
+            spent > RollupService.EPSILON  # Only categories with expenses
+        ).order_by(category).all()
+
+        return {name: total for name, total in rows}
+
@@ -0,0 +1,127 @@
+import csv
+from datetime import datetime
+from io import StringIO
+from itertools import islice
+from typing import Iterable, Iterator, List
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models.transaction import Transaction
+from .rollups import RollupService
+from .versions import DataVersionService
+
+
+class TransactionImporter:
+    """Chunked bulk ingestion of transactions, bypassing the ORM unit of work."""
+
+    COPY_COLUMNS = ('user_id', 'date', 'description', 'amount', 'category', 'created_at', 'updated_at')
+    # Columns that may be NULL, and the CSV marker COPY loads as NULL for them
+    COPY_NULLABLE_COLUMNS = ('category',)
+    COPY_NULL = '\\N'
+
+    @staticmethod
+    def supports_copy(db: Session) -> bool:
+        """COPY is only available on PostgreSQL."""
+        return db.get_bind().dialect.name == 'postgresql'
+
+    @staticmethod
+    def iter_chunks(rows: Iterable[dict], chunk_size: int) -> Iterator[List[dict]]:
+        """Split rows into lists of at most chunk_size items."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def insert_chunk(db: Session, rows: List[dict]):
+        """Insert rows with a single Core executemany."""
+        db.execute(insert(Transaction.__table__), rows)
+
+    @staticmethod
+    def copy_buffer(rows: List[dict]) -> StringIO:
+        """
+        CSV for COPY. Every string is quoted, so an empty description stays '',
+        and None is written as the COPY_NULL marker.
+        """
+        buffer = StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow([
+                TransactionImporter.COPY_NULL if row[column] is None else row[column]
+                for column in TransactionImporter.COPY_COLUMNS
+            ])
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def copy_statement() -> str:
+        # QUOTE_NONNUMERIC quotes the marker too, and a quoted field only
+        # matches the NULL string for FORCE_NULL columns
+        columns = ', '.join(TransactionImporter.COPY_COLUMNS)
+        nullable = ', '.join(TransactionImporter.COPY_NULLABLE_COLUMNS)
+        return (
+            f"COPY {Transaction.__tablename__} ({columns}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{TransactionImporter.COPY_NULL}', FORCE_NULL ({nullable}))"
+        )
+
+    @staticmethod
+    def copy_chunk(db: Session, rows: List[dict]):
+        """Stream rows into PostgreSQL with COPY ... FROM STDIN."""
+        dbapi_connection = db.connection().connection
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(TransactionImporter.copy_statement(), TransactionImporter.copy_buffer(rows))
+
+    @staticmethod
+    def import_rows(
+        db: Session,
+        user_id: int,
+        rows: Iterable[dict],
+        chunk_size: int = 5000,
+        use_copy: bool = True
+    ) -> Iterator[dict]:
+        """
+        Import transactions in independently committed chunks.
+
+        Args:
+            db: Database session
+            user_id: Owner of the imported transactions
+            rows: Dicts with date, description, amount and category
+            chunk_size: Rows per chunk / commit
+            use_copy: Use COPY when the database supports it
+
+        Yields:
+            Progress dict after each committed chunk
+        """
+        write_chunk = TransactionImporter.insert_chunk
+        if use_copy and TransactionImporter.supports_copy(db):
+            write_chunk = TransactionImporter.copy_chunk
+
+        imported = 0
+        for chunk_number, chunk in enumerate(TransactionImporter.iter_chunks(rows, chunk_size), start=1):
+            now = datetime.utcnow()
+            values = [
+                {
+                    'user_id': user_id,
+                    'date': row['date'],
+                    'description': row['description'],
+                    'amount': row['amount'],
+                    'category': row.get('category'),
+                    'created_at': now,
+                    'updated_at': now,
+                }
+                for row in chunk
+            ]
+
+            write_chunk(db, values)
+            # Rollups commit with their chunk, so they never count rows that were rolled back
+            RollupService.add(db, user_id, values)
+            DataVersionService.bump(db, user_id)
+            db.commit()
+
+            imported += len(values)
+            yield {
+                'chunk': chunk_number,
+                'count': len(values),
+                'total_imported': imported,
+            }
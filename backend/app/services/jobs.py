@@ -0,0 +1,102 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+
+class JobRunner:
+    """
+    Runs work in a background thread pool and tracks it by job ID.
+
+    Job records are kept in memory (per worker process). Only the most recent
+    max_jobs records are kept; the oldest finished ones are dropped first.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000, name: str = 'jobs'):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, owner_id: Optional[int] = None, **kwargs) -> dict:
+        """Queue fn(*args, **kwargs) and return a snapshot of its job record."""
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'owner_id': owner_id,
+            'status': self.QUEUED,
+            'result': None,
+            'error': None,
+            'created_at': datetime.utcnow(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._prune()
+            snapshot = dict(job)
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return snapshot
+
+    def _run(self, job: dict, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        self._update(job, status=self.RUNNING, started_at=datetime.utcnow())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._update(job, status=self.FAILED, error=str(e), finished_at=datetime.utcnow())
+        else:
+            self._update(job, status=self.SUCCEEDED, result=result, finished_at=datetime.utcnow())
+
+    def _update(self, job: dict, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_jobs."""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job['status'] in (self.SUCCEEDED, self.FAILED)
+        ]
+        for job_id in finished[:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Snapshot of a job record, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def find_active(self, kind: str, owner_id: Optional[int]) -> Optional[dict]:
+        """The queued or running job of this kind for an owner, if any."""
+        with self._lock:
+            for job in self._jobs.values():
+                if (
+                    job['kind'] == kind
+                    and job['owner_id'] == owner_id
+                    and job['status'] in (self.QUEUED, self.RUNNING)
+                ):
+                    return dict(job)
+        return None
+
+    def count_active(self, kind: str) -> int:
+        """Number of queued or running jobs of a kind."""
+        with self._lock:
+            return sum(
+                1 for job in self._jobs.values()
+                if job['kind'] == kind and job['status'] in (self.QUEUED, self.RUNNING)
+            )
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool; jobs that have not started are dropped."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
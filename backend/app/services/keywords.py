@@ -0,0 +1,81 @@
+import re
+from typing import Dict, List, Optional
+
+
+class KeywordMatcher:
+    """
+    Match text against many category keywords in a single scan.
+
+    The keywords are compiled into one trie-shaped regex, so the cost per
+    description depends on its length rather than on how many keywords there
+    are. When several keywords occur, the category listed first wins, exactly
+    like checking each category's keywords in order.
+    """
+
+    TERMINAL = ''
+
+    def __init__(self, category_keywords: Dict[str, List[str]]):
+        self.categories = list(category_keywords)
+
+        # Build a character trie; terminal nodes store the best category rank
+        trie: dict = {}
+        for rank, keywords in enumerate(category_keywords.values()):
+            for keyword in keywords:
+                node = trie
+                for char in keyword.lower():
+                    node = node.setdefault(char, {})
+                node.setdefault(self.TERMINAL, rank)
+
+        self._ranks = self._keyword_ranks(trie)
+        self._pattern = re.compile(f"(?=({self._trie_pattern(trie)}))") if self._ranks else None
+
+    @classmethod
+    def _keyword_ranks(cls, trie: dict) -> Dict[str, int]:
+        """
+        Map each keyword to the best rank among itself and its prefixes.
+
+        The regex reports the longest keyword starting at a position; any
+        shorter keyword found there is one of its prefixes.
+        """
+        ranks = {}
+        stack = [(trie, '', None)]
+        while stack:
+            node, prefix, best = stack.pop()
+            if cls.TERMINAL in node:
+                best = node[cls.TERMINAL] if best is None else min(best, node[cls.TERMINAL])
+                ranks[prefix] = best
+            for char, child in node.items():
+                if char != cls.TERMINAL:
+                    stack.append((child, prefix + char, best))
+        return ranks
+
+    @classmethod
+    def _trie_pattern(cls, node: dict) -> str:
+        """Render a trie node as a regex that prefers the longest keyword."""
+        branches = [
+            re.escape(char) + cls._trie_pattern(child)
+            for char, child in sorted(node.items())
+            if char != cls.TERMINAL
+        ]
+        if not branches:
+            return ''
+
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if cls.TERMINAL in node:
+            pattern = f"(?:{pattern})?"
+        return pattern
+
+    def match(self, text: str) -> Optional[str]:
+        """Return the highest-priority category with a keyword in text."""
+        if self._pattern is None:
+            return None
+
+        best = None
+        for found in self._pattern.finditer(text.lower()):
+            rank = self._ranks[found.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+
+        return self.categories[best] if best is not None else None
@@ -1,12 +1,41 @@
+from bisect import bisect_left, bisect_right, insort
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import case, func, literal
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from ..models.transaction import Transaction
+from ..models.transaction import Receipt, Transaction
 
 
 class TransactionMatcher:
     """Fuzzy matching service for receipts to transactions."""
 
+    # Weights of the amount and date similarity in the match score
+    AMOUNT_WEIGHT = 0.6
+    DATE_WEIGHT = 0.4
+
+    # Suggestions returned per receipt
+    DEFAULT_LIMIT = 5
+
+    @staticmethod
+    def score(
+        txn_amount: float,
+        txn_date: date,
+        amount: float,
+        transaction_date: date,
+        date_tolerance_days: int = 3
+    ) -> float:
+        """Similarity of a transaction to a receipt; Python twin of the SQL score below."""
+        amount_score = 1 - abs(txn_amount - amount) / abs(amount) if amount != 0 else 1.0
+        if date_tolerance_days > 0:
+            date_score = 1 - abs((txn_date - transaction_date).days) / date_tolerance_days
+        else:
+            date_score = 1.0
+        return (
+            max(0.0, amount_score) * TransactionMatcher.AMOUNT_WEIGHT
+            + max(0.0, date_score) * TransactionMatcher.DATE_WEIGHT
+        )
+
     @staticmethod
     def find_matching_transactions(
         db: Session,
@@ -14,11 +43,15 @@ class TransactionMatcher:
         amount: float,
         transaction_date: date,
         amount_tolerance: float = 0.05,
-        date_tolerance_days: int = 3
-    ) -> List[Transaction]:
+        date_tolerance_days: int = 3,
+        limit: int = DEFAULT_LIMIT
+    ) -> List[Row]:
         """
         Find transactions that match receipt by amount and date.
 
+        Scoring, ordering and the limit all happen in the database, which
+        only returns the top rows, with the transaction columns and score.
+
         Args:
             db: Database session
             user_id: User ID
@@ -26,9 +59,10 @@ class TransactionMatcher:
             transaction_date: Receipt date
             amount_tolerance: Amount tolerance (default ±5%)
             date_tolerance_days: Date tolerance in days (default ±3 days)
+            limit: Maximum number of matches returned
 
         Returns:
-            List of matching transactions, ranked by similarity
+            Matching transaction rows, best match first
         """
         # Calculate amount range
         amount_min = amount * (1 - amount_tolerance)
@@ -38,28 +72,135 @@ class TransactionMatcher:
         date_min = transaction_date - timedelta(days=date_tolerance_days)
         date_max = transaction_date + timedelta(days=date_tolerance_days)
 
-        # Query matching transactions
-        matches = db.query(Transaction).filter(
+        # Similarity (0-1, 1 is exact match); within the window neither goes below 0
+        if amount != 0:
+            amount_score = 1 - func.abs(Transaction.amount - amount) / abs(amount)
+        else:
+            amount_score = literal(1.0)
+
+        # Day offsets are few, so the date score is a lookup rather than
+        # dialect-specific date arithmetic
+        if date_tolerance_days > 0:
+            date_score = case(
+                {
+                    transaction_date + timedelta(days=offset): 1 - abs(offset) / date_tolerance_days
+                    for offset in range(-date_tolerance_days, date_tolerance_days + 1)
+                },
+                value=Transaction.date,
+                else_=0.0
+            )
+        else:
+            date_score = literal(1.0)
+
+        score = (
+            amount_score * TransactionMatcher.AMOUNT_WEIGHT
+            + date_score * TransactionMatcher.DATE_WEIGHT
+        ).label('score')
+
+        # Range scan on ix_transactions_user_date_amount
+        return db.query(
+            Transaction.id,
+            Transaction.user_id,
+            Transaction.date,
+            Transaction.description,
+            Transaction.amount,
+            Transaction.category,
+            Transaction.created_at,
+            score
+        ).filter(
             Transaction.user_id == user_id,
             Transaction.amount >= amount_min,
             Transaction.amount <= amount_max,
             Transaction.date >= date_min,
             Transaction.date <= date_max
-        ).all()
+        ).order_by(
+            score.desc(),
+            Transaction.id
+        ).limit(limit).all()
 
-        # Sort by similarity (closer amount and date = better match)
-        def similarity_score(txn: Transaction) -> float:
-            # Amount similarity (0-1, 1 is exact match)
-            amount_diff = abs(txn.amount - amount) / amount if amount != 0 else 0
-            amount_score = max(0, 1 - amount_diff)
+    @staticmethod
+    def reconcile(
+        db: Session,
+        user_id: int,
+        receipts: Sequence[Tuple[float, date]],
+        amount_tolerance: float = 0.05,
+        date_tolerance_days: int = 3
+    ) -> List[Optional[Tuple[Row, float]]]:
+        """
+        Match many receipts to transactions at once, each transaction used once.
+
+        The user's candidate transactions (those not already linked to a
+        receipt) are loaded with one query, sorted by date. Receipts are then
+        swept in date order against a sliding date window whose transactions
+        are kept sorted by amount, so each receipt's candidates are a bisect
+        away. Candidate pairs are assigned greedily, best score first.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            receipts: (total, date) per receipt
+            amount_tolerance: Amount tolerance (default ±5%)
+            date_tolerance_days: Date tolerance in days (default ±3 days)
+
+        Returns:
+            Per receipt, in input order: (transaction row, score), or None
+        """
+        if not receipts:
+            return []
+
+        tolerance = timedelta(days=date_tolerance_days)
+        amounts = [amount for amount, _ in receipts]
+        dates = [receipt_date for _, receipt_date in receipts]
+
+        linked = db.query(Receipt.transaction_id).filter(
+            Receipt.user_id == user_id,
+            Receipt.transaction_id.isnot(None)
+        )
+        candidates = db.query(
+            Transaction.id,
+            Transaction.user_id,
+            Transaction.date,
+            Transaction.description,
+            Transaction.amount,
+            Transaction.category,
+            Transaction.created_at
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.date >= min(dates) - tolerance,
+            Transaction.date <= max(dates) + tolerance,
+            Transaction.amount >= min(amount * (1 - amount_tolerance) for amount in amounts),
+            Transaction.amount <= max(amount * (1 + amount_tolerance) for amount in amounts),
+            Transaction.id.notin_(linked)
+        ).order_by(Transaction.date, Transaction.id).all()
 
-            # Date similarity (0-1, 1 is exact match)
-            date_diff = abs((txn.date - transaction_date).days)
-            date_score = max(0, 1 - (date_diff / date_tolerance_days))
+        # Sweep: the window holds (amount, index) for candidates within
+        # ±date_tolerance_days of the current receipt
+        pairs = []
+        window: List[Tuple[float, int]] = []
+        added = removed = 0
+        for receipt_index in sorted(range(len(receipts)), key=lambda i: dates[i]):
+            amount, receipt_date = receipts[receipt_index]
+            while added < len(candidates) and candidates[added].date <= receipt_date + tolerance:
+                insort(window, (candidates[added].amount, added))
+                added += 1
+            while removed < added and candidates[removed].date < receipt_date - tolerance:
+                del window[bisect_left(window, (candidates[removed].amount, removed))]
+                removed += 1
 
-            # Combined score
-            return (amount_score * 0.6) + (date_score * 0.4)
+            low = bisect_left(window, (amount * (1 - amount_tolerance), -1))
+            high = bisect_right(window, (amount * (1 + amount_tolerance), len(candidates)))
+            for _, candidate_index in window[low:high]:
+                txn = candidates[candidate_index]
+                score = TransactionMatcher.score(txn.amount, txn.date, amount, receipt_date, date_tolerance_days)
+                pairs.append((-score, receipt_index, txn.id, candidate_index))
 
-        matches.sort(key=similarity_score, reverse=True)
+        # One-to-one: best pairs first; ties go to the earlier receipt, then lower id
+        pairs.sort()
+        matches: List[Optional[Tuple[Row, float]]] = [None] * len(receipts)
+        used = set()
+        for negative_score, receipt_index, _, candidate_index in pairs:
+            if matches[receipt_index] is None and candidate_index not in used:
+                matches[receipt_index] = (candidates[candidate_index], -negative_score)
+                used.add(candidate_index)
 
         return matches
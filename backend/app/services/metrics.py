@@ -0,0 +1,44 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict
+
+import numpy as np
+
+
+class StageTimings:
+    """Rolling per-stage latency samples (ms) with summary percentiles."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, timings: Dict[str, float]):
+        """Add one run's stage durations."""
+        with self._lock:
+            for stage, ms in timings.items():
+                self._samples[stage].append(ms)
+                self._counts[stage] += 1
+
+    def summary(self) -> Dict[str, dict]:
+        """Per-stage count (all time) and stats over the last `window` runs."""
+        with self._lock:
+            snapshot = {stage: (self._counts[stage], list(samples)) for stage, samples in self._samples.items()}
+
+        summary = {}
+        for stage, (count, samples) in snapshot.items():
+            values = np.array(samples)
+            summary[stage] = {
+                'count': count,
+                'mean_ms': round(float(values.mean()), 2),
+                'p50_ms': round(float(np.percentile(values, 50)), 2),
+                'p95_ms': round(float(np.percentile(values, 95)), 2),
+                'max_ms': round(float(values.max()), 2),
+            }
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
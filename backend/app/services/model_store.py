@@ -0,0 +1,115 @@
+import fcntl
+import os
+import pickle
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Tuple
+from .cache import LRUCache
+
+ModelSignature = Tuple[int, int]
+
+
+def file_signature(path: str) -> Optional[ModelSignature]:
+    """Cheap identity of a model file: (mtime, size), or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_model(path: str) -> Optional[Any]:
+    """Unpickle a model, returning None if it is missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def write_model(path: str, model: Any) -> Optional[ModelSignature]:
+    """Write a model atomically so other workers never read a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, path)
+
+    return file_signature(path)
+
+
+class ModelStore:
+    """
+    Per-user categorization models, loaded lazily on first prediction.
+
+    Loaded models are kept in an LRU bounded by count and by total artifact
+    size. A changed file on disk (e.g. retrained by another worker) is picked
+    up on the next lookup.
+    """
+
+    def __init__(self, model_dir: str, max_models: int = 100, max_bytes: Optional[int] = None):
+        self.model_dir = model_dir
+        self.cache = LRUCache(maxsize=max_models, max_bytes=max_bytes)
+        self._locks: dict = {}
+        self._locks_guard = threading.Lock()
+
+    def model_path(self, user_id: int) -> str:
+        return os.path.join(self.model_dir, f"user_{user_id}.pkl")
+
+    @contextmanager
+    def lock(self, user_id: int) -> Iterator[None]:
+        """
+        Exclusive write lock for one user's model.
+
+        Serializes trainers within this process (thread lock) and across
+        workers (flock on a sidecar file), so concurrent train calls can't
+        overwrite each other's result.
+        """
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(user_id, threading.Lock())
+
+        with thread_lock:
+            os.makedirs(self.model_dir, exist_ok=True)
+            with open(f"{self.model_path(user_id)}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, user_id: int) -> Tuple[Optional[Any], Optional[ModelSignature]]:
+        """
+        Return (model, signature) for a user.
+
+        Returns (None, None) when the user has no model of their own.
+        """
+        path = self.model_path(user_id)
+        signature = file_signature(path)
+        if signature is None:
+            self.cache.pop(user_id)
+            return None, None
+
+        cached = self.cache.get(user_id)
+        if cached is not None and cached[1] == signature:
+            return cached
+
+        model = read_model(path)
+        if model is None:
+            return None, None
+
+        self.cache.put(user_id, (model, signature), nbytes=signature[1])
+        return model, signature
+
+    def save(self, user_id: int, model: Any):
+        """Persist a user's model and make it the cached one."""
+        signature = write_model(self.model_path(user_id), model)
+        if signature is not None:
+            self.cache.put(user_id, (model, signature), nbytes=signature[1])
+
+    def delete(self, user_id: int):
+        """Remove a user's model so they fall back to the global one."""
+        self.cache.pop(user_id)
+        try:
+            os.remove(self.model_path(user_id))
+        except FileNotFoundError:
+            pass
@@ -1,51 +1,298 @@
 import cv2
+import logging
 import numpy as np
+import os
+import pypdfium2 as pdfium
 import pytesseract
 import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from PIL import Image
+from ..core.config import settings
+
+try:
+    import tesserocr
+except ImportError:  # optional: in-process libtesseract binding
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+OCR_ENGINES = ('auto', 'tesserocr', 'pytesseract')
+
+
+class UnreadablePDF(ValueError):
+    """The upload is not a PDF pdfium can open."""
+
+
+class TooManyPages(ValueError):
+    """The PDF has more pages than are OCR'd per document."""
+
+
+class PytesseractEngine:
+    """Runs the tesseract CLI for every call (temp file + subprocess)."""
+
+    name = 'pytesseract'
+
+    def __init__(self, timeout: float = 0, psm: int = 6, oem: int = 3):
+        # Seconds before the tesseract subprocess is killed (0 = no limit)
+        self.timeout = timeout
+        self.config = f'--oem {oem} --psm {psm}'
+
+    def image_to_text(self, image: np.ndarray) -> str:
+        return pytesseract.image_to_string(image, config=self.config, timeout=self.timeout)
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    """
+    Keeps one libtesseract handle warm for the life of the process.
+
+    Language data is loaded once instead of per receipt, and there is no
+    temp file or subprocess per call. The handle is not thread-safe, so
+    calls are serialized.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, timeout: float = 0, psm: int = 6, oem: int = 3, lang: str = 'eng', tessdata_dir: str = ''):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+
+        self.timeout = timeout
+        options = {'lang': lang, 'psm': psm, 'oem': oem}
+        if tessdata_dir:
+            # tesserocr wants a trailing separator on the path
+            options['path'] = os.path.join(tessdata_dir, '')
+        self.api = tesserocr.PyTessBaseAPI(**options)
+        self._lock = threading.Lock()
+
+    def image_to_text(self, image: np.ndarray) -> str:
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        (h, w) = image.shape[:2]
+        with self._lock:
+            self.api.SetImageBytes(image.tobytes(), w, h, 1, w)
+            if not self.api.Recognize(timeout=int(self.timeout * 1000)):
+                raise TimeoutError(f"tesseract exceeded {self.timeout}s")
+            return self.api.GetUTF8Text()
+
+    def close(self):
+        self.api.End()
+
+
+def create_ocr_engine(name: str = 'auto', timeout: float = 0, tessdata_dir: str = ''):
+    """
+    Build the configured OCR engine.
+
+    "auto" prefers tesserocr when it is installed and can load its language
+    data, and otherwise uses pytesseract, as does "tesserocr" when it can't
+    be started.
+    """
+    if name not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name}")
+
+    if name != 'pytesseract' and tesserocr is not None:
+        try:
+            return TesserocrEngine(timeout=timeout, tessdata_dir=tessdata_dir)
+        except Exception as e:
+            logger.warning("tesserocr unavailable (%s); falling back to pytesseract", e)
+    elif name == 'tesserocr':
+        logger.warning("tesserocr is not installed; falling back to pytesseract")
+
+    return PytesseractEngine(timeout=timeout)
 
 
 class OCRService:
     """OCR service for receipt image processing."""
 
-    def __init__(self):
+    # Images are normalized so their long edge falls in this range (pixels);
+    # ~2000px keeps receipt text well above tesseract's minimum x-height
+    TARGET_LONG_EDGE = 2000
+    MIN_LONG_EDGE = 1000
+
+    # Estimated noise sigma below which denoising is skipped
+    NOISE_THRESHOLD = 3.0
+
+    # Laplacian-difference kernel for the noise estimate (Immerkaer)
+    NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+    # Skew is estimated on a copy with this long edge, so the cost is constant
+    DESKEW_SIZE = 800
+    # Largest skew searched (degrees), and the coarse/fine search steps
+    DESKEW_MAX_ANGLE = 15.0
+    DESKEW_COARSE_STEP = 0.5
+    DESKEW_FINE_STEP = 0.05
+
+    # Text parsing. Dates like 01/15/2024 or 2024-01-15, tried in this order
+    DATE_PATTERN = re.compile(r'\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})\b')
+    DATE_FORMATS = {
+        '/': ("%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d", "%m/%d/%y", "%d/%m/%y", "%y/%m/%d"),
+        '-': ("%m-%d-%Y", "%d-%m-%Y", "%Y-%m-%d"),
+    }
+    # Total keywords by priority, when a line has more than one
+    TOTAL_KEYWORD_RANK = {'total': 0, 'amount': 1, 'balance': 2}
+    # One token per price: keyword + price for totals, else a bare price
+    LINE_TOKEN_PATTERN = re.compile(r'(total|amount|balance)[:\s]+\$?(\d+[.,]\d{2})|(\d+[.,]\d{2})')
+    # Lines mentioning these (incl. "subtotal") hold totals or tax, not items
+    ITEM_EXCLUDE_PATTERN = re.compile(r'total|tax|amount')
+    # Leading quantity on an item line, e.g. "2 x "
+    QUANTITY_PATTERN = re.compile(r'\d+\s*[xX]?\s*')
+
+    def __init__(
+        self,
+        tesseract_timeout: float = 0,
+        target_long_edge: int = TARGET_LONG_EDGE,
+        noise_threshold: float = NOISE_THRESHOLD,
+        engine: str = 'auto',
+        tessdata_dir: str = ''
+    ):
         # Configure tesseract if needed
         # pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'
-        pass
 
-    def preprocess_image(self, image_path: str) -> np.ndarray:
+        # Seconds before tesseract is stopped (0 = no limit)
+        self.tesseract_timeout = tesseract_timeout
+        self.target_long_edge = target_long_edge
+        self.noise_threshold = noise_threshold
+        self.engine_name = engine
+        self.tessdata_dir = tessdata_dir
+        self._engine = None
+
+    @property
+    def engine(self):
+        """OCR engine, created on first use and then reused."""
+        if self._engine is None:
+            self._engine = create_ocr_engine(self.engine_name, self.tesseract_timeout, self.tessdata_dir)
+        return self._engine
+
+    def load_grayscale(self, image_path: str) -> np.ndarray:
+        """
+        Decode an image straight to grayscale.
+
+        JPEGs much larger than the target are decoded at 1/2, 1/4 or 1/8
+        scale, which is far cheaper than decoding at full size and resizing.
+        """
+        flag = cv2.IMREAD_GRAYSCALE
+        try:
+            with Image.open(image_path) as img:
+                long_edge = max(img.size)
+        except Exception:
+            long_edge = 0
+
+        for factor, reduced in ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+                                (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                                (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)):
+            if long_edge // factor >= self.target_long_edge:
+                flag = reduced
+                break
+
+        gray = cv2.imread(image_path, flag)
+        if gray is None:
+            raise ValueError(f"Could not read image: {image_path}")
+        return gray
+
+    def normalize_size(self, gray: np.ndarray) -> np.ndarray:
+        """Scale so the long edge is within [MIN_LONG_EDGE, target_long_edge]."""
+        long_edge = max(gray.shape[:2])
+        if long_edge > self.target_long_edge:
+            scale = self.target_long_edge / long_edge
+            interpolation = cv2.INTER_AREA
+        elif long_edge < self.MIN_LONG_EDGE:
+            scale = self.MIN_LONG_EDGE / long_edge
+            interpolation = cv2.INTER_CUBIC
+        else:
+            return gray
+
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+    @classmethod
+    def estimate_noise(cls, gray: np.ndarray) -> float:
+        """
+        Estimate the noise standard deviation of a grayscale image.
+
+        Uses the median absolute Laplacian-difference response, so text
+        edges (a minority of pixels) don't read as noise.
+        """
+        response = cv2.filter2D(gray, cv2.CV_32F, cls.NOISE_KERNEL)[1:-1, 1:-1]
+        return float(np.median(np.abs(response)) / 0.6745 / 6)
+
+    @classmethod
+    def estimate_skew(cls, thresh: np.ndarray) -> float:
+        """
+        Angle (degrees) to rotate a binarized receipt by to level its text lines.
+
+        Uses a projection profile on a DESKEW_SIZE copy: ink pixels are
+        binned by row at each candidate angle, and the angle where text
+        lines line up with rows gives the most uneven (highest variance)
+        profile. A coarse pass is refined around its best angle.
+        """
+        scale = min(1.0, cls.DESKEW_SIZE / max(thresh.shape[:2]))
+        small = cv2.resize(thresh, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # Pixels with any ink (thin strokes turn gray when downsampled), weighted
+        # by how dark they are, relative to the center
+        ys, xs = np.nonzero(small < 255)
+        if len(ys) == 0:
+            return 0.0
+        weights = (255 - small[ys, xs]).astype(np.float64)
+        ys = ys - small.shape[0] / 2
+        xs = xs - small.shape[1] / 2
+        offset = int(np.hypot(*small.shape)) // 2 + 1
+
+        def score(angle: float) -> float:
+            # Row each pixel lands in after rotating the image by `angle` (CCW)
+            theta = np.deg2rad(angle)
+            rows = np.rint(ys * np.cos(theta) - xs * np.sin(theta)).astype(np.int64) + offset
+            return float(np.bincount(rows, weights=weights, minlength=2 * offset).var())
+
+        def search(low: float, high: float, step: float) -> float:
+            angles = np.arange(low, high + step / 2, step)
+            return float(max(angles, key=score))
+
+        best = search(-cls.DESKEW_MAX_ANGLE, cls.DESKEW_MAX_ANGLE, cls.DESKEW_COARSE_STEP)
+        best = search(best - cls.DESKEW_COARSE_STEP, best + cls.DESKEW_COARSE_STEP, cls.DESKEW_FINE_STEP)
+        return round(best, 2)
+
+    def preprocess_image(self, image_path: str, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
         """
         Preprocess receipt image for better OCR results.
 
         Steps:
-        1. Convert to grayscale
-        2. Denoise
-        3. Threshold
-        4. Deskew
+        1. Decode to grayscale
+        2. Normalize resolution
+        3. Denoise (skipped when the image is already clean)
+        4. Threshold
+        5. Deskew (angle estimated on a downsampled copy)
+
+        If a timings dict is given, each stage's duration (ms) is recorded in it.
         """
-        # Read image
-        img = cv2.imread(image_path)
+        # Read image as grayscale
+        with timed(timings, 'decode'):
+            gray = self.load_grayscale(image_path)
 
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return self.preprocess(gray, timings)
+
+    def preprocess(self, gray: np.ndarray, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Steps 2-5 of preprocess_image, on an already decoded grayscale image."""
+        # Normalize resolution before the expensive stages
+        with timed(timings, 'resize'):
+            gray = self.normalize_size(gray)
 
         # Denoise
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+        with timed(timings, 'denoise'):
+            if self.estimate_noise(gray) >= self.noise_threshold:
+                gray = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
 
         # Threshold (binary)
-        _, thresh = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        with timed(timings, 'threshold'):
+            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
         # Deskew
-        coords = np.column_stack(np.where(thresh > 0))
-        if len(coords) > 0:
-            angle = cv2.minAreaRect(coords)[-1]
-            if angle < -45:
-                angle = 90 + angle
-            elif angle > 45:
-                angle = angle - 90
-
+        with timed(timings, 'deskew'):
+            angle = self.estimate_skew(thresh)
             if abs(angle) > 0.5:  # Only rotate if angle is significant
                 (h, w) = thresh.shape[:2]
                 center = (w // 2, h // 2)
@@ -54,13 +301,52 @@ class OCRService:
 
         return thresh
 
-    def extract_text(self, image_path: str) -> str:
-        """Extract text from preprocessed image."""
-        preprocessed = self.preprocess_image(image_path)
+    def render_pdf_page(self, pdf_path: str, page_index: int, dpi: int = 300) -> np.ndarray:
+        """
+        Rasterize one PDF page to grayscale.
 
-        # Use pytesseract to extract text
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(preprocessed, config=custom_config)
+        Rendered at dpi, but never with a long edge beyond target_long_edge,
+        so large pages are not drawn at full size only to be scaled down.
+        """
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page = pdf[page_index]
+            try:
+                scale = min(dpi / 72, self.target_long_edge / max(page.get_size()))
+                # Copied out, as to_numpy() is a view into pdfium's bitmap
+                gray = page.render(scale=scale, grayscale=True).to_numpy().copy()
+            finally:
+                page.close()
+        finally:
+            pdf.close()
+
+        # Some pdfium versions keep a trailing channel axis for grayscale
+        if gray.ndim == 3:
+            gray = gray[:, :, 0]
+        return np.ascontiguousarray(gray)
+
+    def extract_text(self, image_path: str, timings: Optional[Dict[str, float]] = None) -> str:
+        """Extract text from preprocessed image."""
+        preprocessed = self.preprocess_image(image_path, timings)
+        return self.recognize(preprocessed, timings)
+
+    def extract_pdf_page_text(
+        self,
+        pdf_path: str,
+        page_index: int,
+        dpi: int = 300,
+        timings: Optional[Dict[str, float]] = None
+    ) -> str:
+        """Extract text from one page of a PDF."""
+        with timed(timings, 'render'):
+            gray = self.render_pdf_page(pdf_path, page_index, dpi)
+
+        return self.recognize(self.preprocess(gray, timings), timings)
+
+    def recognize(self, preprocessed: np.ndarray, timings: Optional[Dict[str, float]] = None) -> str:
+        """Run the OCR engine on a preprocessed image."""
+        with timed(timings, 'tesseract'):
+            text = self.engine.image_to_text(preprocessed)
 
         return text
 
@@ -71,7 +357,7 @@ class OCRService:
         Returns:
             Dict with vendor, date, line_items, total, and confidence scores
         """
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
 
         result = {
             'vendor': None,
@@ -89,13 +375,11 @@ class OCRService:
             result['vendor'] = lines[0]
             result['vendor_confidence'] = 0.8  # Higher confidence for first line
 
-        # Extract date
-        date_pattern = r'\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})\b'
+        # Extract date (first line with a parseable one)
         for line in lines:
-            date_match = re.search(date_pattern, line)
+            date_match = self.DATE_PATTERN.search(line)
             if date_match:
-                date_str = date_match.group(1)
-                parsed_date = self._parse_date(date_str)
+                parsed_date = self._parse_date(date_match.group(1))
                 if parsed_date:
                     result['date'] = parsed_date
                     result['date_confidence'] = 0.85
@@ -121,11 +405,8 @@ class OCRService:
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string from receipt."""
-        formats = [
-            "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d",
-            "%m-%d-%Y", "%d-%m-%Y", "%Y-%m-%d",
-            "%m/%d/%y", "%d/%m/%y", "%y/%m/%d",
-        ]
+        # Only formats using the string's separator can match
+        formats = self.DATE_FORMATS['/' if '/' in date_str else '-']
 
         for fmt in formats:
             try:
@@ -136,54 +417,59 @@ class OCRService:
         return None
 
     def _extract_items_and_total(self, lines: List[str]) -> Tuple[List[Dict], Optional[float]]:
-        """Extract line items and total from receipt lines."""
+        """
+        Extract line items and total from receipt lines.
+
+        Each line is tokenized once: every price, with totals ("total: 9.99")
+        carrying their keyword. The last line with a total wins; within a
+        line, the first total by TOTAL_KEYWORD_RANK.
+        """
         line_items = []
         total = None
 
-        # Pattern for line items: description ... price
-        # Looking for lines with prices
-        price_pattern = r'(\d+[.,]\d{2})'
-
-        # Pattern for total line
-        total_patterns = [
-            r'total[:\s]+\$?(\d+[.,]\d{2})',
-            r'amount[:\s]+\$?(\d+[.,]\d{2})',
-            r'balance[:\s]+\$?(\d+[.,]\d{2})',
-        ]
+        # Bound locally: this loop runs once per line of every re-parse
+        tokenize = self.LINE_TOKEN_PATTERN.findall
+        is_excluded = self.ITEM_EXCLUDE_PATTERN.search
+        match_quantity = self.QUANTITY_PATTERN.match
+        keyword_rank = self.TOTAL_KEYWORD_RANK
 
         for line in lines:
             line_lower = line.lower()
+            tokens = tokenize(line_lower)
+            if not tokens:
+                continue
 
-            # Check for total
-            for pattern in total_patterns:
-                match = re.search(pattern, line_lower)
-                if match:
-                    total_str = match.group(1).replace(',', '.')
-                    try:
-                        total = float(total_str)
-                    except ValueError:
-                        pass
-                    break
+            prices = []
+            line_total = None
+            line_rank = len(keyword_rank)
+            for keyword, keyword_price, price in tokens:
+                if keyword:
+                    prices.append(keyword_price)
+                    if keyword_rank[keyword] < line_rank:
+                        line_total, line_rank = keyword_price, keyword_rank[keyword]
+                else:
+                    prices.append(price)
+
+            if line_total is not None:
+                total = float(line_total.replace(',', '.'))
+
+            if is_excluded(line_lower):
+                continue
 
-            # Extract line items (items with prices)
-            prices = re.findall(price_pattern, line)
-            if prices and not any(keyword in line_lower for keyword in ['total', 'subtotal', 'tax', 'amount']):
-                # Extract description (text before the price)
-                for price_str in prices:
-                    desc_end = line.rfind(price_str)
-                    description = line[:desc_end].strip()
-
-                    # Clean up description
-                    description = re.sub(r'^\d+\s*[xX]?\s*', '', description)  # Remove leading quantity
-
-                    if description:
-                        price_val = float(price_str.replace(',', '.'))
-                        line_items.append({
-                            'description': description,
-                            'quantity': 1.0,
-                            'price': price_val,
-                            'confidence': 0.75
-                        })
+            for price_str in prices:
+                # Description is the text before the price, minus a leading quantity
+                description = line[:line.rfind(price_str)].strip()
+                quantity = match_quantity(description)
+                if quantity:
+                    description = description[quantity.end():]
+
+                if description:
+                    line_items.append({
+                        'description': description,
+                        'quantity': 1.0,
+                        'price': float(price_str.replace(',', '.')),
+                        'confidence': 0.75
+                    })
 
         return line_items, total
 
@@ -191,12 +477,102 @@ class OCRService:
         """
         Full pipeline: preprocess -> OCR -> parse.
 
-        Returns structured receipt data.
+        Returns structured receipt data, with per-stage durations (ms)
+        under 'timings'.
         """
+        timings: Dict[str, float] = {}
+
         # Extract text
-        text = self.extract_text(image_path)
+        text = self.extract_text(image_path, timings)
 
         # Parse receipt
-        parsed = self.parse_receipt(text)
+        with timed(timings, 'parse'):
+            parsed = self.parse_receipt(text)
 
+        parsed['timings'] = timings
         return parsed
+
+
+@contextmanager
+def timed(timings: Optional[Dict[str, float]], stage: str) -> Iterator[None]:
+    """Record how long the block took (ms) under timings[stage]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = round((time.perf_counter() - start) * 1000, 2)
+
+
+_worker_service: Optional[OCRService] = None
+
+
+def get_worker_service(tesseract_timeout: float = 0) -> OCRService:
+    """The OCRService shared by OCR calls in this process."""
+    global _worker_service
+    if _worker_service is None or _worker_service.tesseract_timeout != tesseract_timeout:
+        _worker_service = OCRService(
+            tesseract_timeout=tesseract_timeout,
+            target_long_edge=settings.OCR_TARGET_LONG_EDGE,
+            noise_threshold=settings.OCR_NOISE_THRESHOLD,
+            engine=settings.OCR_ENGINE,
+            tessdata_dir=settings.OCR_TESSDATA_DIR
+        )
+    return _worker_service
+
+
+def process_receipt_file(image_path: str, tesseract_timeout: float = 0) -> Dict:
+    """
+    OCR entry point for worker processes.
+
+    Module-level so it can be pickled into a process pool; each worker
+    process reuses a single OCRService, and with it a warm OCR engine.
+    """
+    return get_worker_service(tesseract_timeout).process_receipt(image_path)
+
+
+def process_pdf_page_file(pdf_path: str, page_index: int, dpi: int = 300, tesseract_timeout: float = 0) -> Dict:
+    """
+    OCR entry point for one PDF page, so a document's pages can run in parallel.
+
+    Returns the page text and its per-stage durations (ms).
+    """
+    timings: Dict[str, float] = {}
+    text = get_worker_service(tesseract_timeout).extract_pdf_page_text(pdf_path, page_index, dpi, timings)
+    return {'text': text, 'timings': timings}
+
+
+# pdfium is not thread-safe; guards page counting in the API process
+_pdfium_lock = threading.Lock()
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """Number of pages in a PDF; raises UnreadablePDF if it cannot be opened."""
+    with _pdfium_lock:
+        try:
+            pdf = pdfium.PdfDocument(pdf_path)
+        except pdfium.PdfiumError as e:
+            raise UnreadablePDF(f"Could not read PDF: {e}")
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def merge_pdf_pages(pages: List[Dict]) -> Dict:
+    """
+    Parse the page texts of a PDF (in page order) as one receipt.
+
+    Stage timings are summed over the pages.
+    """
+    timings: Dict[str, float] = {}
+    for page in pages:
+        for stage, ms in page['timings'].items():
+            timings[stage] = round(timings.get(stage, 0) + ms, 2)
+
+    text = '\n'.join(page['text'] for page in pages)
+    with timed(timings, 'parse'):
+        parsed = get_worker_service().parse_receipt(text)
+
+    parsed['timings'] = timings
+    return parsed
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from .cache import LRUCache
+
+
+class OCRResultCache:
+    """
+    Parsed OCR results keyed by the SHA-256 of the uploaded bytes.
+
+    An in-memory LRU sits in front of one JSON file per key on disk, so
+    results are shared between API workers and survive restarts.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 1024):
+        self.cache_dir = cache_dir
+        self.memory = LRUCache(maxsize=max_entries)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def key_for(digest: str) -> str:
+        return f"sha256-{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _dump(result: Dict) -> str:
+        data = dict(result)
+        if data.get('date') is not None:
+            data['date'] = data['date'].isoformat()
+        return json.dumps(data)
+
+    @staticmethod
+    def _load(text: str) -> Dict:
+        data = json.loads(text)
+        if data.get('date') is not None:
+            data['date'] = datetime.fromisoformat(data['date'])
+        return data
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached OCR result, or None."""
+        result = self.memory.get(key)
+        if result is not None:
+            return result
+
+        try:
+            with open(self._path(key)) as f:
+                result = self._load(f.read())
+        except (OSError, ValueError):
+            return None
+
+        self.memory.put(key, result)
+        return result
+
+    def put(self, key: str, result: Dict):
+        """Store an OCR result."""
+        self.memory.put(key, result)
+
+        # Atomic write so a concurrent reader never sees a partial file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self._dump(result))
+        os.replace(tmp_path, path)
@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class OCRPoolBusy(RuntimeError):
+    """Raised when the pool already has max_pending jobs in flight."""
+
+
+class OCRPool:
+    """
+    Runs CPU-bound OCR work in worker processes, off the event loop.
+
+    At most max_pending jobs are in flight (running or queued) at once;
+    further submissions are rejected with OCRPoolBusy instead of piling up
+    (background callers can wait for a slot with run_blocking instead).
+    A job that exceeds timeout raises TimeoutError to the caller. Its slot
+    is only released once the worker is actually done with it, so timed-out
+    work still counts against the limit.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, timeout: Optional[float] = 60.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._slots = threading.Condition()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily; "spawn" keeps DB connections and threads out of the workers
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def _release(self, _future=None):
+        with self._slots:
+            self._pending -= 1
+            self._slots.notify()
+
+    def submit(self, fn: Callable[..., Any], *args, block: bool = False, timeout: Optional[float] = None):
+        """
+        Submit fn(*args) to a worker process, returning a concurrent Future.
+
+        When the pool is full, raises OCRPoolBusy, or with block=True waits
+        for a free slot (for background callers, never the event loop), up
+        to timeout seconds before raising TimeoutError.
+        """
+        with self._slots:
+            if block:
+                if not self._slots.wait_for(lambda: self._pending < self.max_pending, timeout):
+                    raise TimeoutError("Timed out waiting for a free OCR slot")
+            elif self._pending >= self.max_pending:
+                raise OCRPoolBusy(f"OCR queue is full ({self.max_pending} jobs in flight)")
+            self._pending += 1
+
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool
+                self._executor = None
+                try:
+                    future = self._get_executor().submit(fn, *args)
+                except Exception:
+                    self._pending -= 1
+                    raise
+            except Exception:
+                self._pending -= 1
+                raise
+
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) in a worker process and await its result."""
+        future = asyncio.wrap_future(self.submit(fn, *args))
+        try:
+            # On timeout the job is dropped if still queued; a running one finishes in the background
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"OCR job exceeded {self.timeout}s")
+
+    def run_blocking(self, fn: Callable[..., Any], *args) -> Any:
+        """Like run(), but waits for a free slot instead of failing; for worker threads."""
+        future = self.submit(fn, *args, block=True)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"OCR job exceeded {self.timeout}s")
+
+    def map_blocking(self, fn: Callable[..., Any], arg_list: Iterable[tuple]) -> List[Any]:
+        """
+        Run fn(*args) for each args tuple across the workers; results in order.
+
+        Waits for free slots as needed. The timeout covers the whole batch;
+        if it runs out or a call fails, calls not yet started are cancelled.
+        """
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+        def remaining():
+            return max(deadline - time.monotonic(), 0) if deadline is not None else None
+
+        futures = []
+        try:
+            for args in arg_list:
+                futures.append(self.submit(fn, *args, block=True, timeout=remaining()))
+            return [future.result(timeout=remaining()) for future in futures]
+        except FutureTimeoutError:
+            raise TimeoutError(f"OCR batch exceeded {self.timeout}s")
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def run_many(self, fn: Callable[..., Any], arg_list: Iterable[tuple]) -> List[Any]:
+        """
+        Async map_blocking: fails fast with OCRPoolBusy if the pool is already
+        full, otherwise waits for slots in a thread instead of the event loop.
+        """
+        if self._pending >= self.max_pending:
+            raise OCRPoolBusy(f"OCR queue is full ({self.max_pending} jobs in flight)")
+        return await asyncio.to_thread(self.map_blocking, fn, list(arg_list))
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers, cancelling jobs that have not started."""
+        with self._slots:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,8 +1,16 @@
+import codecs
 import csv
+import math
 import re
 from datetime import datetime
-from typing import List, Tuple
-from io import StringIO
+from itertools import chain, islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+from io import BytesIO, StringIO
+import numpy as np
+import pandas as pd
+
+CSVSource = Union[str, bytes, IO[str], IO[bytes], Iterable[str], Iterable[bytes]]
+CSVFile = Union[str, bytes, IO[str], IO[bytes]]
 
 
 class CSVParser:
@@ -17,6 +25,20 @@ class CSVParser:
         "%m-%d-%Y",
     ]
 
+    # Header keywords used to locate the date, description and amount columns
+    DATE_COLUMN_KEYWORDS = ['date', 'transaction date', 'posted']
+    DESCRIPTION_COLUMN_KEYWORDS = ['description', 'memo', 'payee', 'merchant']
+    AMOUNT_COLUMN_KEYWORDS = ['amount', 'value', 'debit', 'credit']
+
+    # Parse modes: 'rows' is the pure-Python streaming parser, 'columnar' uses pandas
+    PARSE_MODES = ('rows', 'columnar')
+
+    # Columnar mode tuning
+    DATE_SAMPLE_SIZE = 100
+    COLUMNAR_CHUNK_ROWS = 100_000
+
+    CURRENCY_PATTERN = r'[$€£¥]'
+
     @staticmethod
     def detect_delimiter(content: str) -> str:
         """Detect CSV delimiter from content."""
@@ -53,7 +75,7 @@ class CSVParser:
             amount_str = '-' + amount_str[1:-1]
 
         # Remove currency symbols
-        amount_str = re.sub(r'[$€£¥]', '', amount_str)
+        amount_str = re.sub(CSVParser.CURRENCY_PATTERN, '', amount_str)
 
         # Handle European format (comma as decimal): 4,50 -> 4.50
         # Only if there's no dot and comma appears once
@@ -65,66 +87,394 @@ class CSVParser:
         amount_str = amount_str.replace(',', '')
 
         try:
-            return float(amount_str)
+            amount = float(amount_str)
         except ValueError:
             return None
 
+        # Reject 'nan' / 'inf' spellings that float() happily accepts
+        return amount if math.isfinite(amount) else None
+
     @staticmethod
-    def parse_csv(content: str) -> Tuple[List[dict], str]:
+    def resolve_columns(fieldnames: List[str]) -> Optional[Tuple[str, str, str]]:
         """
-        Parse CSV content and return normalized rows.
+        Work out the date, description and amount columns from the header.
 
         Returns:
-            Tuple of (parsed_rows, delimiter_used)
+            Tuple of (date_col, desc_col, amount_col), or None if any is missing
         """
-        delimiter = CSVParser.detect_delimiter(content)
-
-        # Parse CSV
-        csv_file = StringIO(content)
-        reader = csv.DictReader(csv_file, delimiter=delimiter)
-
-        rows = []
-        for idx, row in enumerate(reader, start=1):
-            # Try to find date, description, and amount columns
-            # Common column names
-            date_col = None
-            desc_col = None
-            amount_col = None
-
-            # Find columns (case-insensitive)
-            for key in row.keys():
-                key_lower = key.lower().strip()
-                if not date_col and any(d in key_lower for d in ['date', 'transaction date', 'posted']):
-                    date_col = key
-                elif not desc_col and any(d in key_lower for d in ['description', 'memo', 'payee', 'merchant']):
-                    desc_col = key
-                elif not amount_col and any(a in key_lower for a in ['amount', 'value', 'debit', 'credit']):
-                    amount_col = key
-
-            if not (date_col and desc_col and amount_col):
-                continue
+        date_col = None
+        desc_col = None
+        amount_col = None
+
+        # Find columns (case-insensitive), first match wins
+        for key in dict.fromkeys(fieldnames):
+            key_lower = key.lower().strip()
+            if not date_col and any(d in key_lower for d in CSVParser.DATE_COLUMN_KEYWORDS):
+                date_col = key
+            elif not desc_col and any(d in key_lower for d in CSVParser.DESCRIPTION_COLUMN_KEYWORDS):
+                desc_col = key
+            elif not amount_col and any(a in key_lower for a in CSVParser.AMOUNT_COLUMN_KEYWORDS):
+                amount_col = key
+
+        if not (date_col and desc_col and amount_col):
+            return None
+
+        return date_col, desc_col, amount_col
+
+    @staticmethod
+    def _open_lines(source: CSVSource) -> Iterator[str]:
+        """Turn a string, bytes, file-like object or line iterable into decoded lines."""
+        if isinstance(source, str):
+            source = StringIO(source)
+        elif isinstance(source, bytes):
+            source = BytesIO(source)
+
+        lines = iter(source)
+        first_line = next(lines, '')
+
+        # Binary streams are decoded incrementally, one line at a time
+        if isinstance(first_line, bytes):
+            return codecs.iterdecode(chain([first_line], lines), 'utf-8')
+
+        return chain([first_line], lines)
+
+    @staticmethod
+    def stream_csv(source: CSVSource) -> Tuple[Iterator[dict], str]:
+        """
+        Lazily parse CSV input and yield normalized rows.
+
+        The delimiter is detected from the header line and the column mapping is
+        resolved once, so memory use stays flat regardless of file size.
+
+        Returns:
+            Tuple of (row_iterator, delimiter_used)
+        """
+        lines = CSVParser._open_lines(source)
+        header_line = next(lines, '')
+        delimiter = CSVParser.detect_delimiter(header_line)
+
+        reader = csv.reader(chain([header_line], lines), delimiter=delimiter)
+        return CSVParser._iter_rows(reader), delimiter
+
+    @staticmethod
+    def _iter_rows(reader: Iterator[List[str]]) -> Iterator[dict]:
+        """Yield normalized rows from a csv reader positioned at the header."""
+        # Blank and whitespace-only lines are skipped and not counted
+        records = (record for record in reader if record and (len(record) > 1 or record[0].strip()))
+
+        header = next(records, None)
+        if header is None:
+            return
+
+        columns = CSVParser.resolve_columns(header)
+        if columns is None:
+            return
+
+        # Duplicate header names resolve to the last occurrence, like DictReader
+        positions = {name: idx for idx, name in enumerate(header)}
+        date_idx, desc_idx, amount_idx = (positions[col] for col in columns)
+        min_length = max(date_idx, desc_idx, amount_idx) + 1
+
+        parse_date = CSVParser.parse_date
+        parse_amount = CSVParser.parse_amount
+
+        for idx, record in enumerate(records, start=1):
+            # Missing trailing fields read as empty strings
+            if len(record) < min_length:
+                record = record + [''] * (min_length - len(record))
 
             # Parse values
-            parsed_date = CSVParser.parse_date(row[date_col])
-            parsed_amount = CSVParser.parse_amount(row[amount_col])
+            parsed_date = parse_date(record[date_idx])
+            parsed_amount = parse_amount(record[amount_idx])
 
             if parsed_date and parsed_amount is not None:
-                rows.append({
+                yield {
                     'row_number': idx,
                     'date': parsed_date.date(),
-                    'description': row[desc_col].strip(),
+                    'description': record[desc_idx].strip(),
                     'amount': parsed_amount,
+                }
+
+    @staticmethod
+    def _date_shape(fmt: str) -> str:
+        """Reduce a date format to its layout, ignoring day/month order."""
+        return re.sub(r'%[dm]', '%?', fmt)
+
+    @staticmethod
+    def infer_date_formats(sample: Iterable[str]) -> List[str]:
+        """
+        Infer which DATE_FORMATS a date column uses from a sample of its values.
+
+        Formats that only differ in day/month order are kept together and in
+        priority order, so ambiguous dates resolve exactly like parse_date.
+        """
+        shapes = set()
+        for value in sample:
+            value = value.strip()
+            for fmt in CSVParser.DATE_FORMATS:
+                try:
+                    datetime.strptime(value, fmt)
+                except ValueError:
+                    continue
+                shapes.add(CSVParser._date_shape(fmt))
+                break
+
+        return [fmt for fmt in CSVParser.DATE_FORMATS if CSVParser._date_shape(fmt) in shapes]
+
+    @staticmethod
+    def _convert_distinct(values: pd.Series, convert) -> pd.Series:
+        """Run a column conversion once per distinct value and broadcast it back."""
+        codes, uniques = pd.factorize(values)
+        converted = convert(pd.Series(uniques, dtype=object))
+        return pd.Series(converted.to_numpy()[codes], index=values.index)
+
+    @staticmethod
+    def parse_dates_columnar(values: pd.Series, formats: Optional[List[str]] = None) -> pd.Series:
+        """
+        Vectorized parse_date over a column of strings.
+
+        Each distinct value is parsed once. Formats are applied in bulk to the
+        values still unparsed; anything no inferred format can read falls back
+        to parse_date, so results always match it.
+        """
+        if formats is None:
+            formats = CSVParser.infer_date_formats(values.head(CSVParser.DATE_SAMPLE_SIZE))
+
+        def convert(distinct: pd.Series) -> pd.Series:
+            distinct = distinct.str.strip()
+            parsed = pd.Series(pd.NaT, index=distinct.index, dtype='datetime64[s]')
+            pending = distinct != ''
+
+            for fmt in formats:
+                if not pending.any():
+                    break
+                attempt = pd.to_datetime(distinct[pending], format=fmt, errors='coerce')
+                parsed[attempt.index] = attempt
+                pending[attempt.index] = attempt.isna()
+
+            for idx in pending[pending].index:
+                fallback = CSVParser.parse_date(distinct[idx])
+                if fallback:
+                    parsed[idx] = np.datetime64(fallback, 's')
+
+            return parsed
+
+        return CSVParser._convert_distinct(values, convert)
+
+    @staticmethod
+    def parse_amounts_columnar(values: pd.Series) -> pd.Series:
+        """
+        Vectorized parse_amount over a column of strings.
+
+        Each distinct value is parsed once. Plain numbers convert in one pass;
+        only the rest go through the bulk parentheses / currency /
+        decimal-comma clean-up.
+        """
+        def convert(distinct: pd.Series) -> pd.Series:
+            # to_numeric ignores surrounding whitespace just like float()
+            amounts = pd.to_numeric(distinct, errors='coerce').astype(float)
+            pending = amounts.isna()
+
+            if pending.any():
+                cleaned = distinct[pending].str.strip()
+
+                # Handle negative amounts in parentheses: (4.50) -> -4.50
+                parens = cleaned.str.startswith('(') & cleaned.str.endswith(')')
+                cleaned = cleaned.where(~parens, '-' + cleaned.str[1:-1])
+
+                # Remove currency symbols
+                cleaned = cleaned.str.replace(CSVParser.CURRENCY_PATTERN, '', regex=True)
+
+                # Handle European format (comma as decimal): 4,50 -> 4.50
+                european = cleaned.str.count(',').eq(1) & ~cleaned.str.contains('.', regex=False)
+                cleaned = cleaned.where(~european, cleaned.str.replace(',', '.', regex=False))
+
+                # Remove thousands separators
+                cleaned = cleaned.str.replace(',', '', regex=False)
+                amounts[pending] = pd.to_numeric(cleaned, errors='coerce')
+
+                # Anything pandas still can't read goes through the scalar parser
+                for idx in pending[amounts.isna() & pending].index:
+                    fallback = CSVParser.parse_amount(distinct[idx])
+                    if fallback is not None:
+                        amounts[idx] = fallback
+
+            amounts[~np.isfinite(amounts)] = np.nan
+            return amounts
+
+        return CSVParser._convert_distinct(values, convert)
+
+    @staticmethod
+    def stream_frames(
+        source: CSVFile,
+        chunksize: int = COLUMNAR_CHUNK_ROWS
+    ) -> Tuple[Iterator[pd.DataFrame], str]:
+        """
+        Parse CSV input column-wise with pandas, one chunk of rows at a time.
+
+        Yields DataFrames with row_number, date, description and amount columns
+        holding the same rows stream_csv would produce.
+
+        Returns:
+            Tuple of (frame_iterator, delimiter_used)
+        """
+        if isinstance(source, str):
+            source = StringIO(source)
+        elif isinstance(source, bytes):
+            source = BytesIO(source)
+
+        first_line = source.readline()
+        if isinstance(first_line, bytes):
+            first_line = first_line.decode('utf-8')
+        delimiter = CSVParser.detect_delimiter(first_line)
+
+        return CSVParser._iter_frames(source, first_line, delimiter, chunksize), delimiter
+
+    @staticmethod
+    def _iter_frames(
+        source: IO,
+        header_line: str,
+        delimiter: str,
+        chunksize: int
+    ) -> Iterator[pd.DataFrame]:
+        """Yield normalized frames from a stream positioned after its first line."""
+        # Skip leading blank lines to reach the header
+        while header_line and not header_line.strip():
+            header_line = source.readline()
+            if isinstance(header_line, bytes):
+                header_line = header_line.decode('utf-8')
+
+        header = next(csv.reader([header_line], delimiter=delimiter), None)
+        columns = CSVParser.resolve_columns(header) if header else None
+        if columns is None:
+            return
+
+        positions = {name: idx for idx, name in enumerate(header)}
+        date_idx, desc_idx, amount_idx = (positions[col] for col in columns)
+
+        try:
+            chunks = pd.read_csv(
+                source,
+                sep=delimiter,
+                header=None,
+                names=range(len(header)),
+                usecols=sorted({date_idx, desc_idx, amount_idx}),
+                dtype=str,
+                na_filter=False,
+                encoding='utf-8',
+                chunksize=chunksize,
+            )
+        except pd.errors.EmptyDataError:
+            return
+
+        # The date format is inferred once per column, from the first chunk
+        formats = None
+        with chunks:
+            for chunk in chunks:
+                if formats is None:
+                    formats = CSVParser.infer_date_formats(chunk[date_idx].head(CSVParser.DATE_SAMPLE_SIZE))
+
+                dates = CSVParser.parse_dates_columnar(chunk[date_idx], formats)
+                amounts = CSVParser.parse_amounts_columnar(chunk[amount_idx])
+                valid = dates.notna() & amounts.notna()
+
+                yield pd.DataFrame({
+                    'row_number': chunk.index[valid] + 1,
+                    'date': dates[valid].to_numpy(),
+                    'description': CSVParser._convert_distinct(
+                        chunk[desc_idx][valid], lambda distinct: distinct.str.strip()
+                    ).to_numpy(),
+                    'amount': amounts[valid].to_numpy(),
                 })
 
-        return rows, delimiter
+    @staticmethod
+    def parse_frame(source: CSVFile) -> Tuple[pd.DataFrame, str]:
+        """
+        Parse CSV content column-wise into a single DataFrame.
+
+        Returns:
+            Tuple of (frame, delimiter_used)
+        """
+        frames, delimiter = CSVParser.stream_frames(source)
+        frames = list(frames)
+
+        if not frames:
+            frame = pd.DataFrame({
+                'row_number': pd.Series(dtype=int),
+                'date': pd.Series(dtype='datetime64[s]'),
+                'description': pd.Series(dtype=object),
+                'amount': pd.Series(dtype=float),
+            })
+            return frame, delimiter
+
+        return pd.concat(frames, ignore_index=True), delimiter
+
+    @staticmethod
+    def frame_to_rows(frame: pd.DataFrame) -> List[dict]:
+        """Convert a parsed frame into the row dicts returned by parse_csv."""
+        return [
+            {
+                'row_number': row_number,
+                'date': parsed_date,
+                'description': description,
+                'amount': amount,
+            }
+            for row_number, parsed_date, description, amount in zip(
+                frame['row_number'].tolist(),
+                frame['date'].dt.date.tolist(),
+                frame['description'].tolist(),
+                frame['amount'].tolist(),
+            )
+        ]
+
+    @staticmethod
+    def _check_mode(mode: str):
+        if mode not in CSVParser.PARSE_MODES:
+            raise ValueError(f"Unknown parse mode '{mode}'. Use one of: {', '.join(CSVParser.PARSE_MODES)}")
 
     @staticmethod
-    def preview_csv(content: str, max_rows: int = 10) -> dict:
+    def parse_csv(content: CSVSource, mode: str = 'rows') -> Tuple[List[dict], str]:
+        """
+        Parse CSV content and return normalized rows.
+
+        Args:
+            content: CSV text, bytes or stream
+            mode: 'rows' for the streaming parser, 'columnar' for the pandas parser
+
+        Returns:
+            Tuple of (parsed_rows, delimiter_used)
+        """
+        CSVParser._check_mode(mode)
+
+        if mode == 'columnar':
+            frame, delimiter = CSVParser.parse_frame(content)
+            return CSVParser.frame_to_rows(frame), delimiter
+
+        rows, delimiter = CSVParser.stream_csv(content)
+        return list(rows), delimiter
+
+    @staticmethod
+    def preview_csv(content: CSVSource, max_rows: int = 10, mode: str = 'rows') -> dict:
         """Generate a preview of CSV content."""
-        rows, delimiter = CSVParser.parse_csv(content)
+        CSVParser._check_mode(mode)
+
+        if mode == 'columnar':
+            frames, delimiter = CSVParser.stream_frames(content)
+            head = []
+            total_rows = 0
+            for frame in frames:
+                if len(head) < max_rows:
+                    head.extend(CSVParser.frame_to_rows(frame.head(max_rows - len(head))))
+                total_rows += len(frame)
+        else:
+            rows, delimiter = CSVParser.stream_csv(content)
+            head = list(islice(rows, max_rows))
+
+            # Count the remaining valid rows without keeping them around
+            total_rows = len(head) + sum(1 for _ in rows)
 
         preview_rows = []
-        for row in rows[:max_rows]:
+        for row in head:
             preview_rows.append({
                 'row_number': row['row_number'],
                 'date': row['date'].isoformat(),
@@ -133,8 +483,7 @@ class CSVParser:
             })
 
         return {
-            'total_rows': len(rows),
+            'total_rows': total_rows,
             'preview': preview_rows,
             'delimiter': delimiter,
-            'all_rows': rows  # For import
         }
@@ -0,0 +1,70 @@
+import hashlib
+from typing import Callable, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from ..core.config import settings
+from .cache import LRUCache
+
+
+class ResponseCache:
+    """
+    Serialized JSON responses per user, tagged with the version they were
+    built from.
+
+    An entry is served only while its version is still current, so writes
+    invalidate every worker's copy by bumping the user's data version
+    instead of reaching into the caches. The ETag is a hash of the body,
+    so it holds across workers and restarts.
+    """
+
+    def __init__(self, maxsize: int = 2048, max_bytes: Optional[int] = None):
+        self.memory = LRUCache(maxsize=maxsize, max_bytes=max_bytes)
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    @staticmethod
+    def matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header covers the ETag (weak comparison)."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+    def get_or_build(self, key: Hashable, version: Hashable, build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        """(etag, body) for the key at this version, building the body on a miss."""
+        cached = self.memory.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        body = build()
+        etag = ResponseCache.etag_for(body)
+        self.memory.put(key, (version, etag, body), nbytes=len(body))
+        return etag, body
+
+    def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        version: Hashable,
+        build: Callable[[], bytes]
+    ) -> Response:
+        """JSON response with an ETag, or 304 Not Modified if the client already has it."""
+        etag, body = self.get_or_build(key, version, build)
+        # Clients may keep the body but must revalidate before using it
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if ResponseCache.matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    max_bytes=settings.RESPONSE_CACHE_MB * 1024 * 1024
+)
@@ -0,0 +1,207 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..models.transaction import DailyRollup, Transaction
+
+RollupKey = Tuple[date, str]
+
+
+class RollupService:
+    """
+    Maintains daily_rollups: per user, day and category income, spending
+    and transaction counts.
+
+    Every write path adds its transactions' contribution in the same
+    database transaction as the write itself; rebuild() recomputes the
+    table from raw transactions for backfill, and check() reports drift.
+    """
+
+    # Sums this close to zero count as empty (float residue of add/remove)
+    EPSILON = 1e-9
+
+    # Keys per upsert statement, well under SQLite's bound-parameter limit
+    UPSERT_BATCH = 1000
+
+    @staticmethod
+    def category_key(category: Optional[str]) -> str:
+        """Rollup category for a transaction category ('' when uncategorized)."""
+        return category or ''
+
+    @staticmethod
+    def as_row(transaction: Transaction) -> dict:
+        return {'date': transaction.date, 'amount': transaction.amount, 'category': transaction.category}
+
+    @staticmethod
+    def deltas(rows: Iterable[dict], sign: int = 1) -> Dict[RollupKey, List[float]]:
+        """Sum rows (dicts with date, amount, category) into [income, expense, count] per key."""
+        totals: Dict[RollupKey, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+        for row in rows:
+            entry = totals[(row['date'], RollupService.category_key(row.get('category')))]
+            amount = row['amount']
+            if amount > 0:
+                entry[0] += sign * amount
+            elif amount < 0:
+                entry[1] -= sign * amount
+            entry[2] += sign
+        return totals
+
+    @staticmethod
+    def add(db: Session, user_id: int, rows: Iterable[dict]):
+        """Count new transactions in the rollups."""
+        RollupService.apply(db, user_id, RollupService.deltas(rows))
+
+    @staticmethod
+    def remove(db: Session, user_id: int, rows: Iterable[dict]):
+        """Take transactions (as they were) back out of the rollups."""
+        RollupService.apply(db, user_id, RollupService.deltas(rows, sign=-1))
+
+    @staticmethod
+    def replace(db: Session, user_id: int, before: dict, after: dict):
+        """Move an edited transaction's contribution from its old values to its new ones."""
+        totals = RollupService.deltas([before], sign=-1)
+        for key, (income, expense, count) in RollupService.deltas([after]).items():
+            entry = totals.setdefault(key, [0.0, 0.0, 0])
+            entry[0] += income
+            entry[1] += expense
+            entry[2] += count
+        RollupService.apply(db, user_id, totals)
+
+    @staticmethod
+    def apply(db: Session, user_id: int, totals: Dict[RollupKey, List[float]]):
+        """Add per-key deltas to the rollups with an upsert; rows left empty are dropped."""
+        values = [
+            {
+                'user_id': user_id,
+                'day': day,
+                'category': category,
+                'income_sum': income,
+                'expense_sum': expense,
+                'count': count,
+            }
+            for (day, category), (income, expense, count) in totals.items()
+            if income or expense or count
+        ]
+        if not values:
+            return
+
+        for start in range(0, len(values), RollupService.UPSERT_BATCH):
+            RollupService._upsert(db, values[start:start + RollupService.UPSERT_BATCH])
+
+        if any(value['count'] < 0 for value in values):
+            db.execute(delete(DailyRollup).where(
+                DailyRollup.user_id == user_id,
+                DailyRollup.count <= 0
+            ))
+
+    @staticmethod
+    def _upsert(db: Session, values: List[dict]):
+        table = DailyRollup.__table__
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = dialect_insert(table).values(values)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=['user_id', 'day', 'category'],
+                set_={
+                    'income_sum': table.c.income_sum + stmt.excluded.income_sum,
+                    'expense_sum': table.c.expense_sum + stmt.excluded.expense_sum,
+                    'count': table.c.count + stmt.excluded.count,
+                }
+            ))
+            return
+
+        # Other databases: update, and insert where no row existed
+        for value in values:
+            result = db.execute(update(table).where(
+                table.c.user_id == value['user_id'],
+                table.c.day == value['day'],
+                table.c.category == value['category']
+            ).values(
+                income_sum=table.c.income_sum + value['income_sum'],
+                expense_sum=table.c.expense_sum + value['expense_sum'],
+                count=table.c.count + value['count']
+            ))
+            if result.rowcount == 0:
+                db.execute(insert(table).values(**value))
+
+    @staticmethod
+    def aggregate_transactions(user_id: Optional[int] = None):
+        """SELECT of rollup rows computed from raw transactions."""
+        amount = Transaction.amount
+        category = func.coalesce(Transaction.category, '')
+        query = select(
+            Transaction.user_id,
+            Transaction.date,
+            category,
+            func.coalesce(func.sum(case((amount > 0, amount), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((amount < 0, -amount), else_=0.0)), 0.0),
+            func.count(Transaction.id)
+        ).group_by(Transaction.user_id, Transaction.date, category)
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+        return query
+
+    @staticmethod
+    def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+        """
+        Recompute rollups from transactions, for one user or everyone.
+
+        Runs in the caller's transaction; returns the number of rollup rows.
+        """
+        clear = delete(DailyRollup)
+        if user_id is not None:
+            clear = clear.where(DailyRollup.user_id == user_id)
+        db.execute(clear)
+
+        db.execute(insert(DailyRollup).from_select(
+            ['user_id', 'day', 'category', 'income_sum', 'expense_sum', 'count'],
+            RollupService.aggregate_transactions(user_id)
+        ))
+
+        count = db.query(func.count()).select_from(DailyRollup)
+        if user_id is not None:
+            count = count.filter(DailyRollup.user_id == user_id)
+        return count.scalar()
+
+    @staticmethod
+    def check(db: Session, user_id: Optional[int] = None, tolerance: float = 1e-6) -> List[dict]:
+        """
+        Compare rollups with a fresh aggregate of transactions.
+
+        Returns one dict per mismatched (user_id, day, category), with the
+        expected and stored (income_sum, expense_sum, count).
+        """
+        expected = {
+            (row[0], row[1], row[2]): (row[3], row[4], row[5])
+            for row in db.execute(RollupService.aggregate_transactions(user_id))
+        }
+
+        stored_query = db.query(
+            DailyRollup.user_id, DailyRollup.day, DailyRollup.category,
+            DailyRollup.income_sum, DailyRollup.expense_sum, DailyRollup.count
+        )
+        if user_id is not None:
+            stored_query = stored_query.filter(DailyRollup.user_id == user_id)
+        stored = {(row[0], row[1], row[2]): (row[3], row[4], row[5]) for row in stored_query}
+
+        mismatches = []
+        for key in sorted(expected.keys() | stored.keys()):
+            want = expected.get(key, (0.0, 0.0, 0))
+            have = stored.get(key, (0.0, 0.0, 0))
+            if (
+                want[2] != have[2]
+                or abs(want[0] - have[0]) > tolerance
+                or abs(want[1] - have[1]) > tolerance
+            ):
+                mismatches.append({
+                    'user_id': key[0],
+                    'day': key[1],
+                    'category': key[2],
+                    'expected': want,
+                    'stored': have,
+                })
+        return mismatches
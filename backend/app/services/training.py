@@ -0,0 +1,183 @@
+import copy
+from datetime import datetime
+from typing import Callable, List, Optional
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sqlalchemy.orm import Session
+from ..core.database import SessionLocal
+from ..models.transaction import Transaction
+from .categorizer import Categorizer
+
+TRAINING_MODES = ('full', 'incremental')
+
+
+class IncrementalModel:
+    """
+    Hashing features + linear SGD classifier that can be updated in place.
+
+    Hashing needs no fitted vocabulary, so new transactions are folded in
+    with partial_fit instead of retraining from scratch. The set of
+    categories is fixed when the model is first fitted.
+    """
+
+    # 2**15 buckets is plenty for short merchant strings and keeps pickles small
+    N_FEATURES = 2 ** 15
+
+    # Passes over each update batch; one pass barely moves the weights on small batches
+    UPDATE_EPOCHS = 5
+
+    def __init__(self):
+        self.vectorizer = HashingVectorizer(
+            n_features=self.N_FEATURES,
+            ngram_range=(1, 2),
+            alternate_sign=False
+        )
+        self.classifier = SGDClassifier(loss='log_loss', random_state=42)
+        self.trained_until: Optional[datetime] = None
+        self.samples_seen = 0
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.classifier.classes_
+
+    def can_learn(self, categories: List[str]) -> bool:
+        """True if every category is already known to the classifier."""
+        return set(categories) <= set(self.classes_)
+
+    def fit(self, descriptions: List[str], categories: List[str]) -> 'IncrementalModel':
+        self.classifier.fit(self.vectorizer.transform(descriptions), categories)
+        self.samples_seen = len(descriptions)
+        return self
+
+    def partial_fit(self, descriptions: List[str], categories: List[str]) -> 'IncrementalModel':
+        features = self.vectorizer.transform(descriptions)
+        for _ in range(self.UPDATE_EPOCHS):
+            self.classifier.partial_fit(features, categories)
+        self.samples_seen += len(descriptions)
+        return self
+
+    def predict(self, descriptions: List[str]) -> np.ndarray:
+        return self.classifier.predict(self.vectorizer.transform(descriptions))
+
+
+class ModelTrainer:
+    """
+    Trains per-user models from their categorized transactions.
+
+    "full" retrains the TF-IDF pipeline from all transactions. "incremental"
+    updates an existing IncrementalModel with only the transactions changed
+    since it was last trained, and builds one from scratch when there is none
+    yet or a new category appeared. Deleted transactions are only forgotten
+    by a full rebuild.
+    """
+
+    def __init__(self, categorizer: Categorizer, session_factory: Callable[[], Session] = SessionLocal):
+        self.categorizer = categorizer
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _categorized(
+        db: Session,
+        user_id: Optional[int],
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ):
+        """Categorized transactions of one user (or everyone's with user_id=None), newest first."""
+        query = db.query(
+            Transaction.description,
+            Transaction.category,
+            Transaction.updated_at
+        ).filter(
+            Transaction.category.isnot(None)
+        )
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+        if since is not None:
+            query = query.filter(Transaction.updated_at > since)
+        if limit is not None:
+            query = query.order_by(Transaction.updated_at.desc(), Transaction.id.desc()).limit(limit)
+        return query.all()
+
+    @staticmethod
+    def _latest(rows, default: Optional[datetime] = None) -> Optional[datetime]:
+        return max((row.updated_at for row in rows if row.updated_at is not None), default=default)
+
+    def train_user(self, user_id: int, mode: str = 'incremental') -> dict:
+        """
+        Train (or update) a user's model.
+
+        Runs under the user's model lock, so concurrent calls for the same
+        user are serialized rather than racing on the model file.
+
+        Returns:
+            Dict with the mode, whether the model was rebuilt from scratch
+            and the number of transactions used
+        """
+        if mode not in TRAINING_MODES:
+            raise ValueError(f"Unknown training mode: {mode}")
+
+        store = self.categorizer.model_store
+        with store.lock(user_id):
+            db = self.session_factory()
+            try:
+                if mode == 'incremental':
+                    current, _ = store.get(user_id)
+                    if isinstance(current, IncrementalModel) and current.trained_until is not None:
+                        rows = self._categorized(db, user_id, since=current.trained_until)
+                        categories = [row.category for row in rows]
+                        if current.can_learn(categories):
+                            if rows:
+                                # Update a copy; the cached model keeps serving predictions
+                                model = copy.deepcopy(current)
+                                model.partial_fit([row.description for row in rows], categories)
+                                model.trained_until = self._latest(rows, default=current.trained_until)
+                                self.categorizer.save_model(model, user_id=user_id)
+                            return {'mode': 'incremental', 'rebuilt': False, 'transactions_used': len(rows)}
+
+                rows = self._categorized(db, user_id)
+            finally:
+                db.close()
+
+            if len(rows) < Categorizer.MIN_TRAINING_SAMPLES:
+                raise ValueError(
+                    f"Need at least {Categorizer.MIN_TRAINING_SAMPLES} categorized transactions to train model"
+                )
+
+            descriptions = [row.description for row in rows]
+            categories = [row.category for row in rows]
+
+            if mode == 'full':
+                self.categorizer.train_model(descriptions, categories, user_id=user_id)
+            else:
+                model = IncrementalModel().fit(descriptions, categories)
+                model.trained_until = self._latest(rows)
+                self.categorizer.save_model(model, user_id=user_id)
+
+        return {'mode': mode, 'rebuilt': True, 'transactions_used': len(rows)}
+
+    def train_global(self, max_samples: Optional[int] = None) -> dict:
+        """
+        Retrain the shared global model, the fallback for users without a
+        model of their own, from every user's categorized transactions.
+
+        Always a full TF-IDF fit, on at most max_samples of the most
+        recently updated transactions.
+
+        Returns:
+            Dict with the mode, whether the model was rebuilt and the
+            number of transactions used
+        """
+        db = self.session_factory()
+        try:
+            rows = self._categorized(db, None, limit=max_samples)
+        finally:
+            db.close()
+
+        if len(rows) < Categorizer.MIN_TRAINING_SAMPLES:
+            raise ValueError(
+                f"Need at least {Categorizer.MIN_TRAINING_SAMPLES} categorized transactions to train model"
+            )
+
+        self.categorizer.train_model([row.description for row in rows], [row.category for row in rows])
+        return {'mode': 'full', 'rebuilt': True, 'transactions_used': len(rows)}
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import uuid
+from typing import Tuple
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# Bytes read from an upload at a time; bounds memory per request
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Raised as soon as an upload exceeds its size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def check_upload_size(file: UploadFile, max_bytes: int):
+    """Reject an upload whose (already known) size is over the limit."""
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+
+async def save_upload(
+    file: UploadFile,
+    upload_dir: str,
+    suffix: str,
+    max_bytes: int,
+    chunk_size: int = CHUNK_SIZE
+) -> Tuple[str, str, bool]:
+    """
+    Stream an upload to disk under its SHA-256, hashing as it is written.
+
+    Reads chunk_size bytes at a time, stops as soon as max_bytes is
+    exceeded, and writes off the event loop. Identical content is stored
+    once.
+
+    Returns:
+        Tuple of (digest, file_path, created); created is False if a file
+        with the same content already existed
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    tmp_path = os.path.join(upload_dir, f".{uuid.uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(tmp_path, 'wb') as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                hasher.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+
+        digest = hasher.hexdigest()
+        file_path = os.path.join(upload_dir, f"{digest}{suffix}")
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+            return digest, file_path, False
+
+        os.replace(tmp_path, file_path)
+        return digest, file_path, True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,40 @@
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..models.transaction import UserDataVersion
+
+
+class DataVersionService:
+    """Per-user data version, the invalidation signal for cached responses."""
+
+    @staticmethod
+    def current(db: Session, user_id: int) -> int:
+        version = db.query(UserDataVersion.version).filter(
+            UserDataVersion.user_id == user_id
+        ).scalar()
+        return version or 0
+
+    @staticmethod
+    def bump(db: Session, user_id: int):
+        """
+        Mark the user's data as changed; call before committing a write so
+        the bump commits (or rolls back) with it.
+        """
+        table = UserDataVersion.__table__
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = dialect_insert(table).values(user_id=user_id, version=1)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={'version': table.c.version + 1}
+            ))
+            return
+
+        # Other databases: update, and insert where no row existed
+        result = db.execute(update(table).where(
+            table.c.user_id == user_id
+        ).values(version=table.c.version + 1))
+        if result.rowcount == 0:
+            db.execute(table.insert().values(user_id=user_id, version=1))
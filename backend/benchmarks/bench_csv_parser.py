@@ -0,0 +1,51 @@
+"""
+Compare the row and columnar CSV parse modes on a synthetic statement.
+
+Usage (from backend/):
+    python -m benchmarks.bench_csv_parser [rows] [date_format]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+from app.services.parser import CSVParser
+
+
+def build_statement(rows: int, date_format: str = "%m/%d/%Y") -> bytes:
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+    merchants = ['Whole Foods Market', 'Shell Gas Station', 'Starbucks Coffee', 'Amazon.com', 'Payroll Deposit']
+
+    lines = ["Date,Description,Amount"]
+    for _ in range(rows):
+        txn_date = (start + timedelta(days=rng.randint(0, 3000))).strftime(date_format)
+        amount = rng.uniform(-500, 500)
+        formatted = f"({abs(amount):.2f})" if amount < 0 and rng.random() < 0.2 else f"{amount:.2f}"
+        lines.append(f"{txn_date},{rng.choice(merchants)},{formatted}")
+
+    return "\n".join(lines).encode('utf-8')
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28}{elapsed:>8.2f}s")
+    return result, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    date_format = sys.argv[2] if len(sys.argv) > 2 else "%m/%d/%Y"
+    content = build_statement(rows, date_format)
+    print(f"{rows} rows, {len(content) / 1e6:.1f}MB, dates as {date_format}")
+
+    row_count, row_time = timed("rows (stream_csv)", lambda: sum(1 for _ in CSVParser.stream_csv(content)[0]))
+    frame, frame_time = timed("columnar (parse_frame)", lambda: CSVParser.parse_frame(content)[0])
+
+    assert len(frame) == row_count
+    print(f"speedup: {row_time / frame_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
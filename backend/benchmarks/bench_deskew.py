@@ -0,0 +1,93 @@
+"""
+Deskew angle estimation: full-resolution minAreaRect vs downsampled projection profile.
+
+Synthetic receipts are rotated by known angles at several resolutions; the
+estimators are scored on angle error, time and peak traced memory.
+
+Usage (from backend/):
+    python -m benchmarks.bench_deskew
+"""
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from app.services.ocr import OCRService
+
+LONG_EDGES = [1000, 2000, 4000]
+ANGLES = [-12.0, -5.5, -2.0, -0.7, 0.0, 1.3, 3.0, 8.0, 14.0]
+
+
+def synthetic_receipt(long_edge: int) -> np.ndarray:
+    width, height = long_edge * 3 // 5, long_edge
+    img = np.full((height, width), 235, dtype=np.uint8)
+    line_height = max(height // 50, 12)
+    font_scale = line_height / 45
+    for row in range(height // line_height - 1):
+        cv2.putText(img, f"ITEM {row:03d} PRODUCT NAME  {row * 1.37:7.2f}", (width // 20, (row + 1) * line_height),
+                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, 20, max(1, int(font_scale * 2)))
+    return img
+
+
+def binarized(img: np.ndarray, angle: float) -> np.ndarray:
+    (h, w) = img.shape
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    rotated = cv2.warpAffine(img, M, (w, h), flags=cv2.INTER_CUBIC, borderValue=235)
+    _, thresh = cv2.threshold(rotated, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+
+def previous_skew(thresh: np.ndarray) -> float:
+    """The estimator as it was: minAreaRect over every pixel with thresh > 0 (the background)."""
+    coords = np.column_stack(np.where(thresh > 0))
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle < -45:
+        angle = 90 + angle
+    elif angle > 45:
+        angle = angle - 90
+    return angle
+
+
+def min_area_rect_skew(thresh: np.ndarray) -> float:
+    """Reference: the same approach applied to the ink pixels, at full resolution."""
+    coords = np.column_stack(np.where(thresh == 0))
+    angle = cv2.minAreaRect(coords[:, ::-1].astype(np.float32))[-1]
+    if angle > 45:
+        angle -= 90
+    return angle
+
+
+def measure(estimator, thresh: np.ndarray):
+    tracemalloc.start()
+    started = time.perf_counter()
+    angle = estimator(thresh)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return angle, elapsed * 1000, peak / 1e6
+
+
+def main():
+    estimators = [
+        ('previous', previous_skew),
+        ('minAreaRect', min_area_rect_skew),
+        ('projection', OCRService.estimate_skew),
+    ]
+
+    print(f"{'long edge':>10}{'estimator':>14}{'mean err deg':>14}{'max err deg':>13}{'ms':>9}{'peak MB':>10}")
+    for long_edge in LONG_EDGES:
+        img = synthetic_receipt(long_edge)
+        cases = [(angle, binarized(img, angle)) for angle in ANGLES]
+        for name, estimator in estimators:
+            errors, times, peaks = [], [], []
+            for angle, thresh in cases:
+                # Estimators return the correction, i.e. the negated skew
+                estimate, ms, peak = measure(estimator, thresh)
+                errors.append(abs(estimate + angle))
+                times.append(ms)
+                peaks.append(peak)
+            print(f"{long_edge:>10}{name:>14}{np.mean(errors):>14.2f}{max(errors):>13.2f}"
+                  f"{np.mean(times):>9.1f}{max(peaks):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Per-description cost of rule categorization as the keyword list grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_keyword_matcher
+"""
+import random
+import string
+import time
+from app.services.categorizer import Categorizer
+from app.services.keywords import KeywordMatcher
+
+RULE_SET_SIZES = [50, 500, 2000, 5000]
+DESCRIPTIONS = 5000
+
+
+def build_rules(keyword_count: int, rng: random.Random) -> dict:
+    rules = {category: list(keywords) for category, keywords in Categorizer.CATEGORY_KEYWORDS.items()}
+    categories = list(rules)
+    while sum(len(keywords) for keywords in rules.values()) < keyword_count:
+        keyword = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        rules[rng.choice(categories)].append(keyword)
+    return rules
+
+
+def naive_match(rules: dict, description: str):
+    description_lower = description.lower()
+    for category, keywords in rules.items():
+        for keyword in keywords:
+            if keyword in description_lower:
+                return category
+    return None
+
+
+def per_description_us(func, descriptions) -> float:
+    started = time.perf_counter()
+    for description in descriptions:
+        func(description)
+    return (time.perf_counter() - started) / len(descriptions) * 1e6
+
+
+def main():
+    rng = random.Random(7)
+    merchants = ['POS PURCHASE STARBUCKS #4411 SEATTLE WA', 'ACH DEPOSIT PAYROLL ACME CORP',
+                 'CARD 1234 LOCAL HARDWARE STORE', 'ONLINE TRANSFER REF 99812 NO MATCH HERE']
+    descriptions = [rng.choice(merchants) for _ in range(DESCRIPTIONS)]
+
+    print(f"{'keywords':>10}{'naive us/desc':>16}{'compiled us/desc':>18}")
+    for size in RULE_SET_SIZES:
+        rules = build_rules(size, rng)
+        matcher = KeywordMatcher(rules)
+        naive = per_description_us(lambda d: naive_match(rules, d), descriptions)
+        compiled = per_description_us(matcher.match, descriptions)
+        print(f"{size:>10}{naive:>16.2f}{compiled:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
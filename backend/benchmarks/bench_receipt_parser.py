@@ -0,0 +1,153 @@
+"""
+Receipt text parsing: the previous per-line multi-regex parser vs the
+precompiled single-pass scanner.
+
+Large synthetic receipts (items, quantities, totals, tax, dates in several
+formats) are parsed by both; outputs are checked for equality before timing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_receipt_parser
+"""
+import random
+import re
+import time
+from datetime import datetime
+from app.services.ocr import OCRService
+
+RECEIPT_LINES = [50, 500, 5000]
+RECEIPTS = 200
+
+
+def previous_parse_date(date_str: str):
+    formats = [
+        "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d",
+        "%m-%d-%Y", "%d-%m-%Y", "%Y-%m-%d",
+        "%m/%d/%y", "%d/%m/%y", "%y/%m/%d",
+    ]
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def previous_extract_items_and_total(lines):
+    line_items = []
+    total = None
+    price_pattern = r'(\d+[.,]\d{2})'
+    total_patterns = [
+        r'total[:\s]+\$?(\d+[.,]\d{2})',
+        r'amount[:\s]+\$?(\d+[.,]\d{2})',
+        r'balance[:\s]+\$?(\d+[.,]\d{2})',
+    ]
+    for line in lines:
+        line_lower = line.lower()
+        for pattern in total_patterns:
+            match = re.search(pattern, line_lower)
+            if match:
+                total_str = match.group(1).replace(',', '.')
+                try:
+                    total = float(total_str)
+                except ValueError:
+                    pass
+                break
+        prices = re.findall(price_pattern, line)
+        if prices and not any(keyword in line_lower for keyword in ['total', 'subtotal', 'tax', 'amount']):
+            for price_str in prices:
+                desc_end = line.rfind(price_str)
+                description = line[:desc_end].strip()
+                description = re.sub(r'^\d+\s*[xX]?\s*', '', description)
+                if description:
+                    line_items.append({
+                        'description': description,
+                        'quantity': 1.0,
+                        'price': float(price_str.replace(',', '.')),
+                        'confidence': 0.75
+                    })
+    return line_items, total
+
+
+def previous_parse_receipt(text: str) -> dict:
+    """The parser as it was: patterns recompiled (cache-looked-up) per call, several scans per line."""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    result = {
+        'vendor': None, 'vendor_confidence': 0.0, 'date': None, 'date_confidence': 0.0,
+        'line_items': [], 'total': None, 'total_confidence': 0.0, 'raw_text': text
+    }
+    if lines:
+        result['vendor'] = lines[0]
+        result['vendor_confidence'] = 0.8
+    date_pattern = r'\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})\b'
+    for line in lines:
+        date_match = re.search(date_pattern, line)
+        if date_match:
+            parsed_date = previous_parse_date(date_match.group(1))
+            if parsed_date:
+                result['date'] = parsed_date
+                result['date_confidence'] = 0.85
+                break
+    line_items, total = previous_extract_items_and_total(lines)
+    result['line_items'] = line_items
+    result['total'] = total
+    if total:
+        result['total_confidence'] = 0.9
+    confidences = [result['vendor_confidence'], result['date_confidence'], result['total_confidence']]
+    result['confidence'] = sum(confidences) / len(confidences)
+    return result
+
+
+def synthetic_receipt(line_count: int, rng: random.Random) -> str:
+    words = ['MILK', 'Bread', 'eggs', 'Coffee Beans', 'Organic Apples', 'TOTAL', 'Sub', 'amount', 'Tax']
+
+    def price():
+        return f"{rng.randint(0, 999)}{rng.choice('.,')}{rng.randint(0, 99):02d}"
+
+    lines = [rng.choice(['Corner Store', '  ', 'WALMART #123'])]
+    for _ in range(line_count):
+        kind = rng.random()
+        if kind < 0.55:
+            qty = rng.choice(['', '2 ', '3x ', '12 X '])
+            lines.append(f"{qty}{rng.choice(words)} {price()}")
+        elif kind < 0.65:
+            lines.append(f"{rng.choice(words)} {price()}   {price()}")
+        elif kind < 0.72:
+            label = rng.choice(['Subtotal', 'TOTAL', 'Total:', 'Amount', 'Balance Due', 'Tax', 'BALANCE'])
+            lines.append(f"{label} {rng.choice(['', '$'])}{price()}")
+        elif kind < 0.75:
+            lines.append(f"amount {price()} total: {price()} balance {price()}")
+        elif kind < 0.80:
+            day, month, year = rng.randint(1, 31), rng.randint(1, 12), rng.randint(0, 2030)
+            lines.append(rng.choice([
+                f"{month:02d}/{day:02d}/{year}", f"{day}-{month}-{year:04d}", f"{year:04d}/{month}/{day}",
+                f"{month}/{day}-{year % 100:02d}", f"Date: {day:02d}/{month:02d}/{year % 100:02d}",
+            ]))
+        else:
+            lines.append(rng.choice(['Thank you!', 'Cashier: 42', 'Card ****1234', '', 'x 1.5 kg']))
+    return '\n'.join(lines)
+
+
+def main():
+    rng = random.Random(0)
+    service = OCRService()
+
+    print(f"{'lines':>7}{'previous ms':>13}{'scanner ms':>12}{'speedup':>9}")
+    for line_count in RECEIPT_LINES:
+        receipts = [synthetic_receipt(line_count, rng) for _ in range(max(RECEIPTS * 50 // line_count, 5))]
+
+        for text in receipts:
+            assert service.parse_receipt(text) == previous_parse_receipt(text), "parsers disagree"
+
+        timings = {}
+        for name, parse in (('previous', previous_parse_receipt), ('scanner', service.parse_receipt)):
+            started = time.perf_counter()
+            for text in receipts:
+                parse(text)
+            timings[name] = (time.perf_counter() - started) * 1000 / len(receipts)
+
+        print(f"{line_count:>7}{timings['previous']:>13.3f}{timings['scanner']:>12.3f}"
+              f"{timings['previous'] / timings['scanner']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.main import app
+from app.core.database import Base, get_db
+from app.core.security import get_current_user
+from app.services.response_cache import response_cache
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+@pytest.fixture
+def engine():
+    """In-memory database shared by every session and thread of a test."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def login(monkeypatch):
+    """Authenticate API requests as the given user id."""
+    def login_as(user_id):
+        monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: FakeUser(user_id))
+    return login_as
+
+
+@pytest.fixture
+def client(db, login, monkeypatch):
+    """API client logged in as user 1, with requests using the test's db session."""
+    def override_get_db():
+        yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    login(1)
+    response_cache.clear()
+    return TestClient(app)
@@ -0,0 +1,105 @@
+import random
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event
+from app.models.transaction import Budget, Transaction
+from app.services.budgets import BudgetStatusService
+from app.services.rollups import RollupService
+
+
+def count_selects(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def add_transactions(db, user_id, rows):
+    db.add_all(Transaction(user_id=user_id, description="Store", **row) for row in rows)
+    RollupService.add(db, user_id, rows)
+    db.commit()
+
+
+TODAY = date(2024, 5, 16)  # a Thursday
+
+
+class TestBudgetStatusService:
+    def test_period_start(self):
+        assert BudgetStatusService.period_start('monthly', TODAY) == date(2024, 5, 1)
+        assert BudgetStatusService.period_start('weekly', TODAY) == date(2024, 5, 13)
+        assert BudgetStatusService.period_start('yearly', TODAY) == date(2024, 1, 1)
+
+    def test_spending_matches_per_budget_sums(self, db):
+        rng = random.Random(0)
+        categories = ['Groceries', 'Dining', 'Transport', None]
+        rows = [
+            {
+                'date': TODAY - timedelta(days=rng.randint(0, 200)),
+                'amount': round(rng.uniform(-80, 40), 2),
+                'category': rng.choice(categories),
+            }
+            for _ in range(400)
+        ]
+        add_transactions(db, 1, rows)
+        add_transactions(db, 2, [{'date': TODAY, 'amount': -999.0, 'category': 'Groceries'}])
+
+        keys = [
+            (category, BudgetStatusService.period_start(period, TODAY))
+            for category in ('Groceries', 'Dining', 'Transport', 'Travel')
+            for period in ('weekly', 'monthly', 'yearly')
+        ]
+        spending = BudgetStatusService.spending(db, 1, keys)
+
+        for category, start in keys:
+            expected = sum(
+                -row['amount'] for row in rows
+                if row['category'] == category and row['date'] >= start and row['amount'] < 0
+            )
+            assert spending[(category, start)] == pytest.approx(expected)
+
+    def test_no_budgets(self, db):
+        assert BudgetStatusService.spending(db, 1, []) == {}
+        assert BudgetStatusService.statuses(db, 1, TODAY) == []
+
+    def test_statuses_use_one_spending_query(self, db, engine):
+        add_transactions(db, 1, [
+            {'date': TODAY, 'amount': -30.0, 'category': 'Dining'},
+            {'date': date(2024, 5, 2), 'amount': -50.0, 'category': 'Dining'},
+            {'date': date(2024, 2, 1), 'amount': -20.0, 'category': 'Dining'},
+        ])
+        db.add_all([
+            Budget(user_id=1, category='Dining', amount=40.0, period='weekly'),
+            Budget(user_id=1, category='Dining', amount=100.0, period='monthly'),
+            Budget(user_id=1, category='Dining', amount=0.0, period='yearly'),
+            Budget(user_id=2, category='Dining', amount=10.0, period='monthly'),
+        ])
+        db.commit()
+        statements = count_selects(engine)
+
+        statuses = BudgetStatusService.statuses(db, 1, TODAY)
+
+        assert len(statements) == 2  # budgets, then spending
+        assert [(s['budget'].period, s['spent'], s['remaining'], s['percentage']) for s in statuses] == [
+            ('weekly', 30.0, 10.0, 75.0),
+            ('monthly', 80.0, 20.0, 80.0),
+            ('yearly', 100.0, 0, 0),
+        ]
+
+
+class TestBudgetEndpoints:
+    def test_budgets_and_dashboard_agree(self, client, db):
+        add_transactions(db, 1, [{'date': date.today(), 'amount': -12.5, 'category': 'Dining'}])
+        for category in ('Dining', 'Travel'):
+            assert client.post("/api/budgets", json={"category": category, "amount": 50.0}).status_code == 200
+
+        budgets = client.get("/api/budgets").json()
+        summary = client.get("/api/dashboard/summary").json()
+
+        assert [(b['category'], b['spent'], b['remaining'], b['percentage']) for b in budgets] == [
+            ('Dining', 12.5, 37.5, 25.0),
+            ('Travel', 0.0, 50.0, 0.0),
+        ]
+        assert summary['budget_status'] == [
+            {'category': b['category'], 'budget': b['amount'], 'spent': b['spent'],
+             'remaining': b['remaining'], 'percentage': b['percentage'], 'period': b['period']}
+            for b in budgets
+        ]
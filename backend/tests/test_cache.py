@@ -0,0 +1,64 @@
+from app.services.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_get_put(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+
+        assert cache.get('a') == 1
+        assert cache.get('missing', 'default') == 'default'
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.evictions == 1
+
+    def test_clear_and_pop(self):
+        cache = LRUCache(maxsize=4)
+        cache.put('a', 1)
+        cache.put('b', 2)
+
+        assert cache.pop('a') == 1
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_stats_hit_rate(self):
+        cache = LRUCache(maxsize=4)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('a')
+        cache.get('b')
+
+        stats = cache.stats()
+        assert stats['size'] == 1
+        assert stats['hit_rate'] == round(2 / 3, 4)
+
+    def test_evicts_by_bytes(self):
+        cache = LRUCache(maxsize=10, max_bytes=100)
+        cache.put('a', 1, nbytes=60)
+        cache.put('b', 2, nbytes=30)
+        cache.put('c', 3, nbytes=30)
+
+        assert 'a' not in cache
+        assert cache.total_bytes == 60
+        assert cache.evictions == 1
+
+    def test_replacing_entry_updates_bytes(self):
+        cache = LRUCache(maxsize=10, max_bytes=100)
+        cache.put('a', 1, nbytes=60)
+        cache.put('a', 2, nbytes=10)
+        assert cache.total_bytes == 10
+
+        cache.pop('a')
+        assert cache.total_bytes == 0
@@ -0,0 +1,221 @@
+import os
+from app.services.categorizer import Categorizer, get_categorizer
+from app.services.model_store import ModelStore
+
+
+class FakeModel:
+    """Stands in for the sklearn pipeline and records predict calls."""
+
+    def __init__(self, category='Travel'):
+        self.category = category
+        self.calls = []
+
+    def predict(self, descriptions):
+        self.calls.append(list(descriptions))
+        return [f"{self.category}:{description}" for description in descriptions]
+
+
+class TestCategorizer:
+    def setup_method(self):
+        self.categorizer = Categorizer(model_path='/nonexistent/ml_model.pkl')
+
+    def test_categorize_by_rules(self):
+        assert self.categorizer.categorize_by_rules('STARBUCKS #123') == 'Dining'
+        assert self.categorizer.categorize_by_rules('Unknown merchant') is None
+
+    def test_categorize_without_model_defaults_to_other(self):
+        assert self.categorizer.categorize('Unknown merchant') == 'Other'
+
+    def test_categorize_many_keeps_input_order(self):
+        categories = self.categorizer.categorize_many(['Uber trip', 'Mystery', 'Netflix', 'Salary'])
+        assert categories == ['Transportation', 'Other', 'Entertainment', 'Income']
+
+    def test_categorize_many_predicts_unmatched_in_one_call(self):
+        model = FakeModel()
+        self.categorizer.model = model
+
+        categories = self.categorizer.categorize_many(['Kroger', 'Airline A', 'Spotify', 'Airline B'])
+
+        assert categories == ['Groceries', 'Travel:airline a', 'Entertainment', 'Travel:airline b']
+        assert model.calls == [['airline a', 'airline b']]
+
+    def test_categorize_many_skips_model_when_rules_match(self):
+        model = FakeModel()
+        self.categorizer.model = model
+
+        self.categorizer.categorize_many(['Kroger', 'Spotify'])
+
+        assert model.calls == []
+
+    def test_categorize_many_falls_back_when_model_fails(self):
+        class BrokenModel:
+            def predict(self, descriptions):
+                raise RuntimeError("broken")
+
+        self.categorizer.model = BrokenModel()
+        assert self.categorizer.categorize_many(['Mystery', 'Kroger']) == ['Other', 'Groceries']
+
+    def test_categorize_many_empty(self):
+        assert self.categorizer.categorize_many([]) == []
+
+    def test_categorize_matches_categorize_many(self):
+        self.categorizer.model = FakeModel()
+        descriptions = ['Shell gas', 'Corner shop', 'Something else']
+        assert [self.categorizer.categorize(d) for d in descriptions] == self.categorizer.categorize_many(descriptions)
+
+    def test_repeated_descriptions_are_served_from_cache(self):
+        model = FakeModel()
+        self.categorizer.model = model
+
+        first = self.categorizer.categorize_many(['Airline A', ' AIRLINE a ', 'Kroger'])
+        second = self.categorizer.categorize_many(['airline a', 'Kroger'])
+
+        assert first == ['Travel:airline a', 'Travel:airline a', 'Groceries']
+        assert second == ['Travel:airline a', 'Groceries']
+        assert model.calls == [['airline a']]
+
+        stats = self.categorizer.cache.stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 3
+        assert stats['size'] == 2
+
+    def test_cache_eviction_is_bounded(self):
+        categorizer = Categorizer(model_path='/nonexistent/ml_model.pkl', cache_size=2)
+        categorizer.categorize_many(['one', 'two', 'three'])
+
+        assert len(categorizer.cache) == 2
+        assert categorizer.cache.stats()['evictions'] == 1
+
+    def test_training_invalidates_cache(self, tmp_path):
+        categorizer = Categorizer(model_path=str(tmp_path / 'model.pkl'))
+        assert categorizer.categorize('Zephyr Airlines') == 'Other'
+        version = categorizer.model_version
+
+        descriptions = ['Zephyr Airlines', 'Blue Skies Air', 'Jet Fly'] * 2 + ['Tax Office', 'City Tax', 'IRS Tax', 'State tax']
+        categories = ['Travel'] * 6 + ['Taxes'] * 4
+        categorizer.train_model(descriptions, categories)
+
+        assert categorizer.model_version == version + 1
+        assert len(categorizer.cache) == 0
+        assert categorizer.categorize('Zephyr Airlines') == 'Travel'
+
+
+TRAINING_DESCRIPTIONS = ['Zephyr Airlines', 'Blue Skies Air', 'Jet Fly'] * 2 + ['Tax Office', 'City Tax', 'IRS Tax', 'State tax']
+TRAINING_CATEGORIES = ['Travel'] * 6 + ['Taxes'] * 4
+
+
+class TestModelReload:
+    def test_other_instance_picks_up_retrained_model(self, tmp_path):
+        model_path = str(tmp_path / 'model.pkl')
+        trainer = Categorizer(model_path=model_path)
+        reader = Categorizer(model_path=model_path, reload_interval=0)
+        assert reader.categorize('Zephyr Airlines') == 'Other'
+
+        trainer.train_model(TRAINING_DESCRIPTIONS, TRAINING_CATEGORIES)
+
+        assert reader.categorize('Zephyr Airlines') == 'Travel'
+        assert reader.model is not None
+
+    def test_reload_is_throttled(self, tmp_path):
+        model_path = str(tmp_path / 'model.pkl')
+        reader = Categorizer(model_path=model_path, reload_interval=3600)
+        reader.categorize('warm up')
+
+        Categorizer(model_path=model_path).train_model(TRAINING_DESCRIPTIONS, TRAINING_CATEGORIES)
+        assert reader.categorize('Zephyr Airlines') == 'Other'
+
+        reader.refresh_model(force=True)
+        assert reader.categorize('Zephyr Airlines') == 'Travel'
+
+    def test_unchanged_file_is_not_reloaded(self, tmp_path):
+        model_path = str(tmp_path / 'model.pkl')
+        categorizer = Categorizer(model_path=model_path, reload_interval=0)
+        categorizer.train_model(TRAINING_DESCRIPTIONS, TRAINING_CATEGORIES)
+        version = categorizer.model_version
+
+        categorizer.categorize('Zephyr Airlines')
+
+        assert categorizer.model_version == version
+
+    def test_training_writes_no_temp_files(self, tmp_path):
+        Categorizer(model_path=str(tmp_path / 'model.pkl')).train_model(TRAINING_DESCRIPTIONS, TRAINING_CATEGORIES)
+        assert [p.name for p in tmp_path.iterdir()] == ['model.pkl']
+
+    def test_get_categorizer_is_shared(self):
+        assert get_categorizer() is get_categorizer()
+
+
+class TestPerUserModels:
+    def setup_method(self):
+        self.travel = (TRAINING_DESCRIPTIONS, TRAINING_CATEGORIES)
+        self.fares = (TRAINING_DESCRIPTIONS, ['Business'] * 6 + ['Taxes'] * 4)
+
+    def make_categorizer(self, tmp_path, **store_options):
+        store = ModelStore(model_dir=str(tmp_path / 'models'), **store_options)
+        return Categorizer(model_path=str(tmp_path / 'global.pkl'), model_store=store)
+
+    def test_user_models_are_isolated(self, tmp_path):
+        categorizer = self.make_categorizer(tmp_path)
+        categorizer.train_model(*self.travel, user_id=1)
+        categorizer.train_model(*self.fares, user_id=2)
+
+        assert categorizer.categorize('Zephyr Airlines', user_id=1) == 'Travel'
+        assert categorizer.categorize('Zephyr Airlines', user_id=2) == 'Business'
+        assert not (tmp_path / 'global.pkl').exists()
+
+    def test_users_without_model_fall_back_to_global(self, tmp_path):
+        categorizer = self.make_categorizer(tmp_path)
+        assert categorizer.categorize('Zephyr Airlines', user_id=3) == 'Other'
+
+        categorizer.train_model(*self.fares)
+        categorizer.train_model(*self.travel, user_id=1)
+
+        assert categorizer.categorize('Zephyr Airlines', user_id=3) == 'Business'
+        assert categorizer.categorize('Zephyr Airlines', user_id=1) == 'Travel'
+
+    def test_models_load_lazily_and_evict(self, tmp_path):
+        trainer = self.make_categorizer(tmp_path)
+        for user_id in (1, 2, 3):
+            trainer.train_model(*self.travel, user_id=user_id)
+
+        categorizer = self.make_categorizer(tmp_path, max_models=2)
+        assert len(categorizer.model_store.cache) == 0
+
+        for user_id in (1, 2, 3):
+            assert categorizer.categorize('Zephyr Airlines', user_id=user_id) == 'Travel'
+
+        stats = categorizer.model_store.cache.stats()
+        assert stats['size'] == 2
+        assert stats['evictions'] == 1
+        assert stats['bytes'] > 0
+
+    def test_byte_bound_limits_loaded_models(self, tmp_path):
+        trainer = self.make_categorizer(tmp_path)
+        trainer.train_model(*self.travel, user_id=1)
+        trainer.train_model(*self.travel, user_id=2)
+        model_bytes = (tmp_path / 'models' / 'user_1.pkl').stat().st_size
+
+        categorizer = self.make_categorizer(tmp_path, max_bytes=int(model_bytes * 1.5))
+        categorizer.categorize('Zephyr Airlines', user_id=1)
+        categorizer.categorize('Zephyr Airlines', user_id=2)
+
+        assert len(categorizer.model_store.cache) == 1
+
+    def test_retrained_user_model_is_picked_up(self, tmp_path):
+        model_dir = tmp_path / 'models'
+        reader = self.make_categorizer(tmp_path)
+        writer = self.make_categorizer(tmp_path)
+
+        writer.train_model(*self.travel, user_id=1)
+        assert reader.categorize('Zephyr Airlines', user_id=1) == 'Travel'
+
+        writer.train_model(*self.fares, user_id=1)
+        os.utime(model_dir / 'user_1.pkl', ns=(0, 10**18))  # distinct mtime even on coarse clocks
+        assert reader.categorize('Zephyr Airlines', user_id=1) == 'Business'
+
+    def test_deleted_user_model_falls_back(self, tmp_path):
+        categorizer = self.make_categorizer(tmp_path)
+        categorizer.train_model(*self.travel, user_id=1)
+        categorizer.model_store.delete(1)
+
+        assert categorizer.categorize('Zephyr Airlines', user_id=1) == 'Other'
@@ -0,0 +1,106 @@
+import random
+import pytest
+from datetime import date, timedelta
+from app.models.transaction import Transaction
+from app.services.dashboard import DashboardAggregator
+from app.services.rollups import RollupService
+
+
+def add_random_transactions(db, user_id, count, today, seed=0):
+    rng = random.Random(seed)
+    txns = [
+        Transaction(
+            user_id=user_id,
+            date=today - timedelta(days=rng.randint(-2, 90)),
+            description="Store",
+            amount=round(rng.uniform(-200, 150), 2),
+            category=rng.choice(['Groceries', 'Dining', '', None]),
+        )
+        for _ in range(count)
+    ]
+    db.add_all(txns)
+    db.flush()
+    RollupService.add(db, user_id, [RollupService.as_row(txn) for txn in txns])
+    db.commit()
+    return txns
+
+
+def python_summary(txns, today):
+    """The figures as the endpoint used to compute them, over every loaded row."""
+    starts = DashboardAggregator.period_starts(today)
+    breakdown = {}
+    for txn in txns:
+        if txn.amount < 0:
+            category = txn.category or 'Other'
+            breakdown[category] = breakdown.get(category, 0) + abs(txn.amount)
+    periods = []
+    for period in ('daily', 'weekly', 'monthly'):
+        in_period = [t for t in txns if t.date >= starts[period]]
+        income = sum(t.amount for t in in_period if t.amount > 0)
+        expenses = sum(t.amount for t in in_period if t.amount < 0)
+        periods.append({'period': period, 'income': income, 'expenses': abs(expenses), 'balance': income + expenses})
+    return {
+        'total_transactions': len(txns),
+        'total_income': sum(t.amount for t in txns if t.amount > 0),
+        'total_spent': abs(sum(t.amount for t in txns if t.amount < 0)),
+        'balance_periods': periods,
+    }, breakdown
+
+
+class TestDashboardAggregator:
+    def test_period_starts(self):
+        starts = DashboardAggregator.period_starts(date(2024, 5, 16))  # a Thursday
+
+        assert starts == {
+            'daily': date(2024, 5, 16),
+            'weekly': date(2024, 5, 13),
+            'monthly': date(2024, 5, 1),
+        }
+
+    def test_matches_python_computation(self, db):
+        today = date(2024, 5, 16)
+        txns = add_random_transactions(db, 1, 500, today)
+        add_random_transactions(db, 2, 50, today, seed=1)
+
+        totals = DashboardAggregator.totals(db, 1, today)
+        breakdown = DashboardAggregator.category_breakdown(db, 1)
+        expected_totals, expected_breakdown = python_summary(txns, today)
+
+        assert totals['total_transactions'] == expected_totals['total_transactions']
+        assert totals['total_income'] == pytest.approx(expected_totals['total_income'])
+        assert totals['total_spent'] == pytest.approx(expected_totals['total_spent'])
+        for period, expected in zip(totals['balance_periods'], expected_totals['balance_periods']):
+            assert period['period'] == expected['period']
+            for key in ('income', 'expenses', 'balance'):
+                assert period[key] == pytest.approx(expected[key])
+        assert breakdown == pytest.approx(expected_breakdown)
+
+    def test_user_without_transactions(self, db):
+        totals = DashboardAggregator.totals(db, 1, date(2024, 5, 16))
+
+        assert totals['total_transactions'] == 0
+        assert totals['total_income'] == 0
+        assert totals['total_spent'] == 0
+        assert [p['balance'] for p in totals['balance_periods']] == [0, 0, 0]
+        assert DashboardAggregator.category_breakdown(db, 1) == {}
+
+
+class TestDashboardSummaryEndpoint:
+    def test_summary(self, client, db):
+        today = date.today()
+        db.add_all([
+            Transaction(user_id=1, date=today, description="Salary", amount=1000.0),
+            Transaction(user_id=1, date=today, description="Lunch", amount=-12.5, category="Dining"),
+            Transaction(user_id=1, date=today - timedelta(days=400), description="Misc", amount=-7.5),
+        ])
+        RollupService.rebuild(db, 1)
+        db.commit()
+
+        data = client.get("/api/dashboard/summary").json()
+
+        assert data['total_transactions'] == 3
+        assert data['total_income'] == 1000.0
+        assert data['total_spent'] == 20.0
+        assert data['category_breakdown'] == {'Dining': 12.5, 'Other': 7.5}
+        assert data['balance_periods'][0] == {'period': 'daily', 'income': 1000.0, 'expenses': 12.5, 'balance': 987.5}
+        assert len(data['recent_transactions']) == 3
@@ -0,0 +1,66 @@
+import csv
+import pytest
+from datetime import date, datetime
+from app.models.transaction import Transaction
+from app.services.importer import TransactionImporter
+
+
+def make_rows(count):
+    return [
+        {
+            'date': date(2024, 1, 1 + idx % 28),
+            'description': f"Store {idx}",
+            'amount': -float(idx),
+            'category': 'Shopping' if idx % 2 else None,
+        }
+        for idx in range(count)
+    ]
+
+
+class TestTransactionImporter:
+    def test_iter_chunks(self):
+        chunks = list(TransactionImporter.iter_chunks(range(7), 3))
+        assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_import_rows_reports_chunk_progress(self, db):
+        progress = list(TransactionImporter.import_rows(db, 1, make_rows(12), chunk_size=5))
+
+        assert [p['count'] for p in progress] == [5, 5, 2]
+        assert [p['total_imported'] for p in progress] == [5, 10, 12]
+        assert db.query(Transaction).filter(Transaction.user_id == 1).count() == 12
+
+    def test_import_rows_keeps_values_and_timestamps(self, db):
+        list(TransactionImporter.import_rows(db, 7, make_rows(2), chunk_size=10))
+
+        transactions = db.query(Transaction).order_by(Transaction.id).all()
+        assert transactions[0].description == 'Store 0'
+        assert transactions[0].category is None
+        assert transactions[1].category == 'Shopping'
+        assert transactions[1].amount == -1.0
+        assert all(t.created_at is not None for t in transactions)
+
+    def test_chunks_commit_independently(self, db):
+        rows = make_rows(6)
+        rows[4]['description'] = None  # violates NOT NULL in the second chunk
+
+        with pytest.raises(Exception):
+            for _ in TransactionImporter.import_rows(db, 1, rows, chunk_size=3):
+                pass
+        db.rollback()
+
+        assert db.query(Transaction).count() == 3
+
+    def test_sqlite_does_not_use_copy(self, db):
+        assert TransactionImporter.supports_copy(db) is False
+
+    def test_copy_buffer_marks_none_as_null(self):
+        now = datetime(2024, 1, 1, 12, 0)
+        rows = [{**make_rows(1)[0], 'user_id': 1, 'description': '', 'created_at': now, 'updated_at': now}]
+
+        fields = next(csv.reader(TransactionImporter.copy_buffer(rows)))
+        statement = TransactionImporter.copy_statement()
+
+        assert fields[TransactionImporter.COPY_COLUMNS.index('category')] == TransactionImporter.COPY_NULL
+        assert fields[TransactionImporter.COPY_COLUMNS.index('description')] == ''
+        assert "NULL '\\N'" in statement
+        assert "FORCE_NULL (category)" in statement
@@ -0,0 +1,66 @@
+import threading
+import time
+from app.services.jobs import JobRunner
+
+
+def wait(runner, job_id, timeout=5):
+    """Poll until the job has finished."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job['status'] in (JobRunner.SUCCEEDED, JobRunner.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobRunner:
+    def test_successful_job_records_result(self):
+        runner = JobRunner(max_workers=1)
+        job = runner.submit('add', lambda a, b: a + b, 2, 3, owner_id=7)
+
+        assert job['status'] in (JobRunner.QUEUED, JobRunner.RUNNING, JobRunner.SUCCEEDED)
+        finished = wait(runner, job['id'])
+        assert finished['status'] == JobRunner.SUCCEEDED
+        assert finished['result'] == 5
+        assert finished['owner_id'] == 7
+        assert finished['finished_at'] >= finished['started_at']
+
+    def test_failed_job_records_error(self):
+        def boom():
+            raise ValueError("bad input")
+
+        runner = JobRunner(max_workers=1)
+        job = runner.submit('boom', boom)
+
+        finished = wait(runner, job['id'])
+        assert finished['status'] == JobRunner.FAILED
+        assert finished['error'] == "bad input"
+
+    def test_find_active_only_returns_unfinished_jobs(self):
+        release = threading.Event()
+        runner = JobRunner(max_workers=1)
+        job = runner.submit('train', release.wait, owner_id=1)
+
+        assert runner.find_active('train', 1)['id'] == job['id']
+        assert runner.find_active('train', 2) is None
+        assert runner.find_active('ocr', 1) is None
+
+        release.set()
+        wait(runner, job['id'])
+        assert runner.find_active('train', 1) is None
+
+    def test_unknown_job(self):
+        assert JobRunner().get('missing') is None
+
+    def test_oldest_finished_jobs_are_pruned(self):
+        runner = JobRunner(max_workers=1, max_jobs=2)
+        first = runner.submit('noop', lambda: None)
+        wait(runner, first['id'])
+        second = runner.submit('noop', lambda: None)
+        wait(runner, second['id'])
+        third = runner.submit('noop', lambda: None)
+
+        assert runner.get(first['id']) is None
+        assert runner.get(second['id']) is not None
+        assert runner.get(third['id']) is not None
@@ -0,0 +1,64 @@
+import random
+import pytest
+from app.services.categorizer import Categorizer
+from app.services.keywords import KeywordMatcher
+
+
+def naive_match(category_keywords, text):
+    """Reference implementation: check each category's keywords in order."""
+    text = text.lower()
+    for category, keywords in category_keywords.items():
+        if any(keyword.lower() in text for keyword in keywords):
+            return category
+    return None
+
+
+class TestKeywordMatcher:
+    def test_first_category_wins(self):
+        matcher = KeywordMatcher({'Transportation': ['gas'], 'Utilities': ['gas bill']})
+        assert matcher.match('Monthly GAS BILL') == 'Transportation'
+
+    def test_later_category_when_only_longer_keyword_listed_first(self):
+        matcher = KeywordMatcher({'Utilities': ['gas bill'], 'Transportation': ['gas']})
+        assert matcher.match('gas bill') == 'Utilities'
+        assert matcher.match('gas station') == 'Transportation'
+
+    def test_overlapping_keywords_at_different_positions(self):
+        matcher = KeywordMatcher({'A': ['cafe'], 'B': ['supercafeteria'], 'C': ['super']})
+        assert matcher.match('supercafeteria') == 'A'
+
+    def test_special_characters_are_literal(self):
+        matcher = KeywordMatcher({'Shopping': ['amazon.com', 'a+b (x)']})
+        assert matcher.match('AMAZON.COM order') == 'Shopping'
+        assert matcher.match('amazonxcom') is None
+        assert matcher.match('buy a+b (x) now') == 'Shopping'
+
+    def test_no_keywords(self):
+        matcher = KeywordMatcher({'Other': []})
+        assert matcher.match('anything') is None
+
+    def test_matches_naive_scan_on_default_rules(self):
+        rules = Categorizer.CATEGORY_KEYWORDS
+        matcher = KeywordMatcher(rules)
+        keywords = [keyword for words in rules.values() for keyword in words]
+        rng = random.Random(5)
+
+        for _ in range(2000):
+            parts = rng.sample(keywords, rng.randint(0, 3)) + [rng.choice(['x', 'store#1', 'la', ''])]
+            rng.shuffle(parts)
+            text = rng.choice(['', ' ']).join(parts).upper()
+            assert matcher.match(text) == naive_match(rules, text)
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_matches_naive_scan_on_random_rules(self, seed):
+        rng = random.Random(seed)
+        alphabet = 'abc '
+        rules = {
+            f"cat{idx}": [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(3)]
+            for idx in range(6)
+        }
+        matcher = KeywordMatcher(rules)
+
+        for _ in range(500):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            assert matcher.match(text) == naive_match(rules, text)
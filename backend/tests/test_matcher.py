@@ -0,0 +1,204 @@
+import random
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import create_engine, text
+from app.core.database import Base, create_missing_indexes
+from app.models.transaction import Receipt, Transaction
+from app.schemas.transaction import TransactionResponse
+from app.services.matcher import TransactionMatcher
+
+
+def add(db, user_id, day, amount, description="Store"):
+    txn = Transaction(user_id=user_id, date=day, description=description, amount=amount)
+    db.add(txn)
+    db.commit()
+    return txn
+
+
+def reference_score(txn, amount, receipt_date, date_tolerance_days=3):
+    """The scoring previously done in Python over every row in the window."""
+    amount_score = max(0, 1 - abs(txn.amount - amount) / amount)
+    date_score = max(0, 1 - abs((txn.date - receipt_date).days) / date_tolerance_days)
+    return amount_score * 0.6 + date_score * 0.4
+
+
+class TestTransactionMatcher:
+    def test_ranks_by_amount_and_date_similarity(self, db):
+        receipt_date = date(2024, 1, 15)
+        exact = add(db, 1, receipt_date, 50.0)
+        close_amount = add(db, 1, receipt_date, 51.0)
+        close_date = add(db, 1, receipt_date + timedelta(days=1), 50.0)
+        far = add(db, 1, receipt_date - timedelta(days=3), 52.0)
+
+        matches = TransactionMatcher.find_matching_transactions(db, 1, 50.0, receipt_date)
+
+        assert [m.id for m in matches] == [exact.id, close_amount.id, close_date.id, far.id]
+        assert matches[0].score == pytest.approx(1.0)
+        assert matches[3].score == pytest.approx(reference_score(far, 50.0, receipt_date))
+
+    def test_window_and_user_filter(self, db):
+        receipt_date = date(2024, 1, 15)
+        add(db, 1, receipt_date, 60.0)                              # amount out of range
+        add(db, 1, receipt_date + timedelta(days=4), 50.0)          # date out of range
+        add(db, 2, receipt_date, 50.0)                              # another user
+        inside = add(db, 1, receipt_date - timedelta(days=3), 47.5)
+
+        matches = TransactionMatcher.find_matching_transactions(db, 1, 50.0, receipt_date)
+
+        assert [m.id for m in matches] == [inside.id]
+
+    def test_limit_and_order_match_python_scoring(self, db):
+        rng = random.Random(0)
+        receipt_date = date(2024, 3, 10)
+        txns = [
+            add(db, 1, receipt_date + timedelta(days=rng.randint(-3, 3)), round(rng.uniform(95, 105), 2))
+            for _ in range(40)
+        ]
+
+        matches = TransactionMatcher.find_matching_transactions(db, 1, 100.0, receipt_date, limit=5)
+
+        expected = sorted(txns, key=lambda t: (-reference_score(t, 100.0, receipt_date), t.id))[:5]
+        assert [m.id for m in matches] == [t.id for t in expected]
+        for match, txn in zip(matches, expected):
+            assert match.score == pytest.approx(reference_score(txn, 100.0, receipt_date))
+
+    def test_rows_serialize_as_transactions(self, db):
+        txn = add(db, 1, date(2024, 1, 15), 50.0, description="Corner Store")
+
+        match = TransactionMatcher.find_matching_transactions(db, 1, 50.0, date(2024, 1, 15))[0]
+        response = TransactionResponse.from_orm(match)
+
+        assert response.id == txn.id
+        assert response.description == "Corner Store"
+        assert response.date == date(2024, 1, 15)
+
+    def test_window_query_uses_composite_index(self, db):
+        plan = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM transactions "
+            "WHERE user_id = 1 AND date BETWEEN '2024-01-12' AND '2024-01-18' AND amount BETWEEN 47.5 AND 52.5"
+        )).fetchall()
+
+        assert any("ix_transactions_user_date_amount" in row[-1] for row in plan)
+
+
+def naive_reconcile(txns, receipts, amount_tolerance=0.05, date_tolerance_days=3):
+    """Every receipt against every transaction, then the same greedy assignment."""
+    pairs = []
+    for receipt_index, (amount, receipt_date) in enumerate(receipts):
+        for txn in txns:
+            if (amount * (1 - amount_tolerance) <= txn.amount <= amount * (1 + amount_tolerance)
+                    and abs((txn.date - receipt_date).days) <= date_tolerance_days):
+                score = TransactionMatcher.score(txn.amount, txn.date, amount, receipt_date, date_tolerance_days)
+                pairs.append((-score, receipt_index, txn.id))
+    matches = [None] * len(receipts)
+    used = set()
+    for _, receipt_index, txn_id in sorted(pairs):
+        if matches[receipt_index] is None and txn_id not in used:
+            matches[receipt_index] = txn_id
+            used.add(txn_id)
+    return matches
+
+
+class TestReconcile:
+    def test_each_transaction_is_used_once(self, db):
+        receipt_date = date(2024, 1, 15)
+        txn = add(db, 1, receipt_date, 50.0)
+
+        results = TransactionMatcher.reconcile(db, 1, [(50.0, receipt_date), (50.0, receipt_date)])
+
+        assert results[0][0].id == txn.id
+        assert results[0][1] == pytest.approx(1.0)
+        assert results[1] is None
+
+    def test_better_pair_wins_the_shared_transaction(self, db):
+        day = date(2024, 1, 15)
+        a = add(db, 1, day, 50.0)
+        b = add(db, 1, day + timedelta(days=2), 50.0)
+
+        # The second receipt is an exact match for a; the first settles for b
+        results = TransactionMatcher.reconcile(db, 1, [(50.0, day + timedelta(days=1)), (50.0, day)])
+
+        assert [result[0].id for result in results] == [b.id, a.id]
+
+    def test_skips_already_linked_transactions(self, db):
+        day = date(2024, 1, 15)
+        txn = add(db, 1, day, 50.0)
+        db.add(Receipt(user_id=1, transaction_id=txn.id, date=day, total=50.0))
+        db.commit()
+
+        assert TransactionMatcher.reconcile(db, 1, [(50.0, day)]) == [None]
+
+    def test_no_receipts(self, db):
+        assert TransactionMatcher.reconcile(db, 1, []) == []
+
+    def test_matches_brute_force_assignment(self, db):
+        rng = random.Random(1)
+        start = date(2024, 1, 1)
+        txns = [
+            add(db, 1, start + timedelta(days=rng.randint(0, 60)), float(rng.choice([20, 50, 51, 100, 102, 250])))
+            for _ in range(150)
+        ]
+        add(db, 2, start, 50.0)
+        receipts = [
+            (float(rng.choice([20, 49, 50, 100, 101, 300])), start + timedelta(days=rng.randint(-5, 65)))
+            for _ in range(120)
+        ]
+
+        results = TransactionMatcher.reconcile(db, 1, receipts)
+
+        assert [result[0].id if result else None for result in results] == naive_reconcile(txns, receipts)
+
+
+class TestReconcileEndpoint:
+    def test_given_receipts(self, client, db):
+        txn = add(db, 1, date(2024, 1, 15), 50.0, description="Corner Store")
+
+        response = client.post("/api/receipts/reconcile", json={"receipts": [
+            {"date": "2024-01-16", "total": 50.0},
+            {"date": "2024-06-01", "total": 9.99},
+        ]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data['matched'], data['unmatched'], data['linked']) == (1, 1, 0)
+        assert data['matches'][0]['transaction']['id'] == txn.id
+        assert data['matches'][0]['score'] == pytest.approx(0.8667, abs=1e-4)
+        assert data['matches'][1]['transaction'] is None
+
+    def test_stored_receipts_are_linked(self, client, db):
+        txn = add(db, 1, date(2024, 1, 15), 50.0)
+        receipt = Receipt(user_id=1, date=date(2024, 1, 15), total=50.0)
+        db.add_all([receipt, Receipt(user_id=1, date=None, total=12.0), Receipt(user_id=2, date=date(2024, 1, 15), total=50.0)])
+        db.commit()
+
+        data = client.post("/api/receipts/reconcile", json={"link": True}).json()
+
+        assert [m['receipt_id'] for m in data['matches']] == [receipt.id]
+        assert data['linked'] == 1
+        db.refresh(receipt)
+        assert receipt.transaction_id == txn.id
+
+        # Linked receipts and transactions drop out of the next run
+        assert client.post("/api/receipts/reconcile", json={}).json()['matches'] == []
+
+    def test_link_requires_stored_receipts(self, client):
+        response = client.post("/api/receipts/reconcile", json={
+            "receipts": [{"date": "2024-01-15", "total": 50.0}], "link": True
+        })
+
+        assert response.status_code == 400
+
+
+class TestCreateMissingIndexes:
+    def test_adds_index_to_existing_table(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_transactions_user_date_amount"))
+
+        create_missing_indexes(engine)
+        create_missing_indexes(engine)  # idempotent
+
+        with engine.connect() as conn:
+            names = [row[1] for row in conn.execute(text("PRAGMA index_list('transactions')"))]
+        assert "ix_transactions_user_date_amount" in names
@@ -0,0 +1,34 @@
+from app.services.metrics import StageTimings
+
+
+class TestStageTimings:
+    def test_summary(self):
+        metrics = StageTimings()
+        for ms in range(1, 101):
+            metrics.record({'decode': float(ms), 'tesseract': 10.0})
+
+        summary = metrics.summary()
+
+        assert summary['decode']['count'] == 100
+        assert summary['decode']['mean_ms'] == 50.5
+        assert summary['decode']['p50_ms'] == 50.5
+        assert summary['decode']['max_ms'] == 100.0
+        assert summary['tesseract']['p95_ms'] == 10.0
+
+    def test_window_keeps_recent_samples_but_counts_all(self):
+        metrics = StageTimings(window=3)
+        for ms in (100.0, 1.0, 2.0, 3.0):
+            metrics.record({'deskew': ms})
+
+        summary = metrics.summary()['deskew']
+        assert summary['count'] == 4
+        assert summary['max_ms'] == 3.0
+
+    def test_empty(self):
+        assert StageTimings().summary() == {}
+
+    def test_clear(self):
+        metrics = StageTimings()
+        metrics.record({'decode': 1.0})
+        metrics.clear()
+        assert metrics.summary() == {}
@@ -1,5 +1,30 @@
+import cv2
+import numpy as np
 import pytest
-from app.services.ocr import OCRService
+from PIL import Image
+from app.services import ocr
+from app.services.ocr import OCRService, PytesseractEngine, TesserocrEngine, create_ocr_engine
+
+
+def receipt_image(width=1200, height=2000):
+    """Synthetic clean receipt: dark text on a light background."""
+    img = np.full((height, width), 235, dtype=np.uint8)
+    for row in range(height // 40 - 1):
+        cv2.putText(img, f"ITEM {row} PRODUCT   {row * 1.37:.2f}", (40, 40 + row * 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, 20, 2)
+    return img
+
+
+def write_pdf(path, pages):
+    """Write grayscale page images as a PDF, one page each, at 100 dpi."""
+    images = [Image.fromarray(page) for page in pages]
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=100)
+    return str(path)
+
+
+def add_noise(img, sigma, seed=0):
+    noise = np.random.default_rng(seed).normal(0, sigma, img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
 
 
 class TestOCRService:
@@ -121,6 +146,24 @@ class TestOCRService:
         assert total == 11.49
         assert len(items) >= 1
 
+    def test_total_keyword_priority_and_last_total_wins(self):
+        lines = [
+            "Milk 2x 3,50",
+            "amount 3.00 balance 4.00 total: 5.00",
+            "Coffee 1.25 1.25",
+            "Balance: 6.00",
+        ]
+
+        items, total = self.ocr_service._extract_items_and_total(lines)
+
+        assert total == 6.0
+        assert [(item['description'], item['price']) for item in items] == [
+            ("Milk 2x", 3.5), ("Coffee 1.25", 1.25), ("Coffee 1.25", 1.25), ("Balance:", 6.0)
+        ]
+
+        _, total = self.ocr_service._extract_items_and_total(lines[:2])
+        assert total == 5.0
+
     def test_confidence_scoring(self):
         """Test that confidence scores are calculated."""
         ocr_text = """
@@ -133,3 +176,256 @@ class TestOCRService:
 
         assert 'confidence' in result
         assert 0 <= result['confidence'] <= 1
+
+
+class TestPreprocessing:
+    def test_large_images_are_scaled_down(self):
+        service = OCRService(target_long_edge=2000)
+        resized = service.normalize_size(np.zeros((4000, 3000), dtype=np.uint8))
+        assert resized.shape == (2000, 1500)
+
+    def test_small_images_are_scaled_up(self):
+        resized = OCRService().normalize_size(np.zeros((500, 250), dtype=np.uint8))
+        assert max(resized.shape) == OCRService.MIN_LONG_EDGE
+
+    def test_images_in_range_are_untouched(self):
+        img = np.zeros((1500, 800), dtype=np.uint8)
+        assert OCRService().normalize_size(img) is img
+
+    def test_noise_estimate_ignores_text_edges(self):
+        clean = receipt_image()
+
+        assert OCRService.estimate_noise(clean) < 1.0
+        assert 8.0 < OCRService.estimate_noise(add_noise(clean, 10)) < 12.0
+
+    def test_large_jpeg_is_decoded_at_reduced_scale(self, tmp_path):
+        path = str(tmp_path / 'receipt.jpg')
+        cv2.imwrite(path, receipt_image(3000, 4800))
+
+        gray = OCRService(target_long_edge=2000).load_grayscale(path)
+
+        assert gray.ndim == 2
+        assert 2000 <= max(gray.shape) < 4800
+
+    def test_unreadable_image(self, tmp_path):
+        path = tmp_path / 'receipt.png'
+        path.write_bytes(b'not an image')
+
+        with pytest.raises(ValueError):
+            OCRService().load_grayscale(str(path))
+
+    def test_denoise_only_runs_on_noisy_images(self, tmp_path, monkeypatch):
+        calls = []
+        denoise = cv2.fastNlMeansDenoising
+        monkeypatch.setattr(cv2, 'fastNlMeansDenoising', lambda *args: calls.append(1) or denoise(*args))
+
+        clean_path, noisy_path = str(tmp_path / 'clean.png'), str(tmp_path / 'noisy.png')
+        cv2.imwrite(clean_path, receipt_image())
+        cv2.imwrite(noisy_path, add_noise(receipt_image(), 10))
+
+        OCRService().preprocess_image(clean_path)
+        assert calls == []
+        OCRService().preprocess_image(noisy_path)
+        assert calls == [1]
+
+    def test_preprocess_records_stage_timings(self, tmp_path):
+        path = str(tmp_path / 'receipt.png')
+        cv2.imwrite(path, receipt_image())
+        timings = {}
+
+        thresh = OCRService().preprocess_image(path, timings)
+
+        assert set(timings) == {'decode', 'resize', 'denoise', 'threshold', 'deskew'}
+        assert all(ms >= 0 for ms in timings.values())
+        assert set(np.unique(thresh)) <= {0, 255}
+
+
+def rotated_binary(img, angle):
+    (h, w) = img.shape
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    rotated = cv2.warpAffine(img, M, (w, h), flags=cv2.INTER_CUBIC, borderValue=235)
+    _, thresh = cv2.threshold(rotated, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+
+class TestDeskew:
+    @pytest.mark.parametrize('angle', [-12.0, -3.0, -0.7, 0.0, 1.3, 5.0, 14.0])
+    def test_estimate_skew_recovers_rotation(self, angle):
+        correction = OCRService.estimate_skew(rotated_binary(receipt_image(), angle))
+        assert correction == pytest.approx(-angle, abs=0.3)
+
+    def test_estimate_skew_is_resolution_independent(self):
+        small = OCRService.estimate_skew(rotated_binary(receipt_image(600, 1000), 4.0))
+        large = OCRService.estimate_skew(rotated_binary(receipt_image(2400, 4000), 4.0))
+        assert small == pytest.approx(large, abs=0.3)
+
+    def test_blank_page_has_no_skew(self):
+        assert OCRService.estimate_skew(np.full((1000, 600), 255, dtype=np.uint8)) == 0.0
+
+    def test_preprocess_straightens_skewed_receipt(self, tmp_path):
+        img = receipt_image()
+        (h, w) = img.shape
+        M = cv2.getRotationMatrix2D((w // 2, h // 2), 6.0, 1.0)
+        path = str(tmp_path / 'skewed.png')
+        cv2.imwrite(path, cv2.warpAffine(img, M, (w, h), borderValue=235))
+
+        thresh = OCRService().preprocess_image(path)
+
+        assert abs(OCRService.estimate_skew(thresh)) <= 0.5
+
+
+class FakeTessAPI:
+    """Stands in for tesserocr.PyTessBaseAPI."""
+
+    def __init__(self, recognize_ok=True, **options):
+        self.options = options
+        self.recognize_ok = recognize_ok
+        self.images = []
+        self.timeouts = []
+
+    def SetImageBytes(self, data, width, height, bytes_per_pixel, bytes_per_line):
+        self.images.append((len(data), width, height, bytes_per_pixel, bytes_per_line))
+
+    def Recognize(self, timeout=0):
+        self.timeouts.append(timeout)
+        return self.recognize_ok
+
+    def GetUTF8Text(self):
+        return "STORE\nTotal: $1.00\n"
+
+    def End(self):
+        pass
+
+
+class FakeTesserocr:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def PyTessBaseAPI(self, **options):
+        if self.fail:
+            raise RuntimeError("Failed to init API")
+        return FakeTessAPI(**options)
+
+
+class FakeEngine:
+    name = 'fake'
+
+    def __init__(self):
+        self.calls = 0
+
+    def image_to_text(self, image):
+        self.calls += 1
+        return "Corner Store\n01/15/2024\nTotal: $12.50"
+
+
+class TestOCREngines:
+    def test_pytesseract_engine_by_name(self):
+        assert isinstance(create_ocr_engine('pytesseract'), PytesseractEngine)
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            create_ocr_engine('cuneiform')
+
+    def test_auto_prefers_tesserocr(self, monkeypatch):
+        monkeypatch.setattr(ocr, 'tesserocr', FakeTesserocr())
+
+        engine = create_ocr_engine('auto', tessdata_dir='/usr/share/tessdata')
+
+        assert isinstance(engine, TesserocrEngine)
+        assert engine.api.options == {'lang': 'eng', 'psm': 6, 'oem': 3, 'path': '/usr/share/tessdata/'}
+
+    def test_falls_back_when_tesserocr_cannot_start(self, monkeypatch):
+        monkeypatch.setattr(ocr, 'tesserocr', FakeTesserocr(fail=True))
+        assert isinstance(create_ocr_engine('tesserocr'), PytesseractEngine)
+
+    def test_falls_back_when_tesserocr_missing(self, monkeypatch):
+        monkeypatch.setattr(ocr, 'tesserocr', None)
+        assert isinstance(create_ocr_engine('auto'), PytesseractEngine)
+
+    def test_tesserocr_engine_passes_grayscale_bytes(self, monkeypatch):
+        monkeypatch.setattr(ocr, 'tesserocr', FakeTesserocr())
+        engine = TesserocrEngine(timeout=2.5)
+
+        text = engine.image_to_text(np.zeros((30, 20), dtype=np.uint8))
+
+        assert text.startswith("STORE")
+        assert engine.api.images == [(600, 20, 30, 1, 20)]
+        assert engine.api.timeouts == [2500]
+
+    def test_tesserocr_engine_timeout(self, monkeypatch):
+        monkeypatch.setattr(ocr, 'tesserocr', FakeTesserocr())
+        engine = TesserocrEngine(timeout=1)
+        engine.api.recognize_ok = False
+
+        with pytest.raises(TimeoutError):
+            engine.image_to_text(np.zeros((10, 10), dtype=np.uint8))
+
+    def test_service_reuses_one_engine(self, tmp_path, monkeypatch):
+        created = []
+        monkeypatch.setattr(ocr, 'create_ocr_engine', lambda *args: created.append(args) or FakeEngine())
+        path = str(tmp_path / 'receipt.png')
+        cv2.imwrite(path, receipt_image())
+
+        service = OCRService(engine='tesserocr')
+        first = service.process_receipt(path)
+        second = service.process_receipt(path)
+
+        assert len(created) == 1
+        assert service.engine.calls == 2
+        assert first['total'] == second['total'] == 12.5
+        assert 'tesseract' in first['timings']
+
+
+class TestPDF:
+    def test_count_pages(self, tmp_path):
+        path = write_pdf(tmp_path / 'receipt.pdf', [receipt_image(600, 800)] * 3)
+
+        assert ocr.count_pdf_pages(path) == 3
+
+    def test_unreadable_pdf(self, tmp_path):
+        path = tmp_path / 'receipt.pdf'
+        path.write_bytes(b'not a pdf')
+
+        with pytest.raises(ocr.UnreadablePDF):
+            ocr.count_pdf_pages(str(path))
+
+    def test_render_page_at_dpi(self, tmp_path):
+        # 600x800 px at 100 dpi is a 6x8 inch page
+        path = write_pdf(tmp_path / 'receipt.pdf', [receipt_image(600, 800)])
+
+        gray = OCRService().render_pdf_page(path, 0, dpi=150)
+
+        assert gray.shape == pytest.approx((1200, 900), abs=1)
+        assert gray.dtype == np.uint8
+
+    def test_render_page_is_capped_at_target_size(self, tmp_path):
+        path = write_pdf(tmp_path / 'receipt.pdf', [receipt_image(600, 800)])
+
+        gray = OCRService(target_long_edge=1000).render_pdf_page(path, 0, dpi=300)
+
+        assert max(gray.shape) == 1000
+
+    def test_pdf_page_text(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ocr, 'create_ocr_engine', lambda *args: FakeEngine())
+        monkeypatch.setattr(ocr, '_worker_service', None)
+        path = write_pdf(tmp_path / 'receipt.pdf', [receipt_image(600, 800)] * 2)
+
+        page = ocr.process_pdf_page_file(path, 1, dpi=100)
+
+        assert page['text'].startswith('Corner Store')
+        assert {'render', 'threshold', 'tesseract'} <= set(page['timings'])
+
+    def test_merge_pages_parses_in_page_order(self):
+        pages = [
+            {'text': 'Corner Store\n01/15/2024\nMilk 3.50', 'timings': {'render': 1.0, 'tesseract': 10.0}},
+            {'text': 'Bread 9.00\nTotal: $12.50', 'timings': {'render': 2.0, 'tesseract': 20.0}},
+        ]
+
+        result = ocr.merge_pdf_pages(pages)
+
+        assert result['vendor'] == 'Corner Store'
+        assert result['total'] == 12.5
+        assert [item['description'] for item in result['line_items']] == ['Milk', 'Bread']
+        assert result['timings']['render'] == 3.0
+        assert result['timings']['tesseract'] == 30.0
+        assert 'parse' in result['timings']
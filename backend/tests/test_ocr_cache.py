@@ -0,0 +1,47 @@
+from datetime import datetime
+from app.services.ocr_cache import OCRResultCache
+
+RESULT = {
+    'vendor': 'Corner Store',
+    'date': datetime(2024, 1, 15),
+    'total': 12.5,
+    'line_items': [],
+    'confidence': 0.85,
+    'raw_text': 'Corner Store',
+}
+
+
+class TestOCRResultCache:
+    def test_miss_then_hit(self, tmp_path):
+        cache = OCRResultCache(str(tmp_path))
+        key = cache.key_for(OCRResultCache.content_hash(b'receipt'))
+
+        assert cache.get(key) is None
+        cache.put(key, RESULT)
+        assert cache.get(key) == RESULT
+
+    def test_results_persist_on_disk(self, tmp_path):
+        key = OCRResultCache(str(tmp_path)).key_for(OCRResultCache.content_hash(b'receipt'))
+        OCRResultCache(str(tmp_path)).put(key, RESULT)
+
+        assert OCRResultCache(str(tmp_path)).get(key) == RESULT
+
+    def test_null_date_round_trips(self, tmp_path):
+        key = OCRResultCache(str(tmp_path)).key_for(OCRResultCache.content_hash(b'receipt'))
+        OCRResultCache(str(tmp_path)).put(key, {**RESULT, 'date': None})
+
+        assert OCRResultCache(str(tmp_path)).get(key)['date'] is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = OCRResultCache(str(tmp_path))
+        key = cache.key_for(OCRResultCache.content_hash(b'receipt'))
+        (tmp_path / f"{key}.json").write_text('{not json')
+
+        assert cache.get(key) is None
+
+    def test_key_uses_content_hash(self, tmp_path):
+        cache = OCRResultCache(str(tmp_path))
+
+        assert cache.content_hash(b'a') == cache.content_hash(b'a')
+        assert cache.content_hash(b'a') != cache.content_hash(b'b')
+        assert cache.key_for('abc') == 'sha256-abc'
@@ -0,0 +1,101 @@
+import asyncio
+import time
+import pytest
+from app.services.ocr_pool import OCRPool, OCRPoolBusy
+
+
+def square(value):
+    return value * value
+
+
+def slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def fail():
+    raise ValueError("unreadable image")
+
+
+@pytest.fixture
+def pool():
+    pool = OCRPool(max_workers=1, max_pending=2, timeout=5)
+    yield pool
+    pool.shutdown()
+
+
+class TestOCRPool:
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_process(self, pool):
+        assert await pool.run(square, 7) == 49
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_propagate(self, pool):
+        with pytest.raises(ValueError, match="unreadable image"):
+            await pool.run(fail)
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, pool):
+        await pool.run(square, 1)  # warm up the worker process
+        pool.timeout = 0.2
+
+        with pytest.raises(TimeoutError):
+            await pool.run(slow, 1.0)
+
+        # The slot is held until the worker actually finishes the job
+        assert pool.pending == 1
+        await asyncio.sleep(1.5)
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self, pool):
+        first = asyncio.ensure_future(pool.run(slow, 0.5))
+        second = asyncio.ensure_future(pool.run(slow, 0.1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OCRPoolBusy):
+            await pool.run(square, 2)
+
+        assert await asyncio.gather(first, second) == [0.5, 0.1]
+        assert await pool.run(square, 2) == 4
+
+    def test_map_blocking_waits_for_slots_and_keeps_order(self, pool):
+        # More calls than max_pending: later ones wait for a slot
+        assert pool.map_blocking(square, [(n,) for n in range(5)]) == [0, 1, 4, 9, 16]
+        assert pool.pending == 0
+
+    def test_map_blocking_runs_calls_in_parallel(self):
+        pool = OCRPool(max_workers=2, max_pending=4, timeout=10)
+        try:
+            pool.map_blocking(square, [(1,), (2,)])  # warm up both workers
+
+            start = time.monotonic()
+            assert pool.map_blocking(slow, [(0.5,), (0.5,)]) == [0.5, 0.5]
+            assert time.monotonic() - start < 0.9
+        finally:
+            pool.shutdown()
+
+    def test_map_blocking_timeout_covers_the_batch(self, pool):
+        pool.map_blocking(square, [(1,)])
+        pool.timeout = 0.5
+
+        with pytest.raises(TimeoutError):
+            pool.map_blocking(slow, [(0.3,), (0.3,), (0.3,)])
+
+    @pytest.mark.asyncio
+    async def test_run_many_rejects_when_full(self, pool):
+        first = asyncio.ensure_future(pool.run(slow, 0.3))
+        second = asyncio.ensure_future(pool.run(slow, 0.1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OCRPoolBusy):
+            await pool.run_many(square, [(2,), (3,)])
+
+        await asyncio.gather(first, second)
+        assert await pool.run_many(square, [(2,), (3,)]) == [4, 9]
+
+    def test_shutdown_is_idempotent(self, pool):
+        pool.shutdown()
+        pool.shutdown()
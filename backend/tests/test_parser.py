@@ -1,5 +1,6 @@
 import pytest
 from datetime import date
+from io import BytesIO
 from app.services.parser import CSVParser
 
 
@@ -70,3 +71,50 @@ class TestCSVParser:
         assert len(preview['preview']) == 1
         assert preview['delimiter'] == ','
         assert preview['preview'][0]['description'] == 'Store'
+
+    def test_preview_csv_counts_rows_beyond_preview(self):
+        lines = ["Date,Description,Amount"]
+        lines += [f"2024-01-{day:02d},Store {day},-{day}.00" for day in range(1, 26)]
+        csv_content = "\n".join(lines)
+
+        preview = CSVParser.preview_csv(csv_content, max_rows=5)
+
+        assert preview['total_rows'] == 25
+        assert len(preview['preview']) == 5
+        assert preview['preview'][-1]['description'] == 'Store 5'
+        assert 'all_rows' not in preview
+
+    def test_stream_csv_from_binary_file(self):
+        csv_content = "Posted;Memo;Value\n15/01/2024;Café Zoë;-4,50\n\n16/01/2024;Bakery;(3,20)\n"
+
+        rows, delimiter = CSVParser.stream_csv(BytesIO(csv_content.encode('utf-8')))
+        rows = list(rows)
+
+        assert delimiter == ';'
+        assert [row['row_number'] for row in rows] == [1, 2]
+        assert rows[0]['description'] == 'Café Zoë'
+        assert rows[0]['amount'] == -4.50
+        assert rows[1]['date'] == date(2024, 1, 16)
+        assert rows[1]['amount'] == -3.20
+
+    def test_stream_csv_is_lazy(self):
+        def lines():
+            yield "Date,Description,Amount\n"
+            yield "2024-01-15,Store,-10.50\n"
+            raise AssertionError("parser read past the requested rows")
+
+        rows, _ = CSVParser.stream_csv(lines())
+
+        assert next(rows)['description'] == 'Store'
+
+    def test_stream_csv_skips_short_rows_and_missing_columns(self):
+        rows, _ = CSVParser.stream_csv("Date,Description,Amount\n2024-01-15,Store\n2024-01-16,Shop,-1.00")
+        assert [row['row_number'] for row in list(rows)] == [2]
+
+        rows, _ = CSVParser.stream_csv("Date,Notes\n2024-01-15,Store")
+        assert list(rows) == []
+
+    def test_resolve_columns(self):
+        columns = CSVParser.resolve_columns(['Transaction Date', 'Payee', 'Debit', 'Balance'])
+        assert columns == ('Transaction Date', 'Payee', 'Debit')
+        assert CSVParser.resolve_columns(['Date', 'Amount']) is None
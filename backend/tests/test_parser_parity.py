@@ -0,0 +1,105 @@
+import random
+import pytest
+from datetime import date, timedelta
+from io import BytesIO
+from app.services.parser import CSVParser
+
+
+def assert_parity(csv_content):
+    """Both parse modes must return identical rows and delimiter."""
+    row_rows, row_delimiter = CSVParser.parse_csv(csv_content, mode='rows')
+    columnar_rows, columnar_delimiter = CSVParser.parse_csv(csv_content, mode='columnar')
+
+    assert columnar_delimiter == row_delimiter
+    assert columnar_rows == row_rows
+    return row_rows
+
+
+def random_statement(seed: int, rows: int = 500) -> str:
+    """Build a messy but realistic statement with mixed formats."""
+    rng = random.Random(seed)
+    delimiter = rng.choice([',', ';', '\t'])
+    date_format = rng.choice(CSVParser.DATE_FORMATS)
+    start = date(2020, 1, 1)
+
+    lines = [delimiter.join(['Posted Date', 'Payee', 'Amount', 'Balance'])]
+    for _ in range(rows):
+        txn_date = (start + timedelta(days=rng.randint(0, 1500))).strftime(date_format)
+        value = rng.uniform(-2000, 2000)
+        amount = rng.choice([
+            f"{value:.2f}",
+            f"({abs(value):.2f})",
+            f"${value:.2f}",
+            f"€{value:.2f}".replace('.', ',') if delimiter != ',' else f"£{value:.2f}",
+            f"{value:,.2f}" if delimiter != ',' else f"{value:.1f}",
+            f"{int(value)}",
+            " ",
+            "n/a",
+        ])
+        description = rng.choice(['Starbucks', ' Shell Gas ', 'Café Zoë', 'AMAZON MKTP', ''])
+        if rng.random() < 0.03:
+            txn_date = rng.choice(['', 'pending', '31/02/2024', '2024-13-01'])
+        if rng.random() < 0.02:
+            lines.append('')
+        lines.append(delimiter.join([txn_date, description, amount, '100.00']))
+
+    return '\n'.join(lines)
+
+
+class TestParseModeParity:
+    @pytest.mark.parametrize('csv_content', [
+        "Date,Description,Amount\n2024-01-15,Grocery Store,-45.20\n2024-01-16,Gas Station,-30.00",
+        "Date;Description;Amount\n15/01/2024;Bakery;-4,50\n16/01/2024;Salary;1.234,56",
+        "Date\tMemo\tValue\n01/15/2024\tCoffee\t(3.75)\n01/05/2024\tTea\t€2.10",
+        "Transaction Date,Merchant,Debit\n15-01-2024,Shop,$1,234.50\n05-01-2024,Shop,¥300",
+        "Date,Description,Amount\n2024/01/15,Store,-10\n01/15/2024,Mixed formats,5\n15/01/2024,Again,6",
+        "Date,Description,Amount\n\n2024-01-15,Store,-10\n   \n2024-01-16,Store,-11\n",
+        "Date,Description,Amount\n2024-01-15,Store\n2024-01-16,,-3\n2024-01-17,Extra,1,2,3",
+        "Date,Description,Amount\n2024-01-15,Store,nan\n2024-01-16,Store,inf\n2024-01-17,Store,1_000",
+        "Date,Description,Amount\n0001-01-01,Ancient,1\n9999-12-31,Future,2\n2024-02-30,Invalid,3",
+        'Date,Description,Amount\n2024-01-15,"Quoted, with delimiter",-1.00\n2024-01-16,"Multi\nline",2',
+        "Date,Description,Amount\n2024-01-15,Store,()\n2024-01-16,Store,$\n2024-01-17,Store,1,2,3",
+        "Date,Notes\n2024-01-15,No amount column",
+        "Date,Description,Amount\n",
+        "",
+    ])
+    def test_parity_on_edge_cases(self, csv_content):
+        assert_parity(csv_content)
+
+    @pytest.mark.parametrize('seed', range(12))
+    def test_parity_on_random_statements(self, seed):
+        rows = assert_parity(random_statement(seed))
+        assert len(rows) > 0
+
+    def test_parity_across_chunks(self):
+        csv_content = random_statement(99, rows=2500)
+        frames, _ = CSVParser.stream_frames(csv_content, chunksize=300)
+        chunked_rows = [row for frame in frames for row in CSVParser.frame_to_rows(frame)]
+
+        rows, _ = CSVParser.parse_csv(csv_content, mode='rows')
+        assert chunked_rows == rows
+
+    def test_parity_on_binary_stream(self):
+        csv_content = random_statement(7)
+        columnar_rows, _ = CSVParser.parse_csv(BytesIO(csv_content.encode('utf-8')), mode='columnar')
+        rows, _ = CSVParser.parse_csv(csv_content, mode='rows')
+        assert columnar_rows == rows
+
+    def test_preview_parity(self):
+        csv_content = random_statement(3)
+        assert CSVParser.preview_csv(csv_content, mode='columnar') == CSVParser.preview_csv(csv_content, mode='rows')
+
+    def test_ambiguous_dates_follow_format_priority(self):
+        # The sample only shows month-first dates, but day-first still wins when both fit
+        csv_content = "Date,Description,Amount\n01/15/2024,A,1\n01/05/2024,B,2"
+        rows = assert_parity(csv_content)
+        assert rows[1]['date'] == date(2024, 5, 1)
+
+    def test_infer_date_formats(self):
+        assert CSVParser.infer_date_formats(['2024-01-15']) == ['%Y-%m-%d']
+        assert CSVParser.infer_date_formats(['01/15/2024']) == ['%d/%m/%Y', '%m/%d/%Y']
+        assert CSVParser.infer_date_formats(['garbage']) == []
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            CSVParser.parse_csv("Date,Description,Amount", mode='fast')
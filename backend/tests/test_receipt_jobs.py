@@ -0,0 +1,267 @@
+import time
+from datetime import datetime
+from io import BytesIO
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine
+from app.api import receipts
+from app.core.database import Base
+from app.services.ocr_cache import OCRResultCache
+from app.services.metrics import StageTimings
+
+
+OCR_RESULT = {
+    'vendor': 'Corner Store',
+    'date': datetime(2024, 1, 15),
+    'total': 12.5,
+    'line_items': [{'description': 'Milk', 'quantity': 1.0, 'price': 12.5, 'confidence': 0.75}],
+    'confidence': 0.85,
+    'raw_text': 'Corner Store\n01/15/2024\nMilk 12.50\nTotal 12.50',
+}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database: background jobs open their own sessions from other threads
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def client(client, session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(receipts, "SessionLocal", session_factory)
+    monkeypatch.setattr(receipts, "ocr_cache", OCRResultCache(str(tmp_path / 'ocr_cache')))
+    monkeypatch.setattr(receipts, "ocr_timings", StageTimings())
+    monkeypatch.setattr(receipts.settings, "UPLOAD_DIR", str(tmp_path / 'uploads'))
+    return client
+
+
+def wait_for_job(client, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/receipts/jobs/{job_id}").json()
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestReceiptOCRJobs:
+    def upload(self, client):
+        return client.post(
+            "/api/receipts/upload?async=true",
+            files={"file": ("receipt.png", b"fake image", "image/png")}
+        )
+
+    def test_async_upload_returns_job_then_result(self, client, monkeypatch):
+        monkeypatch.setattr(receipts.ocr_pool, "run_blocking", lambda fn, *args: OCR_RESULT)
+
+        response = self.upload(client)
+        assert response.status_code == 202
+        assert response.json()['status'] in ('queued', 'running', 'succeeded')
+
+        job = wait_for_job(client, response.json()['job_id'])
+        assert job['status'] == 'succeeded', job['error']
+        assert job['result']['vendor'] == 'Corner Store'
+        assert job['result']['date'] == '2024-01-15'
+        assert job['result']['line_items'][0]['description'] == 'Milk'
+
+    def test_failed_job_reports_error_and_removes_file(self, client, monkeypatch, tmp_path):
+        def broken(fn, *args):
+            raise RuntimeError("tesseract crashed")
+
+        monkeypatch.setattr(receipts.ocr_pool, "run_blocking", broken)
+
+        job = wait_for_job(client, self.upload(client).json()['job_id'])
+
+        assert job['status'] == 'failed'
+        assert job['error'] == 'tesseract crashed'
+        assert job['result'] is None
+        assert list((tmp_path / 'uploads').iterdir()) == []
+
+    def test_jobs_are_private(self, client, login, monkeypatch):
+        monkeypatch.setattr(receipts.ocr_pool, "run_blocking", lambda fn, *args: OCR_RESULT)
+        job_id = self.upload(client).json()['job_id']
+
+        login(2)
+        assert client.get(f"/api/receipts/jobs/{job_id}").status_code == 404
+
+    def test_unknown_job(self, client):
+        assert client.get("/api/receipts/jobs/missing").status_code == 404
+
+    def test_full_queue_is_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(receipts.settings, "OCR_QUEUE_SIZE", 0)
+
+        response = self.upload(client)
+
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == '5'
+
+
+class TestDuplicateUploads:
+    def upload(self, client, content=b"same receipt bytes", query=""):
+        return client.post(
+            f"/api/receipts/upload{query}",
+            files={"file": ("receipt.png", content, "image/png")}
+        )
+
+    def test_duplicate_upload_skips_ocr_and_file_write(self, client, monkeypatch, tmp_path):
+        calls = []
+
+        async def fake_run(fn, *args):
+            calls.append(args[0])
+            return OCR_RESULT
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", fake_run)
+
+        first = self.upload(client)
+        second = self.upload(client)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert len(calls) == 1
+        assert len(list((tmp_path / 'uploads').iterdir())) == 1
+
+    def test_different_content_is_processed(self, client, monkeypatch):
+        calls = []
+
+        async def fake_run(fn, *args):
+            calls.append(args[0])
+            return OCR_RESULT
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", fake_run)
+
+        self.upload(client, b"receipt one")
+        self.upload(client, b"receipt two")
+
+        assert len(calls) == 2
+
+    def test_async_upload_uses_cached_result(self, client, monkeypatch):
+        async def fake_run(fn, *args):
+            return OCR_RESULT
+
+        def no_ocr(fn, *args):
+            raise AssertionError("OCR should not run for a cached upload")
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", fake_run)
+        monkeypatch.setattr(receipts.ocr_pool, "run_blocking", no_ocr)
+
+        self.upload(client)
+        job = wait_for_job(client, self.upload(client, query="?async=true").json()['job_id'])
+
+        assert job['status'] == 'succeeded'
+        assert job['result']['total'] == 12.5
+
+    def test_failed_ocr_is_not_cached(self, client, monkeypatch):
+        async def broken(fn, *args):
+            raise RuntimeError("tesseract crashed")
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", broken)
+        assert self.upload(client).status_code == 500
+
+        async def fake_run(fn, *args):
+            return OCR_RESULT
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", fake_run)
+        assert self.upload(client).status_code == 200
+
+
+class TestOCRDebugAndMetrics:
+    def upload(self, client, query="?debug=true"):
+        return client.post(
+            f"/api/receipts/upload{query}",
+            files={"file": ("receipt.png", b"debug receipt", "image/png")}
+        )
+
+    def test_debug_timings_and_metrics(self, client, monkeypatch):
+        async def fake_run(fn, *args):
+            return {**OCR_RESULT, 'timings': {'decode': 5.0, 'tesseract': 120.0}}
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", fake_run)
+
+        fresh = self.upload(client).json()
+        cached = self.upload(client).json()
+
+        assert fresh['debug'] == {'cached': False, 'timings_ms': {'decode': 5.0, 'tesseract': 120.0}}
+        assert cached['debug'] == {'cached': True, 'timings_ms': None}
+
+        metrics = client.get("/api/receipts/metrics").json()
+        assert metrics['stages']['tesseract']['count'] == 1
+        assert metrics['stages']['decode']['mean_ms'] == 5.0
+        assert metrics['cache']['hits'] == 1
+
+    def test_debug_is_opt_in(self, client, monkeypatch):
+        async def fake_run(fn, *args):
+            return {**OCR_RESULT, 'timings': {'decode': 5.0}}
+
+        monkeypatch.setattr(receipts.ocr_pool, "run", fake_run)
+
+        assert self.upload(client, query="").json()['debug'] is None
+
+
+def pdf_bytes(pages):
+    images = [Image.new('L', (300, 400), 255) for _ in range(pages)]
+    buffer = BytesIO()
+    images[0].save(buffer, format='PDF', save_all=True, append_images=images[1:])
+    return buffer.getvalue()
+
+
+PDF_PAGES = [
+    {'text': 'Corner Store\n01/15/2024\nMilk 3.50', 'timings': {'tesseract': 10.0}},
+    {'text': 'Bread 9.00\nTotal: $12.50', 'timings': {'tesseract': 12.0}},
+]
+
+
+class TestPDFUploads:
+    def upload(self, client, content, query=""):
+        return client.post(
+            f"/api/receipts/upload{query}",
+            files={"file": ("invoice.pdf", content, "application/pdf")}
+        )
+
+    def test_pages_are_ocrd_together_and_merged(self, client, monkeypatch):
+        calls = []
+
+        async def fake_run_many(fn, arg_list):
+            calls.append(arg_list)
+            return [PDF_PAGES[index] for _, index, _, _ in arg_list]
+
+        monkeypatch.setattr(receipts.ocr_pool, "run_many", fake_run_many)
+
+        response = self.upload(client, pdf_bytes(2))
+
+        assert response.status_code == 200
+        assert [args[1] for args in calls[0]] == [0, 1]
+        data = response.json()
+        assert data['vendor'] == 'Corner Store'
+        assert data['total'] == 12.5
+        assert [item['description'] for item in data['line_items']] == ['Milk', 'Bread']
+
+    def test_async_pdf_upload(self, client, monkeypatch):
+        monkeypatch.setattr(
+            receipts.ocr_pool, "map_blocking",
+            lambda fn, arg_list: [PDF_PAGES[index] for _, index, _, _ in arg_list]
+        )
+
+        response = self.upload(client, pdf_bytes(2), query="?async=true")
+        job = wait_for_job(client, response.json()['job_id'])
+
+        assert job['status'] == 'succeeded', job['error']
+        assert job['result']['total'] == 12.5
+
+    def test_too_many_pages(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr(receipts.settings, "OCR_PDF_MAX_PAGES", 2)
+
+        response = self.upload(client, pdf_bytes(3))
+
+        assert response.status_code == 413
+        assert "3 pages" in response.json()['detail']
+        assert list((tmp_path / 'uploads').iterdir()) == []
+
+    def test_unreadable_pdf(self, client, tmp_path):
+        response = self.upload(client, b"not a pdf")
+
+        assert response.status_code == 400
+        assert "Could not read PDF" in response.json()['detail']
+        assert list((tmp_path / 'uploads').iterdir()) == []
@@ -0,0 +1,121 @@
+import pytest
+from datetime import date
+from app.api import dashboard as dashboard_api
+from app.models.transaction import Transaction
+from app.services.importer import TransactionImporter
+from app.services.response_cache import ResponseCache
+from app.services.rollups import RollupService
+from app.services.versions import DataVersionService
+
+
+class TestDataVersionService:
+    def test_bump_increments_per_user(self, db):
+        assert DataVersionService.current(db, 1) == 0
+
+        DataVersionService.bump(db, 1)
+        DataVersionService.bump(db, 1)
+        DataVersionService.bump(db, 2)
+
+        assert DataVersionService.current(db, 1) == 2
+        assert DataVersionService.current(db, 2) == 1
+
+    def test_bump_rolls_back_with_the_write(self, db):
+        DataVersionService.bump(db, 1)
+        db.commit()
+        DataVersionService.bump(db, 1)
+        db.rollback()
+
+        assert DataVersionService.current(db, 1) == 1
+
+    def test_import_bumps_once_per_chunk(self, db):
+        rows = [{'date': date(2024, 1, 15), 'description': "Store", 'amount': -1.0} for _ in range(5)]
+
+        list(TransactionImporter.import_rows(db, 1, rows, chunk_size=2))
+
+        assert DataVersionService.current(db, 1) == 3
+
+
+class TestResponseCache:
+    def test_builds_once_per_version(self):
+        cache = ResponseCache(maxsize=4)
+        builds = []
+
+        def build():
+            builds.append(1)
+            return b'{"n": %d}' % len(builds)
+
+        first = cache.get_or_build(('dashboard', 1), 0, build)
+        assert cache.get_or_build(('dashboard', 1), 0, build) == first
+        second = cache.get_or_build(('dashboard', 1), 1, build)
+
+        assert len(builds) == 2
+        assert second[1] == b'{"n": 2}'
+        assert second[0] != first[0]
+
+    def test_etag_depends_only_on_body(self):
+        assert ResponseCache.etag_for(b'{}') == ResponseCache.etag_for(b'{}')
+        assert ResponseCache.etag_for(b'{}') != ResponseCache.etag_for(b'[]')
+
+    @pytest.mark.parametrize("header, expected", [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('*', True),
+        ('"xyz"', False),
+    ])
+    def test_if_none_match(self, header, expected):
+        assert ResponseCache.matches(header, '"abc"') is expected
+
+
+class TestCachedEndpoints:
+    def test_dashboard_etag_and_invalidation(self, client, db, monkeypatch):
+        txn = Transaction(user_id=1, date=date.today(), description="Lunch", amount=-12.5, category="Dining")
+        db.add(txn)
+        RollupService.rebuild(db, 1)
+        db.commit()
+
+        builds = []
+        build = dashboard_api.build_dashboard_summary
+        monkeypatch.setattr(dashboard_api, "build_dashboard_summary", lambda *args: builds.append(1) or build(*args))
+
+        first = client.get("/api/dashboard/summary")
+        etag = first.headers['etag']
+        assert first.json()['total_spent'] == 12.5
+
+        again = client.get("/api/dashboard/summary")
+        not_modified = client.get("/api/dashboard/summary", headers={"If-None-Match": etag})
+        assert again.content == first.content
+        assert not_modified.status_code == 304
+        assert not_modified.content == b''
+        assert not_modified.headers['etag'] == etag
+        assert len(builds) == 1
+
+        client.patch(f"/api/transactions/{txn.id}", json={"amount": -20.0})
+
+        changed = client.get("/api/dashboard/summary", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers['etag'] != etag
+        assert changed.json()['total_spent'] == 20.0
+        assert len(builds) == 2
+
+    def test_budget_writes_invalidate_budget_list(self, client):
+        empty = client.get("/api/budgets")
+        assert empty.json() == []
+
+        created = client.post("/api/budgets", json={"category": "Dining", "amount": 50.0}).json()
+        response = client.get("/api/budgets", headers={"If-None-Match": empty.headers['etag']})
+        assert response.status_code == 200
+        assert [b['id'] for b in response.json()] == [created['id']]
+
+        client.delete(f"/api/budgets/{created['id']}")
+        assert client.get("/api/budgets").json() == []
+
+    def test_cache_is_per_user(self, client, db, login):
+        db.add(Transaction(user_id=2, date=date.today(), description="Rent", amount=-900.0))
+        RollupService.rebuild(db)
+        db.commit()
+
+        assert client.get("/api/dashboard/summary").json()['total_spent'] == 0
+        login(2)
+        assert client.get("/api/dashboard/summary").json()['total_spent'] == 900.0
@@ -0,0 +1,115 @@
+from datetime import date
+from app.commands import rollups as rollups_command
+from app.models.transaction import DailyRollup, Transaction
+from app.services.importer import TransactionImporter
+from app.services.rollups import RollupService
+
+
+def rollups(db, user_id=1):
+    return {
+        (r.day, r.category): (round(r.income_sum, 6), round(r.expense_sum, 6), r.count)
+        for r in db.query(DailyRollup).filter(DailyRollup.user_id == user_id)
+    }
+
+
+DAY = date(2024, 1, 15)
+
+
+class TestRollupService:
+    def test_add_merges_into_existing_rows(self, db):
+        RollupService.add(db, 1, [
+            {'date': DAY, 'amount': -10.0, 'category': 'Dining'},
+            {'date': DAY, 'amount': 100.0, 'category': None},
+        ])
+        RollupService.add(db, 1, [
+            {'date': DAY, 'amount': -2.5, 'category': 'Dining'},
+            {'date': DAY, 'amount': 0.0, 'category': ''},
+        ])
+
+        assert rollups(db) == {
+            (DAY, 'Dining'): (0.0, 12.5, 2),
+            (DAY, ''): (100.0, 0.0, 2),
+        }
+
+    def test_replace_moves_an_edit_and_drops_empty_rows(self, db):
+        before = {'date': DAY, 'amount': -10.0, 'category': 'Dining'}
+        RollupService.add(db, 1, [before])
+
+        RollupService.replace(db, 1, before, {**before, 'amount': 25.0, 'category': 'Refunds'})
+
+        assert rollups(db) == {(DAY, 'Refunds'): (25.0, 0.0, 1)}
+
+    def test_rebuild_matches_incremental_and_check(self, db):
+        rows = [
+            {'date': date(2024, 1, 1 + i % 5), 'amount': (-1) ** i * (i + 0.1), 'category': ['A', None, 'B'][i % 3]}
+            for i in range(60)
+        ]
+        db.add_all(Transaction(user_id=1, description="x", **row) for row in rows)
+        RollupService.add(db, 1, rows)
+        incremental = rollups(db)
+
+        assert RollupService.check(db) == []
+        assert RollupService.rebuild(db, 1) == len(incremental)
+        assert rollups(db) == incremental
+
+    def test_check_reports_drift(self, db):
+        db.add(Transaction(user_id=1, date=DAY, description="x", amount=-5.0, category="A"))
+        db.flush()
+
+        mismatches = RollupService.check(db, 1)
+
+        assert mismatches == [{
+            'user_id': 1, 'day': DAY, 'category': 'A', 'expected': (0.0, 5.0, 1), 'stored': (0.0, 0.0, 0)
+        }]
+
+    def test_rebuild_is_scoped_to_a_user(self, db):
+        RollupService.add(db, 2, [{'date': DAY, 'amount': -1.0, 'category': 'A'}])
+        db.add(Transaction(user_id=1, date=DAY, description="x", amount=-5.0, category="A"))
+
+        RollupService.rebuild(db, 1)
+
+        assert rollups(db, 1) == {(DAY, 'A'): (0.0, 5.0, 1)}
+        assert rollups(db, 2) == {(DAY, 'A'): (0.0, 1.0, 1)}
+
+
+class TestRollupWritePaths:
+    def test_bulk_import(self, db):
+        rows = [{'date': DAY, 'description': f"Store {i}", 'amount': -2.0, 'category': 'Shopping'} for i in range(7)]
+
+        list(TransactionImporter.import_rows(db, 1, rows, chunk_size=3))
+
+        assert rollups(db) == {(DAY, 'Shopping'): (0.0, 14.0, 7)}
+
+    def test_receipt_import_and_transaction_edit(self, client, db):
+        response = client.post("/api/receipts/import", json={
+            "vendor": "Corner Store", "date": "2024-01-15", "total": -12.5, "line_items": []
+        })
+        assert response.status_code == 200
+        transaction_id = response.json()['transaction_id']
+        category = db.get(Transaction, transaction_id).category
+        assert rollups(db) == {(DAY, category): (0.0, 12.5, 1)}
+
+        response = client.patch(f"/api/transactions/{transaction_id}", json={"amount": -20.0, "category": "Groceries"})
+        assert response.status_code == 200
+        assert rollups(db) == {(DAY, 'Groceries'): (0.0, 20.0, 1)}
+
+        # Description-only edits leave rollups alone
+        client.patch(f"/api/transactions/{transaction_id}", json={"description": "Corner Store #2"})
+        assert RollupService.check(db) == []
+
+
+class TestRollupsCommand:
+    def test_rebuild_then_check(self, session_factory, capsys):
+        db = session_factory()
+        db.add(Transaction(user_id=1, date=DAY, description="x", amount=-5.0, category="A"))
+        db.commit()
+        db.close()
+
+        assert rollups_command.main(['check'], session_factory=session_factory) == 1
+        assert rollups_command.main(['rebuild'], session_factory=session_factory) == 0
+        assert rollups_command.main(['check', '--user-id', '1'], session_factory=session_factory) == 0
+
+        output = capsys.readouterr().out
+        assert "1 rollup rows out of date" in output
+        assert "Rebuilt daily rollups: 1 rows" in output
+        assert "consistent" in output
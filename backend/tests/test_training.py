@@ -0,0 +1,169 @@
+import threading
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.commands import ml as ml_command
+from app.core.database import Base
+from app.models.transaction import Transaction
+from app.services.categorizer import Categorizer
+from app.services.model_store import ModelStore
+from app.services.training import IncrementalModel, ModelTrainer
+from sklearn.pipeline import Pipeline
+
+USER_ID = 1
+BASE_TIME = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'training.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def trainer(tmp_path, session_factory):
+    categorizer = Categorizer(
+        model_path=str(tmp_path / 'global.pkl'),
+        model_store=ModelStore(model_dir=str(tmp_path / 'models'))
+    )
+    return ModelTrainer(categorizer, session_factory=session_factory)
+
+
+def add_transactions(session_factory, items, minutes=0):
+    db = session_factory()
+    stamp = BASE_TIME + timedelta(minutes=minutes)
+    for description, category in items:
+        db.add(Transaction(
+            user_id=USER_ID,
+            date=date(2024, 1, 1),
+            description=description,
+            amount=-10.0,
+            category=category,
+            updated_at=stamp
+        ))
+    db.commit()
+    db.close()
+
+
+SEED = [('Zephyr Airlines', 'Travel'), ('Blue Skies Air', 'Travel'), ('Jet Fly', 'Travel')] * 2 + \
+    [('Tax Office', 'Taxes'), ('City Tax', 'Taxes'), ('IRS Tax', 'Taxes'), ('State tax', 'Taxes')]
+
+
+class TestModelTrainer:
+    def test_too_few_transactions(self, trainer, session_factory):
+        add_transactions(session_factory, SEED[:3])
+
+        with pytest.raises(ValueError):
+            trainer.train_user(USER_ID)
+
+    def test_unknown_mode(self, trainer):
+        with pytest.raises(ValueError):
+            trainer.train_user(USER_ID, mode='nightly')
+
+    def test_full_mode_trains_tfidf_pipeline(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+
+        result = trainer.train_user(USER_ID, mode='full')
+
+        assert result == {'mode': 'full', 'rebuilt': True, 'transactions_used': 10}
+        model, _ = trainer.categorizer.model_store.get(USER_ID)
+        assert isinstance(model, Pipeline)
+        assert trainer.categorizer.categorize('Zephyr Airlines', user_id=USER_ID) == 'Travel'
+
+    def test_incremental_mode_builds_then_updates(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+        first = trainer.train_user(USER_ID, mode='incremental')
+        assert first == {'mode': 'incremental', 'rebuilt': True, 'transactions_used': 10}
+
+        model, _ = trainer.categorizer.model_store.get(USER_ID)
+        assert isinstance(model, IncrementalModel)
+        assert model.trained_until == BASE_TIME
+        assert trainer.categorizer.categorize('Zephyr Airlines', user_id=USER_ID) == 'Travel'
+
+        # Nothing changed since the last run
+        assert trainer.train_user(USER_ID)['transactions_used'] == 0
+
+        add_transactions(session_factory, [('Tax Refund Office', 'Taxes')] * 3, minutes=5)
+        update = trainer.train_user(USER_ID)
+
+        assert update == {'mode': 'incremental', 'rebuilt': False, 'transactions_used': 3}
+        model, _ = trainer.categorizer.model_store.get(USER_ID)
+        assert model.trained_until == BASE_TIME + timedelta(minutes=5)
+        assert model.samples_seen == 13
+
+    def test_new_category_forces_rebuild(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+        trainer.train_user(USER_ID)
+
+        add_transactions(session_factory, [('Gym membership', 'Fitness')] * 2, minutes=5)
+        result = trainer.train_user(USER_ID)
+
+        assert result == {'mode': 'incremental', 'rebuilt': True, 'transactions_used': 12}
+        model, _ = trainer.categorizer.model_store.get(USER_ID)
+        assert 'Fitness' in model.classes_
+
+    def test_incremental_replaces_full_model(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+        trainer.train_user(USER_ID, mode='full')
+
+        result = trainer.train_user(USER_ID, mode='incremental')
+
+        assert result['rebuilt'] is True
+        model, _ = trainer.categorizer.model_store.get(USER_ID)
+        assert isinstance(model, IncrementalModel)
+
+    def test_concurrent_training_is_serialized(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+        active = []
+        overlaps = []
+        save_model = trainer.categorizer.save_model
+
+        def tracking_save(model, user_id=None):
+            active.append(user_id)
+            overlaps.append(len(active))
+            save_model(model, user_id=user_id)
+            active.pop()
+
+        trainer.categorizer.save_model = tracking_save
+        threads = [threading.Thread(target=trainer.train_user, args=(USER_ID, 'full')) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(overlaps) == 4
+        assert max(overlaps) == 1
+
+
+class TestGlobalModel:
+    def test_users_without_a_model_use_the_trained_global_model(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+        assert trainer.categorizer.categorize('Zephyr Airlines', user_id=2) == 'Other'
+
+        result = trainer.train_global()
+
+        assert result == {'mode': 'full', 'rebuilt': True, 'transactions_used': 10}
+        assert trainer.categorizer.model_store.get(2)[0] is None
+        assert trainer.categorizer.categorize('Zephyr Airlines', user_id=2) == 'Travel'
+
+    def test_max_samples_keeps_most_recent(self, trainer, session_factory):
+        add_transactions(session_factory, SEED)
+        add_transactions(session_factory, [('Tax Refund Office', 'Taxes')] * 3, minutes=5)
+
+        assert trainer.train_global(max_samples=12)['transactions_used'] == 12
+
+    def test_too_few_transactions(self, trainer, session_factory):
+        add_transactions(session_factory, SEED[:3])
+
+        with pytest.raises(ValueError):
+            trainer.train_global()
+
+    def test_command(self, trainer, session_factory, capsys):
+        assert ml_command.main(['train-global'], session_factory, trainer.categorizer) == 1
+        add_transactions(session_factory, SEED)
+
+        assert ml_command.main(['train-global'], session_factory, trainer.categorizer) == 0
+        assert "Trained global model on 10 transactions" in capsys.readouterr().out
+        assert trainer.categorizer.categorize('Zephyr Airlines', user_id=2) == 'Travel'
@@ -0,0 +1,95 @@
+import random
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import text
+from app.models.transaction import Transaction
+
+
+@pytest.fixture
+def txns(db):
+    rng = random.Random(0)
+    start = date(2024, 1, 1)
+    rows = [
+        Transaction(
+            user_id=1,
+            date=start + timedelta(days=rng.randint(0, 20)),  # plenty of same-day rows
+            description="Store",
+            amount=round(rng.uniform(-100, 100), 2),
+            category=rng.choice(['Dining', 'Groceries', None]),
+        )
+        for _ in range(250)
+    ]
+    db.add_all(rows)
+    db.add(Transaction(user_id=2, date=start, description="Other user", amount=-1.0))
+    db.commit()
+    return sorted(rows, key=lambda t: (t.date, t.id), reverse=True)
+
+
+def fetch_all(client, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/transactions", params={**params, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [t['id'] for t in response.json()]
+        pages += 1
+        cursor = response.headers.get('x-next-cursor')
+        if cursor is None:
+            return ids, pages
+
+
+class TestListTransactions:
+    def test_cursor_pages_cover_every_row_once_in_order(self, client, txns):
+        ids, pages = fetch_all(client, limit=40)
+
+        assert ids == [t.id for t in txns]
+        assert pages == 7
+
+    def test_last_full_page_has_no_cursor(self, client, txns):
+        response = client.get("/api/transactions", params={'limit': len(txns)})
+
+        assert len(response.json()) == len(txns)
+        assert 'x-next-cursor' not in response.headers
+
+    def test_filters(self, client, txns):
+        params = {
+            'limit': 15,
+            'category': 'Dining',
+            'date_from': '2024-01-05',
+            'date_to': '2024-01-15',
+            'amount_min': -50,
+            'amount_max': 20,
+        }
+
+        ids, _ = fetch_all(client, **params)
+
+        assert ids == [
+            t.id for t in txns
+            if t.category == 'Dining' and date(2024, 1, 5) <= t.date <= date(2024, 1, 15) and -50 <= t.amount <= 20
+        ]
+
+    def test_offset_paging_still_works(self, client, txns):
+        response = client.get("/api/transactions", params={'skip': 10, 'limit': 5})
+
+        assert [t['id'] for t in response.json()] == [t.id for t in txns[10:15]]
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", "Zm9v", "MjAyNC0xMy0wMTox"])
+    def test_invalid_cursor(self, client, cursor):
+        assert client.get("/api/transactions", params={'cursor': cursor}).status_code == 400
+
+    def test_limit_is_bounded(self, client):
+        assert client.get("/api/transactions", params={'limit': 0}).status_code == 422
+        assert client.get("/api/transactions", params={'limit': 1001}).status_code == 422
+
+
+class TestListingIndexes:
+    @pytest.mark.parametrize("where, index", [
+        ("user_id = 1 AND (date, id) < ('2024-01-10', 50)", "ix_transactions_user_date_id"),
+        ("user_id = 1 AND category = 'Dining' AND (date, id) < ('2024-01-10', 50)", "ix_transactions_user_category_date_id"),
+    ])
+    def test_keyset_page_is_an_index_range_without_sort(self, db, where, index):
+        plan = [row[-1] for row in db.execute(text(
+            f"EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE {where} ORDER BY date DESC, id DESC LIMIT 101"
+        ))]
+
+        assert any(index in step for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
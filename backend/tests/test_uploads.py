@@ -0,0 +1,125 @@
+import asyncio
+import os
+from io import BytesIO
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.api import receipts
+from app.core.middleware import MaxBodySizeMiddleware
+from app.services.ocr_cache import OCRResultCache
+from app.services.uploads import UploadTooLarge, save_upload
+
+
+def make_upload(content: bytes, filename: str = "receipt.png") -> UploadFile:
+    return UploadFile(file=BytesIO(content), filename=filename, size=len(content))
+
+
+class TestSaveUpload:
+    def save(self, content, upload_dir, max_bytes=1024, chunk_size=4):
+        return asyncio.run(save_upload(make_upload(content), str(upload_dir), '.png', max_bytes, chunk_size))
+
+    def test_streams_to_content_addressed_file(self, tmp_path):
+        digest, path, created = self.save(b'receipt bytes', tmp_path)
+
+        assert created
+        assert path == os.path.join(str(tmp_path), f"{digest}.png")
+        assert digest == OCRResultCache.content_hash(b'receipt bytes')
+        with open(path, 'rb') as f:
+            assert f.read() == b'receipt bytes'
+
+    def test_duplicate_content_reuses_file(self, tmp_path):
+        _, first, _ = self.save(b'same', tmp_path)
+        _, second, created = self.save(b'same', tmp_path)
+
+        assert second == first
+        assert not created
+        assert os.listdir(tmp_path) == [os.path.basename(first)]
+
+    def test_stops_at_limit_and_cleans_up(self, tmp_path):
+        upload = make_upload(b'x' * 100)
+
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(save_upload(upload, str(tmp_path), '.png', max_bytes=10, chunk_size=4))
+
+        assert os.listdir(tmp_path) == []
+        # Nothing past the first chunk over the limit was read
+        assert upload.file.tell() == 12
+
+
+def echo_app():
+    async def upload(request):
+        body = await request.body()
+        return JSONResponse({"size": len(body)})
+
+    inner = Starlette(routes=[
+        Route("/upload", upload, methods=["POST"]),
+        Route("/other", upload, methods=["POST"]),
+    ])
+    return TestClient(MaxBodySizeMiddleware(inner, max_bytes=10, paths=["/upload"]))
+
+
+class TestMaxBodySizeMiddleware:
+    def test_allows_body_within_limit(self):
+        response = echo_app().post("/upload", content=b'x' * 10)
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 10}
+
+    def test_rejects_declared_length_over_limit(self):
+        response = echo_app().post("/upload", content=b'x' * 11)
+
+        assert response.status_code == 413
+
+    def test_rejects_streamed_body_once_limit_passed(self):
+        def chunks():
+            for _ in range(5):
+                yield b'x' * 4
+
+        # A generator body is sent chunked, without Content-Length
+        response = echo_app().post("/upload", content=chunks())
+
+        assert response.status_code == 413
+
+    def test_ignores_other_paths(self):
+        response = echo_app().post("/other", content=b'x' * 100)
+
+        assert response.status_code == 200
+
+
+@pytest.fixture
+def client(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(receipts, "ocr_cache", OCRResultCache(str(tmp_path / 'ocr_cache')))
+    monkeypatch.setattr(receipts.settings, "UPLOAD_DIR", str(tmp_path / 'uploads'))
+    return client
+
+
+class TestUploadLimits:
+    def test_receipt_over_limit_is_rejected_without_leftovers(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr(receipts.settings, "MAX_UPLOAD_SIZE_MB", 0)
+
+        response = client.post("/api/receipts/upload", files={"file": ("receipt.png", b"fake image", "image/png")})
+
+        assert response.status_code == 413
+        assert os.listdir(tmp_path / 'uploads') == []
+
+    def test_csv_over_limit_is_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(receipts.settings, "MAX_UPLOAD_SIZE_MB", 0)
+
+        response = client.post("/api/transactions/upload", files={"file": ("bank.csv", b"Date,Description,Amount\n", "text/csv")})
+
+        assert response.status_code == 413
+
+    def test_csv_preview_from_stream(self, client):
+        rows = "".join(f"2024-01-{day:02d},Coffee shop,-{day}.50\n" for day in range(1, 21))
+        content = ("Date,Description,Amount\n" + rows).encode()
+
+        response = client.post("/api/transactions/upload", files={"file": ("bank.csv", content, "text/csv")})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['total_rows'] == 20
+        assert len(data['preview']) == 10
+        assert data['preview'][0]['description'] == 'Coffee shop'